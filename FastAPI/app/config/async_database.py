@@ -0,0 +1,169 @@
+"""
+This module contains the asyncio-native MySQL access used by the async routes.
+
+Queries are still built with the peewee models, only their execution changes:
+the SQL is sent through an `aiomysql` pool and the rows are turned back into
+model instances by peewee's own row wrappers, so services keep a single way of
+describing queries for both the sync and the async paths.
+"""
+import asyncio
+import time
+from starlette.concurrency import run_in_threadpool
+from app.config.database import database
+from app.config.pool import record_query
+from app.config.slow_queries import (
+    find_caller,
+    forget_caller,
+    is_slow,
+    plan_rows,
+    remember_caller,
+    slow_query_log,
+)
+from app.config.settings import ASYNC_DATABASE, DATABASE
+
+try:
+    import aiomysql
+except ImportError:  # pragma: no cover - the async driver is optional
+    aiomysql = None
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+class _BufferedCursor:
+    """Minimal DB-API cursor over rows already fetched by the async driver."""
+
+    def __init__(self, description, rows):
+        self.description = description
+        self._rows = iter(rows)
+
+    def fetchone(self):
+        """Returns the next row or None when the rows are exhausted."""
+        return next(self._rows, None)
+
+    def close(self):
+        """Releases the buffered rows."""
+        self._rows = iter(())
+
+
+def is_async_enabled(query=None):
+    """
+    Tells whether a query can run on the async driver.
+
+    Queries bound to another database than the application MySQL pool (for
+    example a SQLite stand-in) run on the threadpool instead.
+
+    Args:
+        query (Query): The query about to run, if any.
+
+    Returns:
+        bool: True if the query runs on the aiomysql pool.
+    """
+    if not ASYNC_DATABASE["enabled"] or aiomysql is None:
+        return False
+    return query is None or query.model._meta.database is database  # pylint: disable=protected-access
+
+
+async def get_pool():
+    """
+    Returns the aiomysql pool of the current process, creating it on first use.
+
+    Returns:
+        Pool: The async connection pool.
+    """
+    global _pool  # pylint: disable=global-statement
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    db=DATABASE["name"],
+                    user=DATABASE["user"],
+                    password=DATABASE["password"],
+                    host=DATABASE["host"],
+                    port=DATABASE["port"],
+                    minsize=ASYNC_DATABASE["min_connections"],
+                    maxsize=ASYNC_DATABASE["max_connections"],
+                    pool_recycle=DATABASE["stale_timeout"],
+                    autocommit=True,
+                )
+    return _pool
+
+
+def reset_after_fork():
+    """Forgets the aiomysql pool inherited from the parent process, if any."""
+    global _pool, _pool_lock  # pylint: disable=global-statement
+    _pool = None
+    _pool_lock = asyncio.Lock()
+
+
+async def close_pool():
+    """Closes the aiomysql pool of the current process, if it was opened."""
+    global _pool  # pylint: disable=global-statement
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+async def _log_slow_query(cursor, sql, params, seconds):
+    """Records a slow statement, capturing its plan on the same connection if needed."""
+    caller = find_caller()
+    plan = None
+    if slow_query_log.needs_plan(sql):
+        try:
+            await cursor.execute("EXPLAIN " + sql, params)
+            plan = plan_rows(cursor.description, await cursor.fetchall())
+        except aiomysql.MySQLError as exc:
+            plan = [{"error": str(exc)}]
+    slow_query_log.record(sql, params, seconds, caller, plan)
+
+
+async def fetch_all(query):
+    """
+    Runs a select query without blocking the event loop.
+
+    Args:
+        query (Query): The peewee query to run.
+
+    Returns:
+        list: The rows, as the query would return them when iterated.
+    """
+    if not is_async_enabled(query):
+        token = remember_caller()
+        try:
+            return await run_in_threadpool(list, query)
+        finally:
+            forget_caller(token)
+    sql, params = query.sql()
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            start = time.perf_counter()
+            await cursor.execute(sql, params)
+            rows = await cursor.fetchall()
+            seconds = time.perf_counter() - start
+            record_query(seconds, sql)
+            description = cursor.description
+            if is_slow(seconds):
+                await _log_slow_query(cursor, sql, params, seconds)
+    # pylint: disable=protected-access
+    return list(query._get_cursor_wrapper(_BufferedCursor(description, rows)))
+
+
+async def fetch_one(query):
+    """
+    Runs a select query and returns its first row.
+
+    Args:
+        query (ModelSelect): The peewee query to run.
+
+    Returns:
+        Model: The first row of the query.
+
+    Raises:
+        DoesNotExist: If the query returns no rows.
+    """
+    rows = await fetch_all(query.limit(1))
+    if not rows:
+        raise query.model.DoesNotExist(f"{query.model.__name__} matching query does not exist")
+    return rows[0]
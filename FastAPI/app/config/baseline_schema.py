@@ -0,0 +1,192 @@
+"""
+This module contains a frozen copy of the tables created by the first migration.
+
+The models in `app.config.database` keep changing as later migrations add
+tables, columns and indexes; creating the base schema from them would apply
+those changes twice, or skip the migrations owning them. These snapshots must
+never be edited: a schema change goes in a new migration instead.
+
+The models have no database, the migration binds them while it runs.
+"""
+from peewee import AutoField, CharField, DateField, ForeignKeyField, Model, TimeField
+
+class Role(Model):
+    """Represents a role as created by the first migration."""
+    idRole = AutoField(primary_key=True)
+    nameRole = CharField(max_length=255)
+    permissions = CharField(max_length=255)
+
+    class Meta:
+        """Defines the metadata for the Role snapshot."""
+        table_name = "roles"
+
+class Family(Model):
+    """Represents a family as created by the first migration."""
+    idFamily = AutoField(primary_key=True)
+    nameFamily = CharField(max_length=255)
+
+    class Meta:
+        """Defines the metadata for the Family snapshot."""
+        table_name = "families"
+
+class User(Model):
+    """Represents a user as created by the first migration."""
+    idUser = AutoField(primary_key=True)
+    nameUser = CharField(max_length=255)
+    passwordUser = CharField(max_length=255)
+    emailUser = CharField(max_length=255)
+    photoUser = CharField(max_length=255)
+    rolId = ForeignKeyField(Role, backref='users')
+    familyId = ForeignKeyField(Family, backref='users')
+
+    class Meta:
+        """Defines the metadata for the User snapshot."""
+        table_name = "users"
+
+class Notification(Model):
+    """Represents a notification as created by the first migration."""
+    idNotification = AutoField(primary_key=True)
+    messageNotification = CharField(max_length=255)
+    dateNotification = DateField()
+    userId = ForeignKeyField(User, backref='notifications')
+
+    class Meta:
+        """Defines the metadata for the Notification snapshot."""
+        table_name = "notifications"
+
+class Pantry(Model):
+    """Represents a pantry as created by the first migration."""
+    idPantry = AutoField(primary_key=True)
+    userId = ForeignKeyField(User, backref='pantries')
+
+    class Meta:
+        """Defines the metadata for the Pantry snapshot."""
+        table_name = "pantries"
+
+class IngredientInventory(Model):
+    """Represents an ingredient of a pantry as created by the first migration."""
+    ingredientId = AutoField(primary_key=True)
+    nameIngredient = CharField(max_length=255)
+    amountIngredient = CharField(max_length=255)
+    unitIngredient = CharField(max_length=255)
+    dateExpirationIngredient = DateField()
+    pantryId = ForeignKeyField(Pantry, backref='ingredient_pantries')
+
+    class Meta:
+        """Defines the metadata for the IngredientInventory snapshot."""
+        table_name = "ingredient_pantries"
+
+class CategoryRecipe(Model):
+    """Represents a recipe category as created by the first migration."""
+    idCategoryRecipe = AutoField(primary_key=True)
+    nameCategoryRecipe = CharField(max_length=255)
+    descriptionCategoryRecipe = CharField(max_length=255)
+
+    class Meta:
+        """Defines the metadata for the CategoryRecipe snapshot."""
+        table_name = "categoryRecipes"
+
+class Recipe(Model):
+    """Represents a recipe as created by the first migration."""
+    idRecipe = AutoField(primary_key=True)
+    nameRecipe = CharField(max_length=255)
+    descriptionRecipe = CharField(max_length=255)
+    categoryRecipe = CharField(max_length=255)
+    difficultyRecipe = CharField(max_length=255)
+    timePreparation = TimeField()
+    instructions = CharField(max_length=255)
+    nutritionalData = CharField(max_length=255)
+    userId = ForeignKeyField(User, backref='recipes')
+    categoriaId = ForeignKeyField(CategoryRecipe, backref='recipes')
+
+    class Meta:
+        """Defines the metadata for the Recipe snapshot."""
+        table_name = "recipes"
+
+class Recipe_Category(Model):
+    """Represents the recipe and category bridge as created by the first migration."""
+    recetaIdCR = ForeignKeyField(Recipe, backref='category_recipes')
+    categoriaIdCR = ForeignKeyField(CategoryRecipe, backref='category_recipes')
+
+    class Meta:
+        """Defines the metadata for the Recipe_Category snapshot."""
+        table_name = "category_recipes"
+
+class Menu(Model):
+    """Represents a menu as created by the first migration."""
+    idMenu = AutoField(primary_key=True)
+    dateMenu = DateField()
+    userId = ForeignKeyField(User, backref='menus')
+
+    class Meta:
+        """Defines the metadata for the Menu snapshot."""
+        table_name = "menus"
+
+class Menu_Recipe(Model):
+    """Represents the menu and recipe bridge as created by the first migration."""
+    menuIdMR = ForeignKeyField(Menu, backref='menu_recipes')
+    recipeIdMR = ForeignKeyField(Recipe, backref='menu_recipes')
+
+    class Meta:
+        """Defines the metadata for the Menu_Recipe snapshot."""
+        table_name = "menu_recipes"
+
+class ShoppingList(Model):
+    """Represents a shopping list as created by the first migration."""
+    idShoppingList = AutoField(primary_key=True)
+    menuId = ForeignKeyField(Menu, backref='shopping_lists')
+
+    class Meta:
+        """Defines the metadata for the ShoppingList snapshot."""
+        table_name = "shopping_lists"
+
+class CategoryIngredient(Model):
+    """Represents an ingredient category as created by the first migration."""
+    idCategoryIngredient = AutoField(primary_key=True)
+    nameCategoryIngredient = CharField(max_length=255)
+    descriptionCategoryIngredient = CharField(max_length=255)
+
+    class Meta:
+        """Defines the metadata for the CategoryIngredient snapshot."""
+        table_name = "categoryIngredients"
+
+class Ingredient(Model):
+    """Represents an ingredient of a recipe as created by the first migration."""
+    idIngredient = AutoField(primary_key=True)
+    nameIngredient = CharField(max_length=255)
+    amountIngredient = CharField(max_length=255)
+    unitIngredient = CharField(max_length=255)
+    dateExpirationIngredient = DateField()
+    recipeId = ForeignKeyField(Recipe, backref='ingredients')
+    categoryIdIngredient = ForeignKeyField(CategoryIngredient, backref='ingredients')
+
+    class Meta:
+        """Defines the metadata for the Ingredient snapshot."""
+        table_name = "ingredients"
+
+class ShoppingList_Ingredient(Model):
+    """Represents the shopping list and ingredient bridge as created by the first migration."""
+    shoppingListId = ForeignKeyField(ShoppingList, backref='shopping_list_ingredients')
+    ingredientId = ForeignKeyField(Ingredient, backref='shopping_list_ingredients')
+
+    class Meta:
+        """Defines the metadata for the ShoppingList_Ingredient snapshot."""
+        table_name = "shopping_list_ingredients"
+
+BASELINE_MODELS = (
+    Role,
+    Family,
+    User,
+    Notification,
+    Pantry,
+    IngredientInventory,
+    CategoryRecipe,
+    Recipe,
+    Recipe_Category,
+    Menu,
+    Menu_Recipe,
+    ShoppingList,
+    CategoryIngredient,
+    Ingredient,
+    ShoppingList_Ingredient,
+)
@@ -1,13 +1,19 @@
 """This module contains the database configuration and models for the FastAPI application."""
+import datetime
 from app.config.settings import DATABASE
-from peewee import AutoField, CharField, DateField, ForeignKeyField, Model, MySQLDatabase, TimeField
+from app.config.pool import MonitoredPooledMySQLDatabase
+from peewee import (AutoField, BigIntegerField, BooleanField, CharField, DateField,
+                    DateTimeField, FloatField, ForeignKeyField, IntegerField, Model, TimeField)
 
-database = MySQLDatabase(
+database = MonitoredPooledMySQLDatabase(
     DATABASE["name"],
     user=DATABASE["user"],
     passwd=DATABASE["password"],
     host=DATABASE["host"],
     port=DATABASE["port"],
+    max_connections=DATABASE["max_connections"],
+    stale_timeout=DATABASE["stale_timeout"],
+    timeout=DATABASE["pool_timeout"],
 )
 
 class Role(Model):
@@ -60,7 +66,7 @@ class User(Model):
     idUser = AutoField(primary_key=True)
     nameUser = CharField(max_length=255)
     passwordUser = CharField(max_length=255)
-    emailUser = CharField(max_length=255)
+    emailUser = CharField(max_length=255, index=True)
     photoUser = CharField(max_length=255)
     rolId = ForeignKeyField(Role, backref='users')
     familyId = ForeignKeyField(Family, backref='users')
@@ -82,7 +88,7 @@ class Notification(Model):
     """
     idNotification = AutoField(primary_key=True)
     messageNotification = CharField(max_length=255)
-    dateNotification = DateField()
+    dateNotification = DateField(index=True)
     userId = ForeignKeyField(User, backref='notifications')
 
     class Meta:
@@ -106,6 +112,26 @@ class Pantry(Model):
         database = database
         db_table = "pantries"
         
+class Unit(Model):
+    """
+    Represents a unit of measure and its conversion to a base unit in the database.
+
+    Attributes:
+        idUnit (int): The unique identifier of the unit.
+        nameUnit (str): The unit as written by users, in lower case.
+        baseUnit (str): The base unit of its dimension (g, ml or unit).
+        factorUnit (float): The factor converting an amount in this unit to the base unit.
+    """
+    idUnit = AutoField(primary_key=True)
+    nameUnit = CharField(max_length=64, unique=True)
+    baseUnit = CharField(max_length=16)
+    factorUnit = FloatField()
+
+    class Meta:
+        """Defines the metadata for the Unit model."""
+        database = database
+        db_table = "units"
+
 class IngredientInventory(Model):
     """
     Represents a table the amount of an ingredient in the database.
@@ -117,13 +143,17 @@ class IngredientInventory(Model):
         unitIngredient (str): The unit of the ingredient.
         dateExpirationIngredient (date): The date expiration of the ingredient.
         pantryId (int): The unique identifier of the pantry.
+        quantityBase (float): The amount converted to the base unit of its unit.
+        unitId (int): The unit of the amount.
     """
     ingredientId = AutoField(primary_key=True)
     nameIngredient = CharField(max_length=255)
     amountIngredient = CharField(max_length=255)
     unitIngredient = CharField(max_length=255)
-    dateExpirationIngredient = DateField()
+    dateExpirationIngredient = DateField(index=True)
     pantryId = ForeignKeyField(Pantry, backref='ingredient_pantries')
+    quantityBase = FloatField(null=True)
+    unitId = ForeignKeyField(Unit, null=True, backref='ingredient_pantries')
 
     class Meta:
         """Defines the metadata for the IngredientPantry model."""
@@ -168,7 +198,7 @@ class Recipe(Model):
     nameRecipe = CharField(max_length=255)
     descriptionRecipe = CharField(max_length=255)
     categoryRecipe = CharField(max_length=255)
-    difficultyRecipe = CharField(max_length=255)
+    difficultyRecipe = CharField(max_length=255, index=True)
     timePreparation = TimeField()
     instructions = CharField(max_length=255)
     nutritionalData = CharField(max_length=255)
@@ -194,7 +224,10 @@ class Recipe_Category(Model):
     class Meta:
         """Defines the metadata for the Category_Recipe model."""
         database = database
-        db_table = "category_recipes"        
+        db_table = "category_recipes"
+        indexes = (
+            (("recetaIdCR", "categoriaIdCR"), True),
+        )        
         
 class Menu(Model):
     """
@@ -206,7 +239,7 @@ class Menu(Model):
         userId (int): The user of the menu.
     """
     idMenu = AutoField(primary_key=True)
-    dateMenu = DateField()
+    dateMenu = DateField(index=True)
     userId = ForeignKeyField(User, backref='menus')
 
     class Meta:
@@ -228,7 +261,10 @@ class Menu_Recipe(Model):
     class Meta:
         """Defines the metadata for the Menu_Recipe model."""
         database = database
-        db_table = "menu_recipes"        
+        db_table = "menu_recipes"
+        indexes = (
+            (("menuIdMR", "recipeIdMR"), True),
+        )        
         
 class ShoppingList(Model):
     """
@@ -276,14 +312,18 @@ class Ingredient(Model):
         dateExpirationIngredient (date): The date expiration of the ingredient.
         recipeId (int): The recipe of the ingredient.
         categoryIdIngredient (int): The category of the ingredient.
+        quantityBase (float): The amount converted to the base unit of its unit.
+        unitId (int): The unit of the amount.
     """
     idIngredient = AutoField(primary_key=True)
-    nameIngredient = CharField(max_length=255)
+    nameIngredient = CharField(max_length=255, index=True)
     amountIngredient = CharField(max_length=255)
     unitIngredient = CharField(max_length=255)
     dateExpirationIngredient = DateField()
     recipeId = ForeignKeyField(Recipe, backref='ingredients')
     categoryIdIngredient = ForeignKeyField(CategoryIngredient, backref='ingredients')
+    quantityBase = FloatField(null=True)
+    unitId = ForeignKeyField(Unit, null=True, backref='ingredients')
 
     class Meta:
         """Defines the metadata for the Ingredient model."""
@@ -297,11 +337,89 @@ class ShoppingList_Ingredient(Model):
     Attributes:
         shoppingListId (int): The unique identifier of the shopping list.
         ingredientId (int): The unique identifier of the ingredient.
+        amountIngredient (float): The amount to buy, in the base unit.
+        unitIngredient (str): The base unit of the amount.
     """
     shoppingListId = ForeignKeyField(ShoppingList, backref='shopping_list_ingredients')
     ingredientId = ForeignKeyField(Ingredient, backref='shopping_list_ingredients')
+    amountIngredient = FloatField(null=True)
+    unitIngredient = CharField(max_length=255, null=True)
 
     class Meta:
         """Defines the metadata for the ShoppingList_Ingredient model."""
         database = database
         db_table = "shopping_list_ingredients"
+        indexes = (
+            (("shoppingListId", "ingredientId"), True),
+        )
+
+class ApiKey(Model):
+    """
+    Represents a client API key in the database.
+
+    Only the SHA-256 digest of the key is stored; the key itself is shown once,
+    when it is created.
+
+    Attributes:
+        idApiKey (int): The unique identifier of the API key.
+        nameApiKey (str): The name of the client the key belongs to.
+        hashApiKey (str): The hexadecimal SHA-256 digest of the key.
+        scopesApiKey (str): The comma-separated scopes granted: read, write, admin.
+        ratePerSecond (float): The requests per second the client may sustain.
+        burstApiKey (int): The requests the client may send at once.
+        activeApiKey (bool): Whether the key is accepted.
+        createdAt (datetime): When the key was created.
+    """
+    idApiKey = AutoField(primary_key=True)
+    nameApiKey = CharField(max_length=255)
+    hashApiKey = CharField(max_length=64, unique=True)
+    scopesApiKey = CharField(max_length=255, default="read")
+    ratePerSecond = FloatField(null=True)
+    burstApiKey = IntegerField(null=True)
+    activeApiKey = BooleanField(default=True)
+    createdAt = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        """Defines the metadata for the ApiKey model."""
+        database = database
+        db_table = "api_keys"
+
+# The counter bumped after every write, read by the conditional GETs.
+DATA_VERSION_NAME = "data"
+
+class DataVersion(Model):
+    """
+    Represents a counter bumped after every write, used to validate cached reads.
+
+    Attributes:
+        nameVersion (str): The name of the counter.
+        version (int): The current value of the counter.
+    """
+    nameVersion = CharField(max_length=64, primary_key=True)
+    version = BigIntegerField()
+
+    class Meta:
+        """Defines the metadata for the DataVersion model."""
+        database = database
+        db_table = "data_versions"
+
+MODELS = (
+    Role,
+    Family,
+    User,
+    Notification,
+    Pantry,
+    Unit,
+    IngredientInventory,
+    CategoryRecipe,
+    Recipe,
+    Recipe_Category,
+    Menu,
+    Menu_Recipe,
+    ShoppingList,
+    CategoryIngredient,
+    Ingredient,
+    ShoppingList_Ingredient,
+    ApiKey,
+    DataVersion,
+)
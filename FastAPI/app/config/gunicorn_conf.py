@@ -0,0 +1,58 @@
+"""
+This module contains the Gunicorn configuration of the production server.
+
+Usage:
+    gunicorn -c app/config/gunicorn_conf.py app.main:app
+
+The master imports the application once (`preload_app`) and forks the Uvicorn
+workers, which share its code pages. Database connections are never opened in
+the master: each worker drops whatever it inherited right after the fork and
+opens its own pools lazily. SIGTERM stops accepting connections and lets the
+requests in flight finish for `graceful_timeout` seconds, and every worker is
+replaced after `max_requests` requests (plus jitter) to bound memory growth.
+"""
+import os
+import shutil
+
+# They must be set before the application, and prometheus_client with it, is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus")
+os.environ.setdefault("EXPIRY_SCAN_LOCK_FILE", "/tmp/expiry_scan.lock")
+# A profile is read back from any worker, not only the one that recorded it.
+os.environ.setdefault("PROFILING_DIRECTORY", "/tmp/profiles")
+
+# The metric files of the workers of a previous run would be added to this run's.
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# pylint: disable=wrong-import-position,invalid-name
+from app.config.settings import CACHE, SERVER
+
+bind = SERVER["bind"]
+workers = SERVER["workers"]
+if workers > 1 and not os.getenv("CACHE_BACKEND"):
+    # Each worker would keep its own lookup caches and serve the entries another
+    # worker invalidated until they expire, so they share the Redis cache instead.
+    CACHE["backend"] = "redis"
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = SERVER["preload"]
+max_requests = SERVER["max_requests"]
+max_requests_jitter = SERVER["max_requests_jitter"]
+graceful_timeout = SERVER["graceful_timeout"]
+timeout = SERVER["timeout"]
+keepalive = SERVER["keepalive"]
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Drops the database state inherited from the master before the worker serves."""
+    # pylint: disable=import-outside-toplevel
+    from app.config.async_database import reset_after_fork
+    from app.config.database import database
+    database.reset_after_fork()
+    reset_after_fork()
+
+
+def child_exit(server, worker):  # pylint: disable=unused-argument
+    """Stops exposing the live gauges of a worker that exited."""
+    # pylint: disable=import-outside-toplevel
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
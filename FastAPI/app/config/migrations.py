@@ -0,0 +1,370 @@
+"""
+This module contains the versioned schema migrations of the database.
+
+Usage:
+    python -m app.config.migrations migrate   # apply the pending migrations
+    python -m app.config.migrations status    # list applied and pending migrations
+    python -m app.config.migrations check     # report indexes missing for the services
+"""
+# pylint: disable=protected-access
+import argparse
+import datetime
+import operator
+import sys
+from functools import reduce
+from peewee import CharField, DateTimeField, IntegerField, Model, MySQLDatabase, fn
+from playhouse.migrate import SchemaMigrator, migrate as run_operations
+from app.config.baseline_schema import BASELINE_MODELS
+from app.config.database import (
+    DATA_VERSION_NAME,
+    ApiKey,
+    DataVersion,
+    Ingredient,
+    IngredientInventory,
+    Menu,
+    Menu_Recipe,
+    Notification,
+    Pantry,
+    Recipe,
+    Recipe_Category,
+    ShoppingList_Ingredient,
+    Unit,
+    User,
+    database,
+)
+from app.helpers.units import UNITS, normalize, unit_key
+
+class SchemaVersion(Model):
+    """
+    Represents an applied migration in the database.
+
+    Attributes:
+        version (int): The version number of the migration.
+        name (str): The description of the migration.
+        appliedAt (datetime): When the migration was applied.
+    """
+    version = IntegerField(primary_key=True)
+    name = CharField(max_length=255)
+    appliedAt = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        """Defines the metadata for the SchemaVersion model."""
+        database = database
+        table_name = "schema_versions"
+
+MIGRATIONS = []
+
+# Query patterns issued by the services, with the columns an index must lead with.
+QUERY_PATTERNS = [
+    (User, ("emailUser",), "user lookup by email"),
+    (User, ("familyId",), "members of a family"),
+    (Notification, ("userId",), "notifications of a user"),
+    (Notification, ("dateNotification",), "notifications by date"),
+    (Pantry, ("userId",), "pantries of a user"),
+    (IngredientInventory, ("pantryId",), "inventory of a pantry"),
+    (IngredientInventory, ("dateExpirationIngredient",), "inventory expiring soon"),
+    (Menu, ("userId",), "menus of a user"),
+    (Menu, ("dateMenu",), "menus by date"),
+    (Ingredient, ("recipeId",), "ingredients of a recipe"),
+    (Ingredient, ("nameIngredient",), "ingredients by name"),
+    (Recipe, ("difficultyRecipe",), "recipes by difficulty"),
+    (Recipe_Category, ("recetaIdCR", "categoriaIdCR"), "categories of a recipe"),
+    (Recipe_Category, ("categoriaIdCR",), "recipes of a category"),
+    (Menu_Recipe, ("menuIdMR", "recipeIdMR"), "recipes of a menu"),
+    (ShoppingList_Ingredient, ("shoppingListId", "ingredientId"), "items of a shopping list"),
+]
+
+# Full-text index backing the recipe search on MySQL.
+RECIPE_FULLTEXT_INDEX = "recipes_fulltext"
+RECIPE_FULLTEXT_FIELDS = ("nameRecipe", "descriptionRecipe", "instructions")
+
+def migration(version: int, name: str):
+    """
+    Registers a function as the migration with the given version.
+
+    Args:
+        version (int): The version number, migrations are applied in ascending order.
+        name (str): A short description of the migration.
+
+    Returns:
+        callable: The decorator registering the function.
+    """
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return register
+
+def _column_names(model, field_names):
+    return tuple(model._meta.fields[name].column_name for name in field_names)
+
+def has_index(db, model, field_names, unique=False):
+    """
+    Tells whether a table has an index leading with the given columns.
+
+    Args:
+        db (Database): The database to inspect.
+        model (Model): The model of the table.
+        field_names (tuple): The names of the fields the index must start with.
+        unique (bool): Whether the index must be unique.
+
+    Returns:
+        bool: True if a matching index exists.
+    """
+    columns = _column_names(model, field_names)
+    for index in db.get_indexes(model._meta.table_name):
+        if tuple(index.columns[:len(columns)]) == columns and (index.unique or not unique):
+            return True
+    return False
+
+def ensure_index(migrator, model, field_names, unique=False):
+    """
+    Adds an index to a table unless an equivalent one already exists.
+
+    Args:
+        migrator (SchemaMigrator): The migrator of the database.
+        model (Model): The model of the table.
+        field_names (tuple): The names of the indexed fields.
+        unique (bool): Whether the index is unique.
+    """
+    if not has_index(migrator.database, model, field_names, unique):
+        columns = _column_names(model, field_names)
+        run_operations(migrator.add_index(model._meta.table_name, columns, unique))
+
+def delete_duplicates(model, field_names):
+    """
+    Deletes the rows repeating the values of some fields, keeping the one with the lowest ID.
+
+    Args:
+        model (Model): The model of the table.
+        field_names (tuple): The names of the fields that must be unique together.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    key = model._meta.primary_key
+    fields = [model._meta.fields[name] for name in field_names]
+    groups = list(model
+                  .select(*fields, fn.MIN(key))
+                  .group_by(*fields)
+                  .having(fn.COUNT(key) > 1)
+                  .tuples())
+    deleted = 0
+    for *values, keep in groups:
+        same = reduce(operator.and_, [field == value for field, value in zip(fields, values)])
+        deleted += model.delete().where(same & (key != keep)).execute()
+    return deleted
+
+def ensure_unique_index(migrator, model, field_names):
+    """
+    Adds a unique index to a table, deleting the rows that would violate it first.
+
+    MySQL does not roll back schema changes, so a unique index failing on
+    existing duplicates would leave the migration half applied.
+
+    Args:
+        migrator (SchemaMigrator): The migrator of the database.
+        model (Model): The model of the table.
+        field_names (tuple): The names of the indexed fields.
+    """
+    if not has_index(migrator.database, model, field_names, unique=True):
+        delete_duplicates(model, field_names)
+        ensure_index(migrator, model, field_names, unique=True)
+
+def ensure_columns(migrator, model, field_names):
+    """
+    Adds the columns of model fields missing from their table.
+
+    Args:
+        migrator (SchemaMigrator): The migrator of the database.
+        model (Model): The model declaring the fields.
+        field_names (tuple): The names of the fields whose columns must exist.
+    """
+    table = model._meta.table_name
+    existing = {column.name for column in migrator.database.get_columns(table)}
+    for name in field_names:
+        field = model._meta.fields[name]
+        if field.column_name not in existing:
+            run_operations(migrator.add_column(table, field.column_name, field))
+
+@migration(1, "create base schema")
+def _create_base_schema(migrator):
+    # The frozen snapshot, so the tables, columns and indexes added later stay in their migrations.
+    db = migrator.database
+    with db.bind_ctx(BASELINE_MODELS):
+        db.create_tables([model for model in BASELINE_MODELS
+                          if not db.table_exists(model._meta.table_name)])
+
+@migration(2, "add lookup and bridge table indexes")
+def _add_lookup_indexes(migrator):
+    ensure_index(migrator, User, ("emailUser",))
+    ensure_index(migrator, Notification, ("dateNotification",))
+    ensure_index(migrator, IngredientInventory, ("dateExpirationIngredient",))
+    ensure_index(migrator, Menu, ("dateMenu",))
+    ensure_index(migrator, Ingredient, ("nameIngredient",))
+    ensure_unique_index(migrator, Recipe_Category, ("recetaIdCR", "categoriaIdCR"))
+    ensure_unique_index(migrator, Menu_Recipe, ("menuIdMR", "recipeIdMR"))
+    ensure_unique_index(migrator, ShoppingList_Ingredient, ("shoppingListId", "ingredientId"))
+
+@migration(3, "add amount and unit to shopping list items")
+def _add_shopping_list_amounts(migrator):
+    ensure_columns(migrator, ShoppingList_Ingredient, ("amountIngredient", "unitIngredient"))
+
+def _backfill_quantities(model, batch_size=1000):
+    """Fills the numeric quantity columns of a table from its text amounts, in keyset batches."""
+    key = model._meta.primary_key
+    unit_ids = dict(Unit.select(Unit.nameUnit, Unit.idUnit).tuples())
+    last = 0
+    while True:
+        rows = list(model
+                    .select(key, model.amountIngredient, model.unitIngredient)
+                    .where(key > last)
+                    .order_by(key)
+                    .limit(batch_size)
+                    .tuples())
+        if not rows:
+            return
+        records = []
+        for row_id, amount, unit in rows:
+            normalized = normalize(amount, unit)
+            if normalized is not None:
+                records.append(model(**{key.name: row_id}, quantityBase=normalized[0],
+                                     unitId=unit_ids.get(unit_key(unit))))
+        if records:
+            model.bulk_update(records, fields=[model.quantityBase, model.unitId])
+        last = rows[-1][0]
+
+@migration(4, "add numeric quantities and the units table")
+def _add_numeric_quantities(migrator):
+    db = migrator.database
+    if not db.table_exists(Unit._meta.table_name):
+        db.create_tables([Unit])
+    existing = {name for (name,) in Unit.select(Unit.nameUnit).tuples()}
+    missing = [{"nameUnit": name, "baseUnit": base_unit, "factorUnit": factor}
+               for name, (base_unit, factor) in UNITS.items() if name not in existing]
+    if missing:
+        Unit.insert_many(missing).execute()
+    for model in (Ingredient, IngredientInventory):
+        ensure_columns(migrator, model, ("quantityBase", "unitId"))
+        _backfill_quantities(model)
+
+@migration(5, "add recipe full-text and difficulty indexes")
+def _add_recipe_search_indexes(migrator):
+    db = migrator.database
+    ensure_index(migrator, Recipe, ("difficultyRecipe",))
+    if not isinstance(db, MySQLDatabase):
+        return
+    table = Recipe._meta.table_name
+    if any(index.name == RECIPE_FULLTEXT_INDEX for index in db.get_indexes(table)):
+        return
+    columns = ", ".join(_column_names(Recipe, RECIPE_FULLTEXT_FIELDS))
+    db.execute_sql(f"CREATE FULLTEXT INDEX {RECIPE_FULLTEXT_INDEX} ON {table} ({columns})")
+
+@migration(6, "create the api keys table")
+def _create_api_keys(migrator):
+    db = migrator.database
+    if not db.table_exists(ApiKey._meta.table_name):
+        db.create_tables([ApiKey])
+
+@migration(7, "create the data version counter")
+def _create_data_versions(migrator):
+    db = migrator.database
+    if not db.table_exists(DataVersion._meta.table_name):
+        db.create_tables([DataVersion])
+    with DataVersion.bind_ctx(db):
+        # Starting from the current time keeps the counter increasing if the table is recreated.
+        start = int(datetime.datetime.now().timestamp() * 1000)
+        (DataVersion
+         .insert(nameVersion=DATA_VERSION_NAME, version=start)
+         .on_conflict_ignore()
+         .execute())
+
+def applied_versions(db=database):
+    """
+    Returns the versions of the migrations already applied.
+
+    Args:
+        db (Database): The database to inspect.
+
+    Returns:
+        set: The applied version numbers.
+    """
+    with SchemaVersion.bind_ctx(db):
+        db.create_tables([SchemaVersion], safe=True)
+        return {row.version for row in SchemaVersion.select(SchemaVersion.version)}
+
+def apply_migrations(db=database):
+    """
+    Applies every pending migration in version order.
+
+    Args:
+        db (Database): The database to migrate.
+
+    Returns:
+        list: The names of the migrations that were applied.
+    """
+    applied = applied_versions(db)
+    migrator = SchemaMigrator.from_database(db)
+    done = []
+    with SchemaVersion.bind_ctx(db):
+        for version, name, func in MIGRATIONS:
+            if version in applied:
+                continue
+            with db.atomic():
+                func(migrator)
+                SchemaVersion.create(version=version, name=name)
+            done.append(f"{version:04d} {name}")
+    return done
+
+def find_missing_indexes(db=database):
+    """
+    Reports the service query patterns that no index supports.
+
+    Args:
+        db (Database): The database to inspect.
+
+    Returns:
+        list: A dictionary per missing index with the table, columns and query pattern.
+    """
+    missing = []
+    for model, field_names, pattern in QUERY_PATTERNS:
+        if not has_index(db, model, field_names):
+            missing.append({
+                "table": model._meta.table_name,
+                "columns": list(_column_names(model, field_names)),
+                "pattern": pattern,
+            })
+    return missing
+
+def main(argv=None):
+    """
+    Runs the migrations command line.
+
+    Args:
+        argv (list): The command line arguments, defaults to `sys.argv`.
+
+    Returns:
+        int: The exit code of the command.
+    """
+    parser = argparse.ArgumentParser(description="Database schema migrations.")
+    parser.add_argument("command", choices=("migrate", "status", "check"))
+    args = parser.parse_args(argv)
+    with database.connection_context():
+        if args.command == "migrate":
+            for name in apply_migrations():
+                print(f"applied {name}")
+            return 0
+        if args.command == "status":
+            applied = applied_versions()
+            for version, name, _ in MIGRATIONS:
+                state = "applied" if version in applied else "pending"
+                print(f"{version:04d} {name}: {state}")
+            return 0
+        missing = find_missing_indexes()
+        for item in missing:
+            print(f"missing index on {item['table']}({', '.join(item['columns'])}) "
+                  f"for {item['pattern']}")
+        return 1 if missing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
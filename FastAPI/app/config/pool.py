@@ -0,0 +1,272 @@
+"""This module contains the pooled connection backend used by the database configuration."""
+import threading
+import time
+from contextvars import ContextVar
+from peewee import DatabaseError, _ConnectionState, mysql as mysql_driver
+from playhouse.pool import MaxConnectionsExceeded, PooledMySQLDatabase
+from app.config.slow_queries import find_caller, is_slow, plan_rows, slow_query_log
+
+_request_state = ContextVar("db_request_state", default=None)
+_query_stats = ContextVar("db_query_stats", default=None)
+
+
+def begin_request_state():
+    """
+    Binds a fresh connection state to the current context.
+
+    Every request gets its own state so the connection checked out by one request
+    is never shared with another one running on the same threadpool worker.
+
+    Returns:
+        Token: The token needed to restore the previous state.
+    """
+    return _request_state.set({})
+
+
+def end_request_state(token):
+    """
+    Restores the connection state that was active before `begin_request_state`.
+
+    Args:
+        token (Token): The token returned by `begin_request_state`.
+    """
+    _request_state.reset(token)
+
+
+def begin_query_stats(statements=False):
+    """
+    Starts counting the statements run in the current context, usually a request.
+
+    The counters are a mutable dict, so the statements run in the threadpool on
+    behalf of the request (which copies the context) are counted too. Counting
+    can be nested: the statements are also counted by the enclosing counters.
+
+    Args:
+        statements (bool): Whether to also keep the SQL and duration of each statement.
+
+    Returns:
+        Token: The token needed to stop counting.
+    """
+    stats = {"queries": 0, "seconds": 0.0, "parent": _query_stats.get()}
+    if statements:
+        stats["statements"] = []
+    return _query_stats.set(stats)
+
+
+def end_query_stats(token):
+    """
+    Stops counting statements and returns what was counted.
+
+    Args:
+        token (Token): The token returned by `begin_query_stats`.
+
+    Returns:
+        dict: The number of statements and their total duration in seconds, and
+        the statements themselves if they were kept.
+    """
+    stats = _query_stats.get()
+    _query_stats.reset(token)
+    stats.pop("parent")
+    return stats
+
+
+def record_query(seconds, sql=None):
+    """
+    Counts a statement in the current context, if statements are being counted.
+
+    Args:
+        seconds (float): The time the statement took.
+        sql (str): The SQL of the statement, kept by the counters that asked for it.
+    """
+    stats = _query_stats.get()
+    while stats is not None:
+        stats["queries"] += 1
+        stats["seconds"] += seconds
+        if "statements" in stats:
+            stats["statements"].append({"sql": sql, "ms": round(seconds * 1000, 3)})
+        stats = stats["parent"]
+
+
+class QueryStatsMixin:
+    """
+    Database mixin counting every statement it executes with `record_query`
+    and recording the slow ones in the slow query log.
+
+    Attributes:
+        explain_prefix (str): The statement prefix returning the plan of a query.
+    """
+
+    explain_prefix = "EXPLAIN "
+
+    def execute_sql(self, sql, params=None, commit=None):
+        """Executes a statement and records its duration."""
+        start = time.perf_counter()
+        try:
+            cursor = super().execute_sql(sql, params, commit)
+        finally:
+            seconds = time.perf_counter() - start
+            record_query(seconds, sql)
+        if is_slow(seconds):
+            self.log_slow_query(sql, params, seconds)
+        return cursor
+
+    def log_slow_query(self, sql, params, seconds, caller=None):
+        """
+        Records a slow statement, capturing its plan the first time its shape is slow.
+
+        Args:
+            sql (str): The SQL of the statement.
+            params (list): The parameters of the statement.
+            seconds (float): The time the statement took.
+            caller (str): The function that issued it, found from the stack if not given.
+        """
+        plan = None
+        if slow_query_log.needs_plan(sql):
+            try:
+                cursor = super().execute_sql(self.explain_prefix + sql, params)
+                plan = plan_rows(cursor.description, cursor.fetchall())
+            except DatabaseError as exc:
+                plan = [{"error": str(exc)}]
+        slow_query_log.record(sql, params, seconds, caller or find_caller(), plan)
+
+
+class RequestConnectionState(_ConnectionState):
+    """
+    Peewee connection state stored per request context instead of per thread.
+
+    Outside of a request (startup, background jobs, scripts) it falls back to
+    a thread-local state, which is what peewee uses by default.
+    """
+
+    def __init__(self, **kwargs):
+        super().__setattr__("_local", threading.local())
+        super().__init__(**kwargs)
+
+    def _current(self):
+        state = _request_state.get()
+        if state is None:
+            state = self._local.__dict__
+        if not state:
+            state.update(closed=True, conn=None, ctx=[], transactions=[])
+        return state
+
+    def __setattr__(self, name, value):
+        self._current()[name] = value
+
+    def __getattr__(self, name):
+        try:
+            return self._current()[name]
+        except KeyError as exc:
+            raise AttributeError(name) from exc
+
+
+class MonitoredPooledMySQLDatabase(QueryStatsMixin, PooledMySQLDatabase):
+    """
+    Bounded MySQL connection pool that keeps checkout and statement metrics.
+
+    Attributes:
+        checkouts (int): The number of successful connection checkouts.
+        timeouts (int): The number of checkouts that gave up waiting for a connection.
+        waiting (int): The number of callers currently waiting for a connection.
+    """
+
+    def __init__(self, database, **kwargs):
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self._checkout_seconds = 0.0
+        self._max_checkout_seconds = 0.0
+        super().__init__(database, **kwargs)
+        self._state = RequestConnectionState()
+
+    def connect(self, reuse_if_open=False):
+        with self._metrics_lock:
+            self.waiting += 1
+        start = time.perf_counter()
+        try:
+            opened = super().connect(reuse_if_open)
+        except MaxConnectionsExceeded:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._metrics_lock:
+                self.waiting -= 1
+        elapsed = time.perf_counter() - start
+        with self._metrics_lock:
+            self.checkouts += 1
+            self._checkout_seconds += elapsed
+            self._max_checkout_seconds = max(self._max_checkout_seconds, elapsed)
+        return opened
+
+    def reset_after_fork(self):
+        """
+        Forgets the connections and locks inherited from the parent process.
+
+        Called in each worker right after the fork: the inherited sockets still
+        belong to the parent, so they are dropped without being closed (closing
+        them would end the parent's sessions) and the worker opens its own.
+        """
+        self._pool_lock = threading.RLock()
+        self._metrics_lock = threading.Lock()
+        self._connections = []
+        self._in_use = {}
+        self._state = RequestConnectionState()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self._checkout_seconds = 0.0
+        self._max_checkout_seconds = 0.0
+
+    def stats(self):
+        """
+        Returns a snapshot of the pool metrics.
+
+        Returns:
+            dict: The pool size, usage and checkout latency figures.
+        """
+        with self._metrics_lock:
+            checkouts = self.checkouts
+            average = self._checkout_seconds / checkouts if checkouts else 0.0
+            return {
+                "max_connections": self._max_connections,
+                "in_use": len(self._in_use),
+                "idle": len(self._connections),
+                "waiting": self.waiting,
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "avg_checkout_ms": round(average * 1000, 3),
+                "max_checkout_ms": round(self._max_checkout_seconds * 1000, 3),
+            }
+
+    def iterate_unbuffered(self, query):
+        """
+        Runs a select query on a server-side cursor and yields its rows as they arrive.
+
+        The default MySQL cursor buffers the whole result set in the client, this
+        one keeps memory usage constant no matter how many rows are returned.
+
+        Args:
+            query (ModelSelect): The query to run.
+
+        Yields:
+            Model: The rows of the query, built by the query's own row wrapper.
+        """
+        sql, params = query.sql()
+        cursor = self.connection().cursor(mysql_driver.cursors.SSCursor)
+        slow = None
+        try:
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            seconds = time.perf_counter() - start
+            record_query(seconds, sql)
+            if is_slow(seconds):
+                slow = (seconds, find_caller())
+            # pylint: disable=protected-access
+            yield from query._get_cursor_wrapper(cursor).iterator()
+        finally:
+            cursor.close()
+            # The connection is busy until the rows are read, so the plan is taken afterwards.
+            if slow is not None:
+                self.log_slow_query(sql, params, *slow)
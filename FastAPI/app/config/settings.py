@@ -16,6 +16,9 @@ if ENV == "production":
         "password": os.getenv("MYSQL_PASSWORD"),
         "host": os.getenv("MYSQL_HOST"),
         "port": int(os.getenv("MYSQL_PORT")),
+        "max_connections": int(os.getenv("DB_POOL_MAX_CONNECTIONS", "20")),
+        "stale_timeout": int(os.getenv("DB_POOL_STALE_TIMEOUT", "300")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
     }
 else:
     DATABASE = {
@@ -25,4 +28,149 @@ else:
         "password": os.getenv("MYSQL_PASSWORD"),
         "host": os.getenv("MYSQL_HOST"),
         "port": int(os.getenv("MYSQL_PORT")),
+        "max_connections": int(os.getenv("DB_POOL_MAX_CONNECTIONS", "20")),
+        "stale_timeout": int(os.getenv("DB_POOL_STALE_TIMEOUT", "300")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
     }
+
+PAGINATION = {
+    "default_limit": int(os.getenv("PAGINATION_DEFAULT_LIMIT", "50")),
+    "max_limit": int(os.getenv("PAGINATION_MAX_LIMIT", "500")),
+}
+
+STREAMING = {
+    "chunk_rows": int(os.getenv("STREAMING_CHUNK_ROWS", "500")),
+}
+
+ASYNC_DATABASE = {
+    "enabled": os.getenv("ASYNC_DB_ENABLED", "true").lower() == "true",
+    "min_connections": int(os.getenv("ASYNC_DB_MIN_CONNECTIONS", "1")),
+    "max_connections": int(os.getenv("ASYNC_DB_MAX_CONNECTIONS", "20")),
+}
+
+BULK = {
+    "batch_size": int(os.getenv("BULK_BATCH_SIZE", "500")),
+    "max_items": int(os.getenv("BULK_MAX_ITEMS", "5000")),
+}
+
+CACHE = {
+    # 'memory' o 'redis'; con varios workers de Gunicorn el valor por defecto es 'redis'
+    "backend": os.getenv("CACHE_BACKEND") or "memory",
+    "max_entries": int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+    "ttl": float(os.getenv("CACHE_TTL_SECONDS", "300")),
+    "redis_url": os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+}
+
+_REFERENCE_POLICY = f"private, max-age={os.getenv('HTTP_CACHE_REFERENCE_MAX_AGE', '60')}"
+
+HTTP_CACHE = {
+    # Política por defecto: el cliente debe revalidar con If-None-Match en cada lectura
+    "default_policy": os.getenv("HTTP_CACHE_DEFAULT_POLICY", "private, no-cache"),
+    "policies": {
+        "/api/recipes": _REFERENCE_POLICY,
+        "/api/category-recipes": _REFERENCE_POLICY,
+        "/api/category-ingredients": _REFERENCE_POLICY,
+        "/api/roles": _REFERENCE_POLICY,
+        "/api/stats": "no-store",
+        "/metrics": "no-store",
+        "/healthz": "no-store",
+        "/readyz": "no-store",
+    },
+    # Cada worker reutiliza la versión de los datos este tiempo; sus propias escrituras la renuevan
+    "version_seconds": float(os.getenv("HTTP_CACHE_VERSION_SECONDS", "1")),
+}
+
+EXPIRY_SCAN = {
+    "enabled": os.getenv("EXPIRY_SCAN_ENABLED", "true").lower() == "true",
+    # Con varios workers, solo el que tiene el lock sobre este archivo ejecuta el job
+    "lock_file": os.getenv("EXPIRY_SCAN_LOCK_FILE") or None,
+    "interval_seconds": float(os.getenv("EXPIRY_SCAN_INTERVAL_SECONDS", "3600")),
+    "days_ahead": int(os.getenv("EXPIRY_SCAN_DAYS_AHEAD", "3")),
+    "batch_size": int(os.getenv("EXPIRY_SCAN_BATCH_SIZE", "1000")),
+}
+
+RECIPE_INDEX = {
+    "max_age_seconds": float(os.getenv("RECIPE_INDEX_MAX_AGE_SECONDS", "300")),
+    "build_batch_size": int(os.getenv("RECIPE_INDEX_BUILD_BATCH_SIZE", "10000")),
+    "default_limit": int(os.getenv("RECIPE_INDEX_DEFAULT_LIMIT", "10")),
+    "max_limit": int(os.getenv("RECIPE_INDEX_MAX_LIMIT", "100")),
+}
+
+COMPRESSION = {
+    "enabled": os.getenv("COMPRESSION_ENABLED", "true").lower() == "true",
+    # Orden de preferencia; "br" se ignora si el paquete brotli no está instalado
+    "encodings": [name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",")
+                  if name.strip()],
+    "minimum_size": int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")),
+    "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+    # Los cuerpos más grandes se comprimen en el threadpool para no bloquear el event loop
+    "threadpool_size": int(os.getenv("COMPRESSION_THREADPOOL_SIZE", "262144")),
+    "content_types": [
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "text/",
+    ],
+}
+
+METRICS = {
+    "enabled": os.getenv("METRICS_ENABLED", "true").lower() == "true",
+    "latency_buckets": [float(bucket) for bucket in os.getenv(
+        "METRICS_LATENCY_BUCKETS",
+        "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10").split(",")],
+    "query_buckets": [float(bucket) for bucket in os.getenv(
+        "METRICS_QUERY_BUCKETS", "0,1,2,3,5,10,20,50,100").split(",")],
+}
+
+PROFILING = {
+    # Se activa por petición con `X-Profile: 1` o `?profile=1` y una API key válida
+    "enabled": os.getenv("PROFILING_ENABLED", "true").lower() == "true",
+    "interval_ms": float(os.getenv("PROFILING_INTERVAL_MS", "5")),
+    "max_profiles": int(os.getenv("PROFILING_MAX_PROFILES", "20")),
+    # Si se define, cada perfil también se guarda como `<id>.folded` y `<id>.json`,
+    # y cualquier worker puede leerlo
+    "directory": os.getenv("PROFILING_DIRECTORY") or None,
+}
+
+SLOW_QUERIES = {
+    "enabled": os.getenv("SLOW_QUERY_ENABLED", "true").lower() == "true",
+    "threshold_ms": float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")),
+    # El plan se captura con EXPLAIN la primera vez que una forma de consulta supera el umbral
+    "explain": os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true",
+    "max_shapes": int(os.getenv("SLOW_QUERY_MAX_SHAPES", "100")),
+}
+
+SERVER = {
+    "bind": os.getenv("SERVER_BIND", "0.0.0.0:80"),
+    # 0 usa un worker por CPU; cada worker abre su propio pool de DB_POOL_MAX_CONNECTIONS
+    "workers": int(os.getenv("SERVER_WORKERS", "0")) or os.cpu_count() or 1,
+    # Reciclar cada worker tras N peticiones (con jitter para no reiniciarlos a la vez)
+    "max_requests": int(os.getenv("SERVER_MAX_REQUESTS", "10000")),
+    "max_requests_jitter": int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "1000")),
+    # Segundos para terminar las peticiones en curso tras SIGTERM
+    "graceful_timeout": int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+    "timeout": int(os.getenv("SERVER_TIMEOUT", "60")),
+    "keepalive": int(os.getenv("SERVER_KEEPALIVE", "5")),
+    "preload": os.getenv("SERVER_PRELOAD", "true").lower() == "true",
+}
+
+HEALTH = {
+    # Reintentos de la conexión inicial a MySQL: backoff exponencial con jitter
+    "db_retry_initial_seconds": float(os.getenv("HEALTH_DB_RETRY_INITIAL_SECONDS", "0.5")),
+    "db_retry_max_seconds": float(os.getenv("HEALTH_DB_RETRY_MAX_SECONDS", "30")),
+    # /readyz reutiliza el último ping a la base de datos durante estos segundos
+    "ready_cache_seconds": float(os.getenv("HEALTH_READY_CACHE_SECONDS", "2")),
+    # Presupuesto de importación + arranque de un worker
+    "startup_budget_seconds": float(os.getenv("STARTUP_BUDGET_SECONDS", "3")),
+}
+
+API_KEYS = {
+    # Las claves de la tabla api_keys se recargan en memoria cada N segundos
+    "cache_seconds": float(os.getenv("API_KEYS_CACHE_SECONDS", "30")),
+    # Límite por defecto de las claves sin ratePerSecond/burstApiKey (por proceso worker)
+    "rate_per_second": float(os.getenv("API_KEYS_RATE_PER_SECOND", "10")),
+    "burst": int(os.getenv("API_KEYS_BURST", "20")),
+    # Límite de la clave API_KEY del entorno, con todos los permisos; 0 sin límite
+    "legacy_rate_per_second": float(os.getenv("API_KEY_RATE_PER_SECOND", "0")),
+}
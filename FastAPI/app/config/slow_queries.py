@@ -0,0 +1,249 @@
+"""
+This module contains the slow query log of the data layer.
+
+Every statement slower than `SLOW_QUERY_THRESHOLD_MS` is logged with the
+service function that issued it, its parameters (redacted) and its duration.
+Statements are aggregated by shape, the SQL with its literals and parameter
+lists collapsed, so the same query with other IDs counts as one offender. The
+`EXPLAIN` plan of a shape is captured the first time it crosses the threshold.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+from contextvars import ContextVar
+from app.config.settings import SLOW_QUERIES
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SERVICES_DIR = os.path.join(_APP_DIR, "services")
+_DATA_LAYER_DIRS = (os.path.join(_APP_DIR, "config"), os.path.join(_APP_DIR, "helpers"))
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_MAX_PARAMS = 20
+
+_caller = ContextVar("slow_query_caller", default=None)
+
+
+def normalize(sql: str):
+    """
+    Returns the shape of a statement.
+
+    Args:
+        sql (str): The SQL of the statement.
+
+    Returns:
+        str: The SQL with every parameter and literal replaced by `?` and the
+        lists of parameters, such as the ones of `IN`, collapsed to `(?, ...)`.
+    """
+    shape = sql.replace("%s", "?")
+    shape = _LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def redact(params):
+    """
+    Redacts the parameters of a statement.
+
+    Numbers, booleans and nulls are kept, since they are usually IDs, limits
+    and flags; every other value is replaced by its type and length. Only the
+    first parameters of a long list, such as a bulk insert, are kept.
+
+    Args:
+        params (list): The parameters of the statement.
+
+    Returns:
+        list: The redacted parameters.
+    """
+    params = list(params or ())
+    redacted = []
+    for value in params[:_MAX_PARAMS]:
+        if value is None or isinstance(value, (bool, int, float)):
+            redacted.append(value)
+        elif isinstance(value, (str, bytes)):
+            redacted.append(f"<{type(value).__name__}:{len(value)}>")
+        else:
+            redacted.append(f"<{type(value).__name__}>")
+    if len(params) > _MAX_PARAMS:
+        redacted.append(f"<{len(params) - _MAX_PARAMS} more>")
+    return redacted
+
+
+def find_caller():
+    """
+    Returns the function that issued the statement being run.
+
+    Returns:
+        str: The `module.function` of the innermost service frame, or of the
+        innermost application frame outside the data layer, or the caller
+        remembered before the statement was handed to the threadpool, or "unknown".
+    """
+    frame = sys._getframe(1)  # pylint: disable=protected-access
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR):
+            name = f"{os.path.splitext(os.path.basename(filename))[0]}.{frame.f_code.co_name}"
+            if filename.startswith(_SERVICES_DIR):
+                return name
+            if fallback is None and not filename.startswith(_DATA_LAYER_DIRS):
+                fallback = name
+        frame = frame.f_back
+    return _caller.get() or fallback or "unknown"
+
+
+def remember_caller():
+    """
+    Remembers the caller of a query about to be handed to the threadpool,
+    whose threads do not see the stack of the coroutine awaiting them.
+
+    Returns:
+        Token: The token needed to forget the caller.
+    """
+    return _caller.set(find_caller() if SLOW_QUERIES["enabled"] else None)
+
+
+def forget_caller(token):
+    """
+    Forgets the caller remembered by `remember_caller`.
+
+    Args:
+        token (Token): The token returned by `remember_caller`.
+    """
+    _caller.reset(token)
+
+
+def is_slow(seconds: float):
+    """
+    Tells whether a statement took longer than the slow query threshold.
+
+    Args:
+        seconds (float): The time the statement took.
+
+    Returns:
+        bool: True if the statement must be recorded in the slow query log.
+    """
+    return SLOW_QUERIES["enabled"] and seconds * 1000 >= SLOW_QUERIES["threshold_ms"]
+
+
+def can_explain(sql: str):
+    """
+    Tells whether the plan of a statement can be captured with `EXPLAIN`.
+
+    Args:
+        sql (str): The SQL of the statement.
+
+    Returns:
+        bool: True for the `SELECT` statements, which `EXPLAIN` never runs.
+    """
+    return SLOW_QUERIES["explain"] and sql.lstrip()[:6].upper() == "SELECT"
+
+
+class SlowQueryLog:
+    """Aggregates the slow statements by shape, keeping the costliest shapes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shapes = {}
+
+    def needs_plan(self, sql: str):
+        """
+        Tells whether the plan of a slow statement must be captured.
+
+        Args:
+            sql (str): The SQL of the statement.
+
+        Returns:
+            bool: True if the statement can be explained and its shape has no plan yet.
+        """
+        if not can_explain(sql):
+            return False
+        with self._lock:
+            entry = self._shapes.get(normalize(sql))
+            return entry is None or entry["plan"] is None
+
+    def record(self, sql: str, params, seconds: float, caller: str, plan=None):
+        """
+        Logs a slow statement and adds it to the aggregate of its shape.
+
+        Args:
+            sql (str): The SQL of the statement.
+            params (list): The parameters of the statement.
+            seconds (float): The time the statement took.
+            caller (str): The function that issued the statement.
+            plan (list): The rows of its `EXPLAIN`, if captured.
+        """
+        shape = normalize(sql)
+        milliseconds = seconds * 1000
+        redacted = redact(params)
+        logger.warning("Slow query (%.1f ms) from %s: %s params=%s",
+                       milliseconds, caller, shape, redacted)
+        if plan is not None:
+            logger.warning("Plan of the slow query from %s: %s", caller, plan)
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= SLOW_QUERIES["max_shapes"]:
+                    cheapest = min(self._shapes, key=lambda key: self._shapes[key]["total_ms"])
+                    del self._shapes[cheapest]
+                entry = self._shapes[shape] = {
+                    "shape": shape, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "callers": {}, "last_params": None, "plan": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += milliseconds
+            entry["max_ms"] = max(entry["max_ms"], milliseconds)
+            entry["callers"][caller] = entry["callers"].get(caller, 0) + 1
+            entry["last_params"] = redacted
+            if plan is not None:
+                entry["plan"] = plan
+
+    def top(self, limit: int, order: str = "total_ms"):
+        """
+        Returns the worst shapes.
+
+        Args:
+            limit (int): The maximum number of shapes to return.
+            order (str): "total_ms", "max_ms" or "count".
+
+        Returns:
+            list: The shapes with their count, total, average and maximum
+            duration, callers, last redacted parameters and plan.
+        """
+        with self._lock:
+            entries = [{**entry, "callers": dict(entry["callers"])}
+                       for entry in self._shapes.values()]
+        entries.sort(key=lambda entry: entry[order], reverse=True)
+        for entry in entries:
+            entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        return entries[:limit]
+
+    def clear(self):
+        """Forgets every recorded shape."""
+        with self._lock:
+            self._shapes.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def plan_rows(description, rows):
+    """
+    Builds the rows of an `EXPLAIN` from the description and rows of its cursor.
+
+    Args:
+        description (tuple): The DB-API description of the cursor.
+        rows (list): The rows fetched from the cursor.
+
+    Returns:
+        list: One dictionary per row of the plan.
+    """
+    columns = [column[0] for column in description]
+    return [dict(zip(columns, row)) for row in rows]
@@ -1,37 +1,353 @@
-"""This module implements the FastAPI router for the reservation endpoints."""
-from dotenv import load_dotenv
+"""
+This module implements the API key authentication, scopes and rate limits.
+
+Client keys live in the `api_keys` table, which only stores their SHA-256
+digest. The active keys are kept in memory and reloaded in the background
+every `API_KEYS_CACHE_SECONDS`, so validating a key is a hash and a dictionary
+lookup: unknown keys never reach the database. Each key has a token bucket,
+refilled at its rate up to its burst, which is checked in the same dependency;
+a client over its quota gets a 429 before any connection is checked out.
+The key of the `API_KEY` variable keeps working, with every scope.
+
+Usage:
+    python -m app.helpers.api_key_auth create NAME [--scopes read,write] [--rate 5] [--burst 10]
+    python -m app.helpers.api_key_auth revoke NAME
+    python -m app.helpers.api_key_auth list
+"""
+import argparse
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import logging
+import math
 import os
-from fastapi import HTTPException, Security, status
+import secrets
+import sys
+import time
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, Security, status
 from fastapi.security.api_key import APIKeyHeader
+from starlette.concurrency import run_in_threadpool
+from app.config.database import ApiKey, database
+from app.config.settings import API_KEYS
 
 
 load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
 API_KEY_NAME = "x-api-key"
+SCOPES = ("read", "write", "admin")
+# Methods that only need the read scope; every other method needs write.
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
 
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
+logger = logging.getLogger(__name__)
+
+
+def hash_api_key(api_key: str):
+    """
+    Returns the digest stored for an API key.
+
+    The keys are random 256-bit tokens, so a fast hash is enough: there is no
+    password to guess, and validation must stay cheap on every request.
+
+    Args:
+        api_key (str): The API key.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the key.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average and `burst` at once.
+
+    Attributes:
+        rate (float): The tokens added per second.
+        burst (int): The maximum number of tokens.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def take(self):
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds until a token is available.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class ClientKey:
+    """
+    Represents a valid API key in memory.
+
+    Attributes:
+        name (str): The name of the client.
+        digest (str): The digest of the key.
+        scopes (frozenset): The scopes granted to the key.
+        bucket (TokenBucket): The rate limit of the key, or None if it has none.
+    """
+
+    def __init__(self, name: str, digest: str, scopes, rate: float, burst: int):
+        self.name = name
+        self.digest = digest
+        self.scopes = frozenset(scopes)
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+
+    def allows(self, scope: str):
+        """Tells whether the key grants a scope; admin grants every scope."""
+        return scope in self.scopes or "admin" in self.scopes
+
+
+class ApiKeyStore:
+    """
+    Keeps the active API keys in memory, reloading them from the database.
+
+    The first request waits for the first load; afterwards a stale cache keeps
+    serving while it is reloaded in the background. If the database cannot be
+    read, the keys loaded last are kept and the load is retried a cache period
+    later, so an outage never turns into a query per request.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self._loaded_at = None
+        self._refresh = None
+        self._legacy = None
+        if API_KEY:
+            self._legacy = ClientKey("API_KEY", hash_api_key(API_KEY), SCOPES,
+                                     API_KEYS["legacy_rate_per_second"],
+                                     math.ceil(API_KEYS["legacy_rate_per_second"]))
+        self._stats = {"loads": 0, "load_failures": 0, "last_error": None,
+                       "invalid": 0, "forbidden": 0, "limited": 0}
+
+    def _load(self):
+        # The database the model is bound to, which is not MySQL in the benchmarks.
+        with ApiKey._meta.database.connection_context():  # pylint: disable=protected-access
+            rows = list(ApiKey.select().where(ApiKey.activeApiKey))
+        keys = {}
+        for row in rows:
+            rate = API_KEYS["rate_per_second"] if row.ratePerSecond is None else row.ratePerSecond
+            burst = API_KEYS["burst"] if row.burstApiKey is None else row.burstApiKey
+            scopes = [scope.strip() for scope in row.scopesApiKey.split(",") if scope.strip()]
+            key = ClientKey(row.nameApiKey, row.hashApiKey, scopes, rate, burst)
+            # A reload must not refill the bucket of a client that keeps its limits.
+            previous = self._keys.get(row.hashApiKey)
+            if previous and previous.bucket and key.bucket and (
+                    previous.bucket.rate, previous.bucket.burst) == (rate, key.bucket.burst):
+                key.bucket = previous.bucket
+            keys[row.hashApiKey] = key
+        return keys
+
+    async def _reload(self):
+        try:
+            self._keys = await run_in_threadpool(self._load)
+            self._stats["loads"] += 1
+            self._stats["last_error"] = None
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._stats["load_failures"] += 1
+            self._stats["last_error"] = str(exc)
+            logger.warning("Could not load the API keys, keeping %d cached: %s",
+                           len(self._keys), exc)
+        finally:
+            self._loaded_at = time.monotonic()
+            self._refresh = None
+
+    async def refresh(self):
+        """Reloads the keys if the cache is stale, waiting only for the first load."""
+        if self._loaded_at is not None and \
+                time.monotonic() - self._loaded_at < API_KEYS["cache_seconds"]:
+            return
+        if self._refresh is None:
+            # A fresh context: the reload must not use the connection or the
+            # query counters of the request that happened to trigger it.
+            self._refresh = asyncio.create_task(self._reload(), name="api_keys_reload",
+                                                context=contextvars.Context())
+        if self._loaded_at is None:
+            await asyncio.shield(self._refresh)
+
+    def lookup(self, api_key: str):
+        """
+        Finds the key a client sent, without touching the database.
 
+        Args:
+            api_key (str): The API key sent by the client.
 
-async def get_api_key(api_key_header: str = Security(api_key_header)):
+        Returns:
+            ClientKey: The matching key, or None if it is not valid.
+        """
+        if not api_key:
+            return None
+        digest = hash_api_key(api_key)
+        if self._legacy and hmac.compare_digest(digest, self._legacy.digest):
+            return self._legacy
+        key = self._keys.get(digest)
+        if key is not None and hmac.compare_digest(digest, key.digest):
+            return key
+        return None
+
+    def authorize(self, api_key: str, scope: str):
+        """
+        Validates a key, checks it grants a scope and charges its rate limit.
+
+        Args:
+            api_key (str): The API key sent by the client.
+            scope (str): The scope the request needs.
+
+        Returns:
+            ClientKey: The key of the client.
+
+        Raises:
+            HTTPException: 403 if the key is invalid or lacks the scope, 429
+            with `Retry-After` if the client is over its rate limit. A request
+            refused for its scope does not use up the client's limit.
+        """
+        key = self.lookup(api_key)
+        if key is None:
+            self._stats["invalid"] += 1
+            raise _error(status.HTTP_403_FORBIDDEN, "Unauthorized")
+        if not key.allows(scope):
+            self._stats["forbidden"] += 1
+            raise _error(status.HTTP_403_FORBIDDEN, f"The API key lacks the {scope} scope")
+        wait = key.bucket.take() if key.bucket else 0.0
+        if wait:
+            self._stats["limited"] += 1
+            raise _error(status.HTTP_429_TOO_MANY_REQUESTS, "Too many requests",
+                         {"Retry-After": str(math.ceil(wait))})
+        return key
+
+    def stats(self):
+        """
+        Returns the state of the key cache and the rejected requests.
+
+        Returns:
+            dict: The cached keys, the age of the cache, the loads and the
+            requests rejected as invalid, forbidden or over their limit.
+        """
+        age = None if self._loaded_at is None else time.monotonic() - self._loaded_at
+        return {"keys": len(self._keys), "legacy_key": self._legacy is not None,
+                "cache_age_seconds": None if age is None else round(age, 3), **self._stats}
+
+
+def _error(status_code: int, message: str, headers: dict = None):
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "status": False,
+            "status_code": status_code,
+            "message": message,
+        },
+        headers=headers,
+    )
+
+
+api_keys = ApiKeyStore()
+
+
+def is_valid_api_key(api_key: str, scope: str = "read"):
+    """
+    Tells whether an API key grants a scope, from the cached keys only.
+    Parameters:
+        api_key (str): The API key sent by the client.
+        scope (str): The scope the key must grant.
+    Returns:
+        bool: True if the key is valid and grants the scope.
+    """
+    key = api_keys.lookup(api_key)
+    return key is not None and key.allows(scope)
+
+
+async def get_api_key(request: Request, api_key_header: str = Security(api_key_header)):
     """
     Retrieves the API key from the provided header and validates it.
+    Reads need the read scope and every other method the write scope.
     Parameters:
+        request (Request): The request being authorized.
         api_key_header (str): The API key provided in the header.
     Returns:
         str: The validated API key.
     Raises:
-        HTTPException: If the provided API key is invalid or unauthorized.
-    """
-
-    if api_key_header == API_KEY:
-        return api_key_header
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "status": False,
-                "status_code": status.HTTP_403_FORBIDDEN,
-                "message": "Unauthorized",
-            },
-        )
+        HTTPException: If the provided API key is invalid, unauthorized or over its rate limit.
+    """
+    await api_keys.refresh()
+    scope = "read" if request.method in READ_METHODS else "write"
+    api_keys.authorize(api_key_header, scope)
+    return api_key_header
+
+
+async def get_admin_api_key(api_key_header: str = Security(api_key_header)):
+    """
+    Retrieves the API key from the provided header and checks it grants the admin scope.
+    Parameters:
+        api_key_header (str): The API key provided in the header.
+    Returns:
+        str: The validated API key.
+    Raises:
+        HTTPException: If the provided API key is invalid, not admin or over its rate limit.
+    """
+    await api_keys.refresh()
+    api_keys.authorize(api_key_header, "admin")
+    return api_key_header
+
+
+def main(argv=None):
+    """
+    Runs the API keys command line.
+
+    Args:
+        argv (list): The command line arguments, defaults to `sys.argv`.
+
+    Returns:
+        int: The exit code of the command.
+    """
+    parser = argparse.ArgumentParser(description="Client API keys.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="create a key and print it once")
+    create.add_argument("name")
+    create.add_argument("--scopes", default="read")
+    create.add_argument("--rate", type=float, help="requests per second, 0 for no limit")
+    create.add_argument("--burst", type=int)
+    commands.add_parser("revoke", help="deactivate the keys of a client").add_argument("name")
+    commands.add_parser("list", help="list the keys without their secret")
+    args = parser.parse_args(argv)
+    with database.connection_context():
+        if args.command == "create":
+            scopes = [scope.strip() for scope in args.scopes.split(",") if scope.strip()]
+            unknown = set(scopes) - set(SCOPES)
+            if unknown:
+                parser.error(f"unknown scopes: {', '.join(sorted(unknown))}")
+            api_key = secrets.token_urlsafe(32)
+            ApiKey.create(nameApiKey=args.name, hashApiKey=hash_api_key(api_key),
+                          scopesApiKey=",".join(scopes), ratePerSecond=args.rate,
+                          burstApiKey=args.burst)
+            print(api_key)
+            return 0
+        if args.command == "revoke":
+            revoked = (ApiKey.update(activeApiKey=False)
+                       .where(ApiKey.nameApiKey == args.name).execute())
+            print(f"revoked {revoked} key(s)")
+            return 0 if revoked else 1
+        for row in ApiKey.select().order_by(ApiKey.idApiKey):
+            state = "active" if row.activeApiKey else "revoked"
+            print(f"{row.idApiKey:5d}  {row.nameApiKey:<30} {row.scopesApiKey:<18} "
+                  f"rate={row.ratePerSecond} burst={row.burstApiKey} {state}")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""This module implements the batched writes used by the bulk endpoints."""
+from fastapi import HTTPException, status
+from peewee import DatabaseError
+from pydantic import ValidationError
+from app.config.settings import BULK
+
+
+def check_bulk_size(items: list):
+    """
+    Rejects bulk requests larger than the configured maximum.
+
+    Args:
+        items (list): The items of the bulk request.
+
+    Raises:
+        HTTPException: If the request holds too many items.
+    """
+    if len(items) > BULK["max_items"]:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A bulk request accepts at most {BULK['max_items']} items",
+        )
+
+
+def validate_items(items: list, schema):
+    """
+    Validates every item of a bulk request in a single pass.
+
+    Args:
+        items (list): The raw items of the request.
+        schema (BaseModel): The Pydantic model each item must match.
+
+    Returns:
+        tuple: The `(index, item)` pairs that are valid and the failures of the others.
+    """
+    valid, failed = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as exc:
+            errors = [f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                      for error in exc.errors()]
+            failed.append({"index": index, "errors": errors})
+    return valid, failed
+
+
+def merge_failures(*failures):
+    """
+    Merges the failure lists of a bulk request, ordered by item index.
+
+    Args:
+        failures (list): The failure lists to merge.
+
+    Returns:
+        list: Every failure sorted by the index of its item.
+    """
+    return sorted((item for group in failures for item in group), key=lambda item: item["index"])
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def bulk_insert(model, rows: list, batch_size: int = None):
+    """
+    Inserts rows with `insert_many` inside a single transaction.
+
+    Each batch runs in a savepoint; if a batch is rejected by the database its
+    rows are retried one by one so the failure report names the exact items.
+
+    Args:
+        model (Model): The peewee model to insert into.
+        rows (list): The `(index, row)` pairs to insert, rows being column dictionaries.
+        batch_size (int): The number of rows per INSERT, defaults to the configured size.
+
+    Returns:
+        tuple: The number of inserted rows and the failures.
+    """
+    db = model._meta.database  # pylint: disable=protected-access
+    created, failed = 0, []
+    with db.atomic():
+        for batch in _batches(rows, batch_size or BULK["batch_size"]):
+            try:
+                with db.atomic():
+                    model.insert_many([row for _, row in batch]).execute()
+                created += len(batch)
+            except DatabaseError:
+                for index, row in batch:
+                    try:
+                        with db.atomic():
+                            model.insert(row).execute()
+                        created += 1
+                    except DatabaseError as exc:
+                        failed.append({"index": index, "errors": [str(exc)]})
+    return created, failed
+
+
+def _existing_ids(model, ids):
+    """Returns the given keys that exist, locking their rows where the database supports it."""
+    db = model._meta.database  # pylint: disable=protected-access
+    key = model._meta.primary_key  # pylint: disable=protected-access
+    found = set()
+    for batch in _batches(list(ids), BULK["batch_size"]):
+        query = model.select(key).where(key.in_(batch))
+        if db.for_update:
+            query = query.for_update()
+        found.update(row[0] for row in query.tuples())
+    return found
+
+
+def bulk_update(model, records: list, fields: list, batch_size: int = None):
+    """
+    Updates existing rows with `bulk_update` inside a single transaction.
+
+    The rows are looked up in the same transaction, locked on MySQL, so a row
+    deleted concurrently is reported as not found instead of counted as updated.
+
+    Args:
+        model (Model): The peewee model to update.
+        records (list): The `(index, instance)` pairs holding the new values and primary key.
+        fields (list): The fields to update.
+        batch_size (int): The number of rows per UPDATE, defaults to the configured size.
+
+    Returns:
+        tuple: The number of updated rows and the failures.
+    """
+    db = model._meta.database  # pylint: disable=protected-access
+    with db.atomic():
+        existing = _existing_ids(model, [record.get_id() for _, record in records])
+        found = [record for _, record in records if record.get_id() in existing]
+        if found:
+            model.bulk_update(found, fields=fields, batch_size=batch_size or BULK["batch_size"])
+    failed = [{"index": index, "errors": ["not found"]}
+              for index, record in records if record.get_id() not in existing]
+    return len(found), failed
+
+
+def bulk_delete(model, ids: list, batch_size: int = None):
+    """
+    Deletes rows by primary key inside a single transaction.
+
+    The rows are looked up and locked in the same transaction as the delete.
+
+    Args:
+        model (Model): The peewee model to delete from.
+        ids (list): The primary keys of the rows to delete.
+        batch_size (int): The number of keys per DELETE, defaults to the configured size.
+
+    Returns:
+        tuple: The number of deleted rows and the failures.
+    """
+    db = model._meta.database  # pylint: disable=protected-access
+    key = model._meta.primary_key  # pylint: disable=protected-access
+    deleted = 0
+    with db.atomic():
+        existing = _existing_ids(model, ids)
+        for batch in _batches(sorted(existing), batch_size or BULK["batch_size"]):
+            deleted += model.delete().where(key.in_(batch)).execute()
+    failed = [{"index": index, "errors": ["not found"]}
+              for index, row_id in enumerate(ids) if row_id not in existing]
+    return deleted, failed
@@ -0,0 +1,248 @@
+"""This module implements the read-through cache used by the lookup services."""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import CACHE
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is only needed for the shared backend
+    redis = None
+
+CACHES = {}
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """
+    In-process cache with LRU eviction and a time to live per entry.
+
+    Attributes:
+        name (str): The name of the cache, used in the statistics.
+        blocking (bool): Whether the backend does I/O; the memory backend never does.
+    """
+
+    blocking = False
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key):
+        """
+        Returns the cached value of a key, or None if it is missing or expired.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The cached value or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting the least recently used entries when full.
+
+        Args:
+            key: The key of the value.
+            value: The value to cache.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def delete(self, key):
+        """
+        Removes a key from the cache.
+
+        Args:
+            key: The key to invalidate.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits, misses, evictions, expirations and current size.
+        """
+        with self._lock:
+            return {"backend": "memory", "size": len(self._entries), **self._counters}
+
+
+class RedisCache:
+    """
+    Cache stored in a Redis-compatible server, shared by every worker.
+
+    Values are stored as JSON, so they come back with the types of their
+    JSON representation (dates as strings), which is what the API returns.
+    When the server cannot be reached the reads miss and load from the
+    database, so the cache never fails a request.
+
+    Attributes:
+        name (str): The name of the cache, used as key prefix and in the statistics.
+        blocking (bool): Whether the backend does I/O; calls from async code are offloaded.
+    """
+
+    blocking = True
+
+    def __init__(self, name: str, url: str, ttl: float):
+        if redis is None:
+            raise RuntimeError("The redis cache backend requires the 'redis' package")
+        self.name = name
+        self._ttl = int(ttl)
+        self._client = redis.Redis.from_url(url)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "errors": 0}
+
+    def _key(self, key):
+        return f"cache:{self.name}:{key}"
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, key):
+        """
+        Returns the cached value of a key, or None if it is missing or expired.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The cached value or None.
+        """
+        try:
+            raw = self._client.get(self._key(key))
+        except redis.RedisError as exc:
+            self._count("errors")
+            logger.warning("Cache %s not reachable, reading from the database: %s", self.name, exc)
+            return None
+        if raw is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(raw)
+
+    def set(self, key, value):
+        """
+        Stores a value with the configured time to live.
+
+        Args:
+            key: The key of the value.
+            value: The value to cache.
+        """
+        try:
+            self._client.setex(self._key(key), self._ttl, json.dumps(jsonable_encoder(value)))
+        except redis.RedisError:
+            self._count("errors")
+
+    def delete(self, key):
+        """
+        Removes a key from the cache.
+
+        Args:
+            key: The key to invalidate.
+        """
+        try:
+            self._client.delete(self._key(key))
+        except redis.RedisError as exc:
+            self._count("errors")
+            logger.error("Could not invalidate %s in cache %s: %s", key, self.name, exc)
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Evictions are reported by the server and cover every cache it holds.
+
+        Returns:
+            dict: The hits, misses and errors of this worker plus the server evictions.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        try:
+            evictions = self._client.info("stats").get("evicted_keys", 0)
+        except redis.RedisError:
+            evictions = None
+        return {"backend": "redis", "evictions": evictions, **counters}
+
+
+def create_cache(name: str):
+    """
+    Creates a cache with the backend configured in the settings and registers it.
+
+    Args:
+        name (str): The name of the cache.
+
+    Returns:
+        MemoryCache | RedisCache: The new cache.
+    """
+    if CACHE["backend"] == "redis":
+        cache = RedisCache(name, CACHE["redis_url"], CACHE["ttl"])
+    else:
+        cache = MemoryCache(name, CACHE["max_entries"], CACHE["ttl"])
+    CACHES[name] = cache
+    return cache
+
+
+async def cached_async(cache, key, loader):
+    """
+    Returns a value from the cache without blocking the event loop.
+
+    Args:
+        cache (MemoryCache | RedisCache): The cache to read through.
+        key: The key of the value.
+        loader (callable): Coroutine function loading the value when it is not cached.
+
+    Returns:
+        The cached or freshly loaded value.
+    """
+    if cache.blocking:
+        value = await run_in_threadpool(cache.get, key)
+    else:
+        value = cache.get(key)
+    if value is None:
+        value = await loader()
+        if cache.blocking:
+            await run_in_threadpool(cache.set, key, value)
+        else:
+            cache.set(key, value)
+    return value
+
+
+def cache_stats():
+    """
+    Returns the counters of every registered cache.
+
+    Returns:
+        dict: The statistics of each cache by name.
+    """
+    return {name: cache.stats() for name, cache in CACHES.items()}
@@ -0,0 +1,270 @@
+"""This module implements the response compression shared by every router."""
+import threading
+import time
+import zlib
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from app.config.settings import COMPRESSION
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+class _GzipStream:
+    """Compresses a response body with gzip, one body message at a time."""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(COMPRESSION["gzip_level"], zlib.DEFLATED, 31)
+
+    def compress(self, data, final):
+        """
+        Compresses the next part of the body.
+
+        A sync flush ends every chunk on a byte boundary, so the client can
+        decode each streamed chunk as soon as it arrives.
+
+        Args:
+            data (bytes): The next part of the body.
+            final (bool): Whether it is the last part of the body.
+
+        Returns:
+            bytes: The compressed bytes to send for this part.
+        """
+        body = self._compressor.compress(data)
+        return body + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliStream:
+    """Compresses a response body with brotli, one body message at a time."""
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=COMPRESSION["brotli_quality"])
+
+    def compress(self, data, final):
+        """
+        Compresses the next part of the body, flushing it so it can be decoded on arrival.
+
+        Args:
+            data (bytes): The next part of the body.
+            final (bool): Whether it is the last part of the body.
+
+        Returns:
+            bytes: The compressed bytes to send for this part.
+        """
+        body = self._compressor.process(data)
+        return body + (self._compressor.finish() if final else self._compressor.flush())
+
+
+_STREAMS = {"gzip": _GzipStream}
+if brotli is not None:
+    _STREAMS["br"] = _BrotliStream
+
+
+def available_encodings():
+    """
+    Returns the configured encodings this process can produce, in order of preference.
+
+    Returns:
+        list: The content codings, such as "br" and "gzip".
+    """
+    return [name for name in COMPRESSION["encodings"] if name in _STREAMS]
+
+
+def choose_encoding(accept_encoding: str):
+    """
+    Picks the content coding of a response from the Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header sent by the client.
+
+    Returns:
+        str: The preferred coding accepted by the client, or None to send the
+        body as is.
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for name in available_encodings():
+        if accepted.get(name, accepted.get("*", 0.0)) > 0:
+            return name
+    return None
+
+
+def is_compressible(content_type: str):
+    """
+    Tells whether a content type is in the compression allowlist.
+
+    Args:
+        content_type (str): The Content-Type header of the response.
+
+    Returns:
+        bool: True if the body should be compressed.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    return any(media_type.startswith(allowed) for allowed in COMPRESSION["content_types"])
+
+
+class _CompressionStats:
+    """Thread-safe counters of the compressed responses and their cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._encodings = {}
+        self._skipped = {}
+
+    def record(self, encoding, bytes_in, bytes_out, seconds):
+        """Adds the sizes and compression time of a response."""
+        with self._lock:
+            counters = self._encodings.setdefault(
+                encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0})
+            counters["responses"] += 1
+            counters["bytes_in"] += bytes_in
+            counters["bytes_out"] += bytes_out
+            counters["seconds"] += seconds
+
+    def skip(self, reason):
+        """Counts a response sent uncompressed."""
+        with self._lock:
+            self._skipped[reason] = self._skipped.get(reason, 0) + 1
+
+    def snapshot(self):
+        """Returns the counters with the bytes saved and the cost per response."""
+        with self._lock:
+            encodings = {name: dict(counters) for name, counters in self._encodings.items()}
+            skipped = dict(self._skipped)
+        for counters in encodings.values():
+            responses = counters["responses"] or 1
+            counters["bytes_saved"] = counters["bytes_in"] - counters["bytes_out"]
+            counters["ratio"] = (round(counters["bytes_out"] / counters["bytes_in"], 3)
+                                 if counters["bytes_in"] else None)
+            counters["ms_per_response"] = round(counters.pop("seconds") * 1000 / responses, 3)
+        return {"available": available_encodings(), "encodings": encodings, "skipped": skipped}
+
+
+_stats = _CompressionStats()
+
+
+def compression_stats():
+    """
+    Returns the counters of the compression middleware.
+
+    Returns:
+        dict: The encodings available, the bytes in and out, bytes saved and
+        milliseconds of compression per response of each encoding, and the
+        number of responses sent uncompressed by reason.
+    """
+    return _stats.snapshot()
+
+
+def _compress(stream, data, final):
+    start = time.perf_counter()
+    body = stream.compress(data, final)
+    return body, time.perf_counter() - start
+
+
+class CompressionMiddleware:
+    """
+    Compresses the responses whose content type is in the allowlist with the
+    best encoding accepted by the client.
+
+    Bodies sent in one message are compressed only above the minimum size,
+    and the largest ones are compressed in the threadpool. Streaming
+    responses (sent in more than one body message) are compressed chunk by
+    chunk, flushing after each one so NDJSON rows still reach the client as
+    they are read.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION["enabled"] or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        start = {}
+        state = {"stream": None, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0}
+
+        def prepare(headers):
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            # The compressed bytes differ from the ones the ETag was computed on.
+            if etag and not etag.startswith("W/"):
+                headers["etag"] = f"W/{etag}"
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] == 304:
+                    # Keeps the ETag the client got with the compressed 200.
+                    prepare(MutableHeaders(scope=message))
+                if message["status"] in (204, 304) or "content-encoding" in headers:
+                    await send(message)
+                    return
+                if not is_compressible(headers.get("content-type", "")):
+                    _stats.skip("content_type")
+                    await send(message)
+                    return
+                start.update(message)
+                return
+            if message["type"] != "http.response.body" or (not start and not state["stream"]):
+                if start:
+                    await send(start)
+                    start.clear()
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if state["stream"] is None and not more_body:
+                await send_single(body)
+                return
+            if state["stream"] is None:
+                state["stream"] = _STREAMS[encoding]()
+                headers = MutableHeaders(scope=start)
+                prepare(headers)
+                headers["content-encoding"] = encoding
+                del headers["content-length"]
+                await send(start)
+                start.clear()
+            compressed, seconds = _compress(state["stream"], body, not more_body)
+            state["bytes_in"] += len(body)
+            state["bytes_out"] += len(compressed)
+            state["seconds"] += seconds
+            if compressed or not more_body:
+                await send({"type": "http.response.body", "body": compressed,
+                            "more_body": more_body})
+            if not more_body:
+                _stats.record(encoding, state["bytes_in"], state["bytes_out"], state["seconds"])
+
+        async def send_single(body):
+            headers = MutableHeaders(scope=start)
+            if len(body) < COMPRESSION["minimum_size"]:
+                _stats.skip("minimum_size")
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            stream = _STREAMS[encoding]()
+            if len(body) >= COMPRESSION["threadpool_size"]:
+                compressed, seconds = await run_in_threadpool(_compress, stream, body, True)
+            else:
+                compressed, seconds = _compress(stream, body, True)
+            _stats.record(encoding, len(body), len(compressed), seconds)
+            prepare(headers)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,22 @@
+"""This module implements the per-request database connection dependency."""
+from app.config.database import database
+from app.config.pool import begin_request_state, end_request_state
+
+
+async def get_db():
+    """
+    Scopes a pooled database connection to the current request.
+
+    The connection is checked out lazily by peewee on the first query of the
+    request and returned to the pool once the response has been produced.
+
+    Yields:
+        MonitoredPooledMySQLDatabase: The database bound to the request.
+    """
+    token = begin_request_state()
+    try:
+        yield database
+    finally:
+        if not database.is_closed():
+            database.close()
+        end_request_state(token)
@@ -0,0 +1,127 @@
+"""
+This module implements the sparse fieldsets (`?fields=`) and the embedded
+related resources (`?expand=`) of the read endpoints.
+
+A list screen usually needs a couple of columns of each row, not the long
+text ones. Each service declares a `FieldMap` from the names it returns to the
+model columns they are read from, so a `fields` parameter narrows both the
+`SELECT` column list and the dictionaries encoded to JSON. An `expand`
+parameter embeds related rows, which the service loads in one batched query
+per expansion, whatever the number of rows of the page.
+"""
+from typing import Optional
+from fastapi import HTTPException, Query
+
+
+class FieldMap:
+    """
+    Maps the names returned to the client to the model columns they are read from.
+
+    The primary key is always selected and returned as `id`, since the keyset
+    cursors and the clients need it to address the rows.
+    """
+
+    def __init__(self, key, **fields):
+        self.key = key
+        self.fields = {"id": key, **fields}
+
+    def parse(self, raw):
+        """
+        Parses a comma-separated list of field names.
+
+        Args:
+            raw (str): The requested names, or None for every field.
+
+        Returns:
+            tuple: The requested names, with `id` first, or None for every field.
+
+        Raises:
+            ValueError: If a name is not a field of the resource.
+        """
+        if raw is None:
+            return None
+        names = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = sorted(set(names) - set(self.fields))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. "
+                             f"Available fields: {', '.join(self.fields)}")
+        return tuple(dict.fromkeys(["id", *names]))
+
+    def project(self, names, serializer):
+        """
+        Builds the select query and the serializer of the requested fields.
+
+        Args:
+            names (tuple): The names returned by `parse`, or None for every field.
+            serializer (callable): The serializer of the full record.
+
+        Returns:
+            tuple: The `ModelSelect` reading only the needed columns and the
+            serializer building only the requested names.
+        """
+        model = self.key.model
+        if names is None:
+            return model.select(), serializer
+        columns = {name: self.fields[name] for name in names}
+        query = model.select(*{field.name: field for field in columns.values()}.values())
+        return query, lambda row: {name: getattr(row, field.name)
+                                   for name, field in columns.items()}
+
+    @staticmethod
+    def pick(item, names):
+        """
+        Keeps the requested names of a dictionary already serialized, such as a cached one.
+
+        Args:
+            item (dict): The full dictionary of a record.
+            names (tuple): The names returned by `parse`, or None for every field.
+
+        Returns:
+            dict: The requested part of the dictionary.
+        """
+        if names is None:
+            return item
+        return {name: item[name] for name in names}
+
+
+def fields_param(field_map):
+    """
+    Creates the dependency reading the `fields` parameter of a resource.
+
+    Args:
+        field_map (FieldMap): The fields of the resource.
+
+    Returns:
+        callable: A dependency returning the parsed names, which answers
+        400 Bad Request when a name is unknown.
+    """
+    def get_fields(fields: Optional[str] = Query(None, max_length=500)):
+        try:
+            return field_map.parse(fields)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return get_fields
+
+
+def expand_param(names):
+    """
+    Creates the dependency reading the `expand` parameter of a resource.
+
+    Args:
+        names (tuple): The related resources that can be embedded.
+
+    Returns:
+        callable: A dependency returning the requested names, in the order of
+        `names`, which answers 400 Bad Request when a name is unknown.
+    """
+    def get_expand(expand: Optional[str] = Query(None, max_length=200)):
+        if expand is None:
+            return ()
+        requested = {name.strip() for name in expand.split(",") if name.strip()}
+        unknown = sorted(requested - set(names))
+        if unknown:
+            raise HTTPException(status_code=400,
+                                detail=f"Unknown expansions: {', '.join(unknown)}. "
+                                       f"Available expansions: {', '.join(names)}")
+        return tuple(name for name in names if name in requested)
+    return get_expand
@@ -0,0 +1,273 @@
+"""This module implements the conditional GET handling shared by every router."""
+import functools
+import hashlib
+import logging
+import threading
+import time
+from fastapi import HTTPException, Request
+from peewee import DatabaseError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from app.config.database import DATA_VERSION_NAME, DataVersion
+from app.config.settings import HTTP_CACHE
+
+logger = logging.getLogger(__name__)
+# The data version last read by this worker and when, reused for `version_seconds`.
+_version = {"value": None, "read_at": 0.0}
+_version_lock = threading.Lock()
+
+
+def cache_control_for(path: str):
+    """
+    Returns the Cache-Control policy of a path, using its longest configured prefix.
+
+    Args:
+        path (str): The path of the request.
+
+    Returns:
+        str: The Cache-Control header value.
+    """
+    matches = [prefix for prefix in HTTP_CACHE["policies"] if path.startswith(prefix)]
+    if not matches:
+        return HTTP_CACHE["default_policy"]
+    return HTTP_CACHE["policies"][max(matches, key=len)]
+
+
+def is_no_store(policy: str):
+    """
+    Tells whether a Cache-Control policy forbids keeping the response.
+
+    Args:
+        policy (str): The Cache-Control header value.
+
+    Returns:
+        bool: True if the response must never be revalidated from a cache.
+    """
+    return "no-store" in policy
+
+
+def read_data_version():
+    """
+    Reads the counter bumped after every write.
+
+    Returns:
+        int: The current data version, or None if the counter is not available.
+    """
+    try:
+        row = DataVersion.get_or_none(DataVersion.nameVersion == DATA_VERSION_NAME)
+    except DatabaseError as exc:
+        logger.warning("Data version not available, ETags fall back to the body: %s", exc)
+        return None
+    return None if row is None else row.version
+
+
+def current_data_version():
+    """
+    Returns the data version, reading it at most once per `HTTP_CACHE_VERSION_SECONDS`.
+
+    A write handled by this worker forgets the version at once; a write
+    handled by another worker is seen within that window.
+
+    Returns:
+        int: The data version, or None if the counter is not available.
+    """
+    with _version_lock:
+        value, read_at = _version["value"], _version["read_at"]
+    if value is not None and time.monotonic() - read_at < HTTP_CACHE["version_seconds"]:
+        return value
+    value = read_data_version()
+    with _version_lock:
+        _version.update(value=value, read_at=time.monotonic())
+    return value
+
+
+def bump_data_version():
+    """
+    Moves the data version forward so the validators handed out before a write stop matching.
+
+    It runs on the caller's connection, which must be open, and inside the
+    caller's transaction if there is one. A missing counter never fails the write.
+    """
+    database = DataVersion._meta.database  # pylint: disable=protected-access
+    try:
+        with database.atomic():
+            (DataVersion
+             .update(version=DataVersion.version + 1)
+             .where(DataVersion.nameVersion == DATA_VERSION_NAME)
+             .execute())
+    except DatabaseError as exc:
+        logger.warning("Could not bump the data version after a write: %s", exc)
+    with _version_lock:
+        _version["value"] = None
+
+
+def bumps_data_version(func):
+    """
+    Bumps the data version once a write service has succeeded.
+
+    A write that fails raises, after its transaction was rolled back, and
+    leaves the version unchanged. The bump is not part of the service's own
+    transaction: the services invalidate their caches before returning, and
+    a reader refilling a cache before the commit would keep the old row.
+
+    Args:
+        func (callable): The write service.
+
+    Returns:
+        callable: The service bumping the version after it returns.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        bump_data_version()
+        return result
+    return wrapper
+
+
+def version_etag(version: int, request: Request):
+    """
+    Builds the weak ETag of a read from the data version and what selects the representation.
+
+    Args:
+        version (int): The current data version.
+        request (Request): The read request.
+
+    Returns:
+        str: The ETag value.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in (request.url.path, request.url.query, request.headers.get("accept", "")):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return f'W/"{version}-{digest.hexdigest()}"'
+
+
+async def check_not_modified(request: Request):
+    """
+    Answers `304 Not Modified` before the handler runs when the client holds the current data.
+
+    The validator is the data version, a single-row lookup shared by the
+    requests of a short window, so a matching poll skips the queries and the
+    serialization of the handler. It runs after the
+    API key dependency, so rejected clients never get a 304. The ETag is kept
+    in the request state for `ConditionalRequestMiddleware` to send.
+
+    Args:
+        request (Request): The incoming request.
+
+    Raises:
+        HTTPException: A 304 response when the If-None-Match header matches.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return
+    policy = cache_control_for(request.url.path)
+    if is_no_store(policy):
+        return
+    version = await run_in_threadpool(current_data_version)
+    if version is None:
+        return
+    etag = version_etag(version, request)
+    request.state.etag = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(etag, if_none_match):
+        raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": policy})
+
+
+def compute_etag(body: bytes):
+    """
+    Computes a strong ETag from the content of a response body.
+
+    Args:
+        body (bytes): The response body.
+
+    Returns:
+        str: The quoted ETag value.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(etag: str, if_none_match: str):
+    """
+    Tells whether an ETag satisfies an If-None-Match header.
+
+    Weak comparison is used, as required for GET requests.
+
+    Args:
+        etag (str): The ETag of the current representation.
+        if_none_match (str): The If-None-Match header sent by the client.
+
+    Returns:
+        bool: True if the client already holds the representation.
+    """
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags:
+        return True
+    return _opaque_tag(etag) in (_opaque_tag(tag) for tag in tags)
+
+
+def _opaque_tag(tag: str):
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class ConditionalRequestMiddleware:
+    """
+    Adds ETag and Cache-Control headers to successful GET responses.
+
+    Reads validated by `check_not_modified` get its version ETag as soon as
+    they start, streams included. Other reads fall back to a hash of the body
+    and a `304 Not Modified` computed after the handler ran; their streaming
+    responses (sent in more than one body message) are passed through
+    untouched, since hashing them would mean buffering the stream. Paths with
+    a `no-store` policy, such as the metrics and health checks, never get an ETag.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        policy = cache_control_for(scope["path"])
+        if is_no_store(policy):
+            await self.app(scope, receive, send)
+            return
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = {}
+
+        async def send_conditional(message):
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    await send(message)
+                    return
+                etag = scope.get("state", {}).get("etag")
+                if etag is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers.setdefault("etag", etag)
+                    headers.setdefault("cache-control", policy)
+                    await send(message)
+                    return
+                start.update(message)
+                return
+            if not start:
+                await send(message)
+                return
+            if message.get("more_body", False):
+                await send(start)
+                start.clear()
+                await send(message)
+                return
+            headers = MutableHeaders(scope=start)
+            etag = headers.get("etag") or compute_etag(message.get("body", b""))
+            headers["etag"] = etag
+            headers.setdefault("cache-control", policy)
+            if if_none_match and etag_matches(etag, if_none_match):
+                del headers["content-length"]
+                del headers["content-type"]
+                start["status"] = 304
+                message = {"type": "http.response.body", "body": b""}
+            await send(start)
+            start.clear()
+            await send(message)
+
+        await self.app(scope, receive, send_conditional)
@@ -0,0 +1,168 @@
+"""
+This module implements the Prometheus metrics exposed on `/metrics`.
+
+Requests are labelled by router (the resource after `/api/`, such as `users`
+or `recipes`) and by route template, so the cardinality stays bounded no
+matter how many IDs are requested. The statements each request runs are
+counted by the database layer (see `app.config.pool.record_query`), which
+makes N+1 patterns visible as requests with a high query count.
+
+Under Gunicorn, `PROMETHEUS_MULTIPROC_DIR` is set and every worker writes its
+metrics to that directory, so a scrape answered by any worker reports the
+figures of all of them.
+"""
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from app.config.pool import begin_query_stats, end_query_stats
+from app.config.settings import METRICS
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled.",
+    ["router", "route", "method", "status"])
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to send the whole response.",
+    ["router", "route", "method"], buckets=METRICS["latency_buckets"])
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled.", ["router"],
+    multiprocess_mode="livesum")
+DB_QUERIES = Counter(
+    "db_queries_total", "SQL statements run while handling requests.", ["router", "route"])
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements run by a single request.",
+    ["router", "route"], buckets=METRICS["query_buckets"])
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_query_duration_seconds_per_request", "Time a single request spent running SQL.",
+    ["router", "route"], buckets=METRICS["latency_buckets"])
+
+_MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+_pool = {"database": None, "gauges": {}, "published": 0.0}
+
+
+def router_of(path: str):
+    """
+    Returns the router label of a request path.
+
+    Args:
+        path (str): The path of the request.
+
+    Returns:
+        str: The segment after `/api/`, such as "users", or the first segment
+        of the other paths, or "root".
+    """
+    parts = [part for part in path.split("/") if part]
+    if parts[:1] == ["api"] and len(parts) > 1:
+        return parts[1]
+    return parts[0] if parts else "root"
+
+
+class _PoolCollector:
+    """Exposes the connection pool figures of a database as gauges when scraped."""
+
+    def __init__(self, database):
+        self._database = database
+
+    def collect(self):
+        """Yields one gauge per pool figure."""
+        if not hasattr(self._database, "stats"):
+            return
+        for name, value in self._database.stats().items():
+            yield GaugeMetricFamily(f"db_pool_{name}", f"Connection pool {name}.", value=value)
+
+
+def register_pool(database):
+    """
+    Exposes the pool metrics of a database on `/metrics`.
+
+    In a single process they are read when scraped. With several workers the
+    scrape cannot reach the other workers' pools, so each worker publishes its
+    figures to multiprocess gauges after its requests instead (see `publish_pool`).
+
+    Args:
+        database (Database): The database whose `stats()` are collected.
+    """
+    if not _MULTIPROCESS:
+        REGISTRY.register(_PoolCollector(database))
+        return
+    _pool["database"] = database
+    for name in database.stats():
+        _pool["gauges"][name] = Gauge(
+            f"db_pool_{name}", f"Connection pool {name}.",
+            multiprocess_mode="livemax" if name.endswith("_ms") else "livesum")
+
+
+def publish_pool():
+    """Copies the pool figures of this worker to the multiprocess gauges, at most once a second."""
+    now = time.monotonic()
+    if _pool["database"] is None or now - _pool["published"] < 1.0:
+        return
+    _pool["published"] = now
+    for name, value in _pool["database"].stats().items():
+        _pool["gauges"][name].set(value)
+
+
+def render_metrics():
+    """
+    Renders every metric in the Prometheus text format.
+
+    Returns:
+        tuple: The body and its content type.
+    """
+    if _MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Records the count, latency and SQL statements of every HTTP request.
+
+    The latency covers the whole response, including streamed bodies and the
+    work of the middlewares added before this one.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS["enabled"]:
+            await self.app(scope, receive, send)
+            return
+        router = router_of(scope["path"])
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels(router)
+        in_flight.inc()
+        token = begin_query_stats()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            queries = end_query_stats(token)
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.labels(router, route, method, status["code"]).inc()
+            LATENCY.labels(router, route, method).observe(elapsed)
+            DB_QUERIES.labels(router, route).inc(queries["queries"])
+            DB_QUERIES_PER_REQUEST.labels(router, route).observe(queries["queries"])
+            DB_SECONDS_PER_REQUEST.labels(router, route).observe(queries["seconds"])
+            publish_pool()
@@ -0,0 +1,58 @@
+"""This module implements the keyset pagination shared by the list endpoints."""
+from typing import Optional
+from fastapi import Query
+from app.config.async_database import fetch_all
+from app.config.settings import PAGINATION
+
+
+def get_page_params(
+    limit: int = Query(PAGINATION["default_limit"], ge=1, le=PAGINATION["max_limit"]),
+    after_id: Optional[int] = Query(None, ge=0),
+):
+    """
+    Reads the pagination parameters of a list request.
+
+    Parameters:
+        limit (int): The maximum number of items to return.
+        after_id (int): The cursor returned by the previous page, if any.
+
+    Returns:
+        dict: The `limit` and `after_id` values ready to pass to a service.
+    """
+    return {"limit": limit, "after_id": after_id}
+
+
+def _page_query(query, key, limit, after_id):
+    if after_id is not None:
+        query = query.where(key > after_id)
+    return query.order_by(key).limit(limit + 1)
+
+
+def _build_page(rows, key, serializer, limit):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [serializer(row) for row in rows],
+        "next_cursor": getattr(rows[-1], key.name) if has_more else None,
+    }
+
+
+async def paginate_async(query, key, serializer, limit, after_id=None):
+    """
+    Runs a keyset-paginated query ordered by the given primary key on the async database path.
+
+    One extra row is fetched to know whether another page exists, so no
+    `COUNT(*)` or `OFFSET` is needed and the cost stays flat as the table grows.
+
+    Args:
+        query (ModelSelect): The base query to paginate.
+        key (Field): The primary key used as ordering and cursor.
+        serializer (callable): Turns a row into the dictionary returned to the client.
+        limit (int): The maximum number of items in the page.
+        after_id (int): Only rows whose key is greater than this value are returned.
+
+    Returns:
+        dict: The page `items` and the `next_cursor` to request the following page.
+    """
+    rows = await fetch_all(_page_query(query, key, limit, after_id))
+    return _build_page(rows, key, serializer, limit)
@@ -0,0 +1,261 @@
+"""
+This module implements the opt-in profiling of single requests.
+
+A request sent with `X-Profile: 1` (or `?profile=1`) and an admin API key runs
+under a sampling profiler. Every few milliseconds the stacks of the event loop
+thread and of the threads running application code are sampled and folded
+into `frame;frame;frame count` lines, the format read by flamegraph.pl,
+speedscope and most flame graph viewers. The SQL statements of the request
+and their durations are kept alongside. The response carries the profile ID
+in the `X-Profile-Id` header and the profile is read back from
+`/api/stats/profiles/{id}`. Under several workers the profiles are shared
+through `PROFILING_DIRECTORY`, which the Gunicorn configuration sets.
+
+Sampling all threads means a request running concurrently in the threadpool
+may show up in the profile too; only one request is profiled at a time to
+keep the overhead bounded.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from urllib.parse import parse_qs
+import anyio
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from app.config.pool import begin_query_stats, end_query_stats
+from app.config.settings import PROFILING
+from app.helpers.api_key_auth import API_KEY_NAME, is_valid_api_key
+
+_PROFILE_ID = re.compile(r"[0-9a-f]{16}")
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ROOT_DIR = os.path.dirname(_APP_DIR)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT_DIR):
+        filename = os.path.relpath(filename, _ROOT_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the threads of the process at a fixed interval.
+
+    Attributes:
+        samples (int): The number of sampling rounds taken.
+    """
+
+    def __init__(self, interval, main_thread_id):
+        self._interval = interval
+        self._main_thread_id = main_thread_id
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.samples = 0
+
+    def _sample(self):
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if thread_id == own:
+                continue
+            stack, in_app = [], False
+            while frame is not None:
+                in_app = in_app or frame.f_code.co_filename.startswith(_APP_DIR)
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if thread_id == self._main_thread_id or in_app:
+                self._stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self._sample()
+
+    def start(self):
+        """Starts sampling in a background thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Stops sampling and waits for the sampling thread to end."""
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        """
+        Returns the sampled stacks in the folded format of flame graph tools.
+
+        Returns:
+            str: One `frame;frame;frame count` line per distinct stack.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+class _ProfileStore:
+    """
+    Keeps the latest profiles in memory and, if configured, on disk.
+
+    Every worker process has its own memory, so with several workers the
+    directory is what lets any of them serve a profile recorded by another.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = OrderedDict()
+
+    @staticmethod
+    def _path(profile_id, extension):
+        return os.path.join(PROFILING["directory"], f"{profile_id}.{extension}")
+
+    @staticmethod
+    def _write(path, content):
+        """Writes a file aside and renames it, so another worker never reads half of it."""
+        with open(f"{path}.tmp", "w", encoding="utf-8") as output:
+            output.write(content)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def _stored_ids():
+        """Returns the IDs of the profiles in the directory, oldest first."""
+        directory = PROFILING["directory"]
+        try:
+            names = [name for name in os.listdir(directory) if name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+        stored = []
+        for name in names:
+            try:
+                stored.append((os.path.getmtime(os.path.join(directory, name)), name[:-5]))
+            except FileNotFoundError:
+                continue  # Pruned by another worker meanwhile.
+        return [profile_id for _, profile_id in sorted(stored)]
+
+    def _prune(self):
+        for profile_id in self._stored_ids()[:-PROFILING["max_profiles"]]:
+            for extension in ("json", "folded"):
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except FileNotFoundError:
+                    pass
+
+    def _load(self, profile_id):
+        if not PROFILING["directory"] or not _PROFILE_ID.fullmatch(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, "json"), encoding="utf-8") as details:
+                return json.load(details)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def add(self, profile):
+        """Stores a profile, dropping the oldest one when the store is full."""
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > PROFILING["max_profiles"]:
+                self._profiles.popitem(last=False)
+        if PROFILING["directory"]:
+            os.makedirs(PROFILING["directory"], exist_ok=True)
+            self._write(self._path(profile["id"], "folded"), profile["folded"])
+            self._write(self._path(profile["id"], "json"), json.dumps(profile))
+            self._prune()
+
+    def get(self, profile_id):
+        """Returns a stored profile, from memory or from the directory, or None."""
+        with self._lock:
+            profile = self._profiles.get(profile_id)
+        return profile if profile is not None else self._load(profile_id)
+
+    def summaries(self):
+        """Returns the stored profiles without their stacks and statements, newest first."""
+        if PROFILING["directory"]:
+            stored = (self._load(profile_id) for profile_id in reversed(self._stored_ids()))
+            profiles_list = [profile for profile in stored if profile is not None]
+        else:
+            with self._lock:
+                profiles_list = list(reversed(self._profiles.values()))
+        return [{key: value for key, value in profile.items()
+                 if key not in ("folded", "statements")} for profile in profiles_list]
+
+
+profiles = _ProfileStore()
+_busy = threading.Lock()
+
+
+def wants_profile(scope):
+    """
+    Tells whether a request asked to be profiled and is allowed to.
+
+    Args:
+        scope (dict): The ASGI scope of the request.
+
+    Returns:
+        bool: True if profiling is enabled, the request asked for it with the
+        `X-Profile` header or the `profile` query parameter, and it carries an
+        API key with the admin scope.
+    """
+    if not PROFILING["enabled"] or scope["type"] != "http":
+        return False
+    headers = Headers(scope=scope)
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    flag = headers.get("x-profile") or (query.get("profile") or [""])[0]
+    if flag.lower() not in ("1", "true", "yes"):
+        return False
+    return is_valid_api_key(headers.get(API_KEY_NAME), scope="admin")
+
+
+class ProfilingMiddleware:
+    """
+    Runs the requests that ask for it under the sampling profiler and stores
+    their profile, including the SQL statements they ran.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not wants_profile(scope) or not _busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        profile_id = uuid.uuid4().hex[:16]
+        status = {"code": 500}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                MutableHeaders(scope=message)["x-profile-id"] = profile_id
+            await send(message)
+
+        profiler = SamplingProfiler(PROFILING["interval_ms"] / 1000, threading.get_ident())
+        token = begin_query_stats(statements=True)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Joining the sampler waits up to an interval; keep it off the event loop.
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(profiler.stop)
+            queries = end_query_stats(token)
+            _busy.release()
+            await run_in_threadpool(profiles.add, {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status["code"],
+                "duration_ms": round(elapsed * 1000, 3),
+                "interval_ms": PROFILING["interval_ms"],
+                "samples": profiler.samples,
+                "queries": queries["queries"],
+                "query_ms": round(queries["seconds"] * 1000, 3),
+                "statements": queries["statements"],
+                "folded": profiler.folded(),
+            })
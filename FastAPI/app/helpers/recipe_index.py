@@ -0,0 +1,279 @@
+"""
+This module implements the inverted index matching pantry contents to recipes.
+
+Every recipe gets a slot number and every normalized ingredient name keeps a
+bitset (a Python integer) of the slots of the recipes using it. Scoring a
+pantry adds the bitsets of its ingredient names into bit-sliced counters, so
+the work depends on the number of pantry names and not on the number of
+recipes, and the top recipes are then picked with bitwise comparisons.
+"""
+import threading
+import time
+from app.config.database import Ingredient
+from app.config.settings import RECIPE_INDEX
+
+
+def ingredient_key(name):
+    """
+    Returns the normalized form of an ingredient name used to match recipes and pantries.
+
+    Args:
+        name (str): The ingredient name.
+
+    Returns:
+        str: The name in lower case without surrounding spaces.
+    """
+    return (name or "").strip().lower()
+
+
+def _bitset(slots, size):
+    bits = bytearray((size + 7) // 8)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _slots(bitset, limit=None):
+    slots = []
+    while bitset and (limit is None or len(slots) < limit):
+        lowest = bitset & -bitset
+        slots.append(lowest.bit_length() - 1)
+        bitset ^= lowest
+    return slots
+
+
+def _add(planes, bitset):
+    """Adds one to the bit-sliced counters of every slot set in the bitset."""
+    carry = bitset
+    for index, plane in enumerate(planes):
+        if not carry:
+            return
+        planes[index] = plane ^ carry
+        carry &= plane
+    if carry:
+        planes.append(carry)
+
+
+def _at_least(planes, threshold, universe):
+    """Returns the bitset of the slots whose counter is at least the threshold."""
+    if threshold >= 1 << len(planes):
+        return 0
+    greater, equal = 0, universe
+    for index in range(len(planes) - 1, -1, -1):
+        if threshold >> index & 1:
+            equal &= planes[index]
+        else:
+            greater |= equal & planes[index]
+            equal &= ~planes[index]
+    return greater | equal
+
+
+def _count(planes, slot):
+    return sum((plane >> slot & 1) << index for index, plane in enumerate(planes))
+
+
+class RecipeIndex:
+    """
+    Inverted index from normalized ingredient names to the recipes using them.
+
+    The index is built on first use, rebuilt when older than the configured
+    age (so workers converge on writes made by other workers) and refreshed
+    in place for the recipes whose ingredients are written by this worker.
+    Only the first build is waited for: later rebuilds run in a background
+    thread while the previous index keeps answering until it is swapped.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._built_at = None
+        self._rebuilding = False
+        # Recipes refreshed while a build runs; re-read once the build is swapped in.
+        self._dirty = None
+        self._slot_of = {}
+        self._recipe_at = []
+        self._free = []
+        self._names_of = {}
+        self._postings = {}
+        self._by_size = {}
+
+    def _load(self, recipe_ids=None):
+        """Reads the ingredient names of the given recipes, or of every recipe, by keyset."""
+        names = {}
+        key = Ingredient.idIngredient
+        last = 0
+        while True:
+            query = (Ingredient
+                     .select(key, Ingredient.recipeId, Ingredient.nameIngredient)
+                     .where(key > last))
+            if recipe_ids is not None:
+                query = query.where(Ingredient.recipeId.in_(list(recipe_ids)))
+            rows = list(query.order_by(key).limit(RECIPE_INDEX["build_batch_size"]).tuples())
+            for _, recipe_id, name in rows:
+                names.setdefault(recipe_id, set()).add(ingredient_key(name))
+            if len(rows) < RECIPE_INDEX["build_batch_size"]:
+                return names
+            last = rows[-1][0]
+
+    def build(self):
+        """Rebuilds the whole index from the ingredients table."""
+        with self._lock:
+            self._dirty = set()
+        names_of = {recipe_id: frozenset(names) for recipe_id, names in self._load().items()}
+        recipe_at = sorted(names_of)
+        size = len(recipe_at)
+        posting_slots, size_slots = {}, {}
+        for slot, recipe_id in enumerate(recipe_at):
+            names = names_of[recipe_id]
+            size_slots.setdefault(len(names), []).append(slot)
+            for name in names:
+                posting_slots.setdefault(name, []).append(slot)
+        with self._lock:
+            self._slot_of = {recipe_id: slot for slot, recipe_id in enumerate(recipe_at)}
+            self._recipe_at = recipe_at
+            self._free = []
+            self._names_of = names_of
+            self._postings = {name: _bitset(slots, size) for name, slots in posting_slots.items()}
+            self._by_size = {length: _bitset(slots, size) for length, slots in size_slots.items()}
+            self._built_at = time.monotonic()
+            dirty, self._dirty = self._dirty, None
+        # Their ingredients may have been written after the build read them.
+        self.refresh(dirty)
+
+    def _rebuild(self):
+        database = Ingredient._meta.database  # pylint: disable=protected-access
+        try:
+            with self._build_lock, database.connection_context():
+                self.build()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def ensure_built(self):
+        """
+        Builds the index if it was never built, waiting for it, or starts
+        rebuilding it in the background if it is older than the configured age.
+        """
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self.build()
+            return
+        if time.monotonic() - self._built_at <= RECIPE_INDEX["max_age_seconds"]:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name="recipe_index_rebuild", daemon=True).start()
+
+    def _remove(self, recipe_id):
+        slot = self._slot_of.pop(recipe_id, None)
+        if slot is None:
+            return
+        names = self._names_of.pop(recipe_id)
+        bit = 1 << slot
+        for name in names:
+            remaining = self._postings[name] & ~bit
+            if remaining:
+                self._postings[name] = remaining
+            else:
+                del self._postings[name]
+        self._by_size[len(names)] &= ~bit
+        self._recipe_at[slot] = None
+        self._free.append(slot)
+
+    def _insert(self, recipe_id, names):
+        if self._free:
+            slot = self._free.pop()
+            self._recipe_at[slot] = recipe_id
+        else:
+            slot = len(self._recipe_at)
+            self._recipe_at.append(recipe_id)
+        bit = 1 << slot
+        self._slot_of[recipe_id] = slot
+        self._names_of[recipe_id] = names
+        for name in names:
+            self._postings[name] = self._postings.get(name, 0) | bit
+        self._by_size[len(names)] = self._by_size.get(len(names), 0) | bit
+
+    def refresh(self, recipe_ids):
+        """
+        Re-reads the ingredients of some recipes after they were written.
+
+        Args:
+            recipe_ids (iterable): The IDs of the recipes whose ingredients changed.
+        """
+        recipe_ids = set(recipe_ids or ())
+        with self._lock:
+            if self._dirty is not None:
+                self._dirty.update(recipe_ids)
+        if self._built_at is None or not recipe_ids:
+            return
+        names = self._load(recipe_ids)
+        with self._lock:
+            for recipe_id in recipe_ids:
+                self._remove(recipe_id)
+                if names.get(recipe_id):
+                    self._insert(recipe_id, frozenset(names[recipe_id]))
+
+    def top_matches(self, names, limit):
+        """
+        Ranks the recipes by how many of their ingredients are among the given names.
+
+        Ties are broken by the number of ingredients of the recipe, fewer first.
+
+        Args:
+            names (iterable): The ingredient names available.
+            limit (int): The maximum number of recipes to return.
+
+        Returns:
+            list: `(recipe_id, matched, total)` tuples, best match first.
+        """
+        with self._lock:
+            planes = []
+            for name in {ingredient_key(name) for name in names}:
+                bitset = self._postings.get(name)
+                if bitset:
+                    _add(planes, bitset)
+            if not planes:
+                return []
+            universe = (1 << len(self._recipe_at)) - 1
+            low, high = 1, (1 << len(planes)) - 1
+            while low < high:
+                middle = (low + high + 1) // 2
+                if _at_least(planes, middle, universe).bit_count() >= limit:
+                    low = middle
+                else:
+                    high = middle - 1
+            above = _at_least(planes, low + 1, universe)
+            slots = _slots(above)
+            ties = _at_least(planes, low, universe) & ~above
+            for length in sorted(self._by_size):
+                if len(slots) >= limit or not ties:
+                    break
+                group = ties & self._by_size[length]
+                slots.extend(_slots(group, limit - len(slots)))
+                ties &= ~group
+            matches = [(self._recipe_at[slot], _count(planes, slot),
+                        len(self._names_of[self._recipe_at[slot]])) for slot in slots]
+        matches.sort(key=lambda match: (-match[1], match[2], match[0]))
+        return matches[:limit]
+
+    def stats(self):
+        """
+        Returns the size of the index.
+
+        Returns:
+            dict: The number of recipes and names indexed and the age of the index.
+        """
+        built_at = self._built_at
+        return {
+            "recipes": len(self._slot_of),
+            "names": len(self._postings),
+            "age_seconds": None if built_at is None else round(time.monotonic() - built_at, 1),
+            "rebuilding": self._rebuilding,
+        }
+
+
+recipe_index = RecipeIndex()
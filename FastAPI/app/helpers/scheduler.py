@@ -0,0 +1,129 @@
+"""This module implements the periodic background jobs started with the application."""
+import asyncio
+import datetime
+import fcntl
+import os
+import time
+import traceback
+from starlette.concurrency import run_in_threadpool
+
+JOBS = {}
+
+
+def _try_lock(path: str):
+    """Takes an exclusive lock on a file without waiting; returns its descriptor or None."""
+    descriptor = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(descriptor)
+        return None
+    return descriptor
+
+
+class PeriodicJob:
+    """
+    Runs a blocking function on the threadpool at a fixed interval.
+
+    Each run opens and closes its own database connection, so jobs never hold
+    a pooled connection between runs. With a lock file, only the worker process
+    holding the lock runs the job; the others try to take it at each interval,
+    so the job moves to another worker when the holder exits.
+
+    Attributes:
+        name (str): The name of the job, used in the statistics.
+        interval (float): The seconds between the end of a run and the next one.
+    """
+
+    def __init__(self, name: str, func, interval: float, db, lock_file: str = None):
+        self.name = name
+        self.interval = interval
+        self._func = func
+        self._db = db
+        self._lock_file = lock_file
+        self._lock = None
+        self._task = None
+        self._metrics = {
+            "runs": 0,
+            "skipped": 0,
+            "failures": 0,
+            "last_started": None,
+            "last_duration_ms": None,
+            "last_result": None,
+            "last_error": None,
+        }
+        JOBS[name] = self
+
+    def _run_once(self):
+        with self._db.connection_context():
+            return self._func()
+
+    async def run(self):
+        """
+        Runs the job once and records its metrics.
+
+        Returns:
+            The result of the job, or None if it failed or another process holds the lock.
+        """
+        if self._lock_file and self._lock is None:
+            self._lock = _try_lock(self._lock_file)
+            if self._lock is None:
+                self._metrics["skipped"] += 1
+                return None
+        self._metrics["last_started"] = datetime.datetime.now().isoformat(timespec="seconds")
+        started = time.perf_counter()
+        result = None
+        try:
+            result = await run_in_threadpool(self._run_once)
+            self._metrics["last_result"] = result
+            self._metrics["last_error"] = None
+        except Exception:  # pylint: disable=broad-exception-caught
+            self._metrics["failures"] += 1
+            self._metrics["last_error"] = traceback.format_exc(limit=1).strip()
+        self._metrics["runs"] += 1
+        self._metrics["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    async def _loop(self):
+        while True:
+            await self.run()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Schedules the job on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self):
+        """Cancels the job and waits for the current run to finish."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lock is not None:
+            os.close(self._lock)
+            self._lock = None
+
+    def stats(self):
+        """
+        Returns the metrics of the job.
+
+        Returns:
+            dict: The number of runs and failures and the details of the last run.
+        """
+        return {"interval_seconds": self.interval, "running": self._task is not None,
+                "holds_lock": self._lock is not None if self._lock_file else None,
+                **self._metrics}
+
+
+def job_stats():
+    """
+    Returns the metrics of every registered job.
+
+    Returns:
+        dict: The statistics of each job by name.
+    """
+    return {name: job.stats() for name, job in JOBS.items()}
@@ -0,0 +1,109 @@
+"""This module implements the NDJSON streaming mode of the list endpoints."""
+from contextvars import copy_context
+import anyio
+import orjson
+from fastapi import Header, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from app.config.database import database
+from app.config.pool import begin_request_state, end_request_state
+from app.config.settings import STREAMING
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request, stream: bool = Query(False), accept: str = Header("")):
+    """
+    Tells whether the client asked for the streaming NDJSON mode.
+
+    The stream sends every row after `after_id`, so `limit` is rejected in
+    this mode instead of being silently ignored.
+
+    Parameters:
+        request (Request): The incoming request.
+        stream (bool): The `?stream=1` query flag.
+        accept (str): The `Accept` header of the request.
+
+    Returns:
+        bool: True if the rows must be streamed as NDJSON.
+
+    Raises:
+        HTTPException: If `limit` is given along with the streaming mode.
+    """
+    streaming = stream or NDJSON_MEDIA_TYPE in accept
+    if streaming and "limit" in request.query_params:
+        raise HTTPException(status_code=400,
+                            detail="limit is not supported when streaming, use after_id to resume")
+    return streaming
+
+
+def iterate_rows(query):
+    """
+    Iterates a select query without caching its rows.
+
+    MySQL databases use a server-side cursor, other databases fall back to
+    peewee's `.iterator()`.
+
+    Args:
+        query (ModelSelect): The query to iterate.
+
+    Returns:
+        Iterator: The rows of the query.
+    """
+    query_database = query.model._meta.database  # pylint: disable=protected-access
+    if hasattr(query_database, "iterate_unbuffered"):
+        return query_database.iterate_unbuffered(query)
+    return query.iterator()
+
+
+def _read_chunk(rows, size):
+    lines = []
+    for row in rows:
+        lines.append(orjson.dumps(row, default=jsonable_encoder))
+        if len(lines) >= size:
+            break
+    return b"\n".join(lines) + b"\n" if lines else b""
+
+
+def _release(rows):
+    rows.close()
+    if not database.is_closed():
+        database.close()
+
+
+async def _stream_chunks(rows):
+    # The per-request connection is released before the body is sent, so the
+    # stream checks out its own connection and keeps it for every chunk.
+    token = begin_request_state()
+    context = copy_context()
+    try:
+        while True:
+            chunk = await run_in_threadpool(_read_chunk, rows, STREAMING["chunk_rows"])
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        # On a client disconnect the stream is either cancelled or closed later
+        # by the event loop's asyncgen finalizer in another context: the release
+        # is shielded and runs in the stream's own context so the connection it
+        # checked out always goes back to the pool.
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(context.run, _release, rows)
+        try:
+            end_request_state(token)
+        except ValueError:
+            pass  # Finalized from another context, which never saw the state.
+
+
+def ndjson_response(rows):
+    """
+    Streams rows to the client as newline-delimited JSON.
+
+    Args:
+        rows (Generator): The serialized rows, usually produced by a `stream_*` service.
+
+    Returns:
+        StreamingResponse: The response sending the rows as they are read.
+    """
+    return StreamingResponse(_stream_chunks(rows), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,145 @@
+"""This module implements the normalization of ingredient amounts and units."""
+from fractions import Fraction
+from app.config.database import Unit
+
+# Each unit alias maps to its base unit and the factor converting it to that base.
+# The `units` table is seeded from this mapping.
+UNITS = {
+    "g": ("g", 1.0),
+    "gr": ("g", 1.0),
+    "gram": ("g", 1.0),
+    "grams": ("g", 1.0),
+    "gramo": ("g", 1.0),
+    "gramos": ("g", 1.0),
+    "mg": ("g", 0.001),
+    "kg": ("g", 1000.0),
+    "kilo": ("g", 1000.0),
+    "kilos": ("g", 1000.0),
+    "lb": ("g", 453.592),
+    "lbs": ("g", 453.592),
+    "libra": ("g", 453.592),
+    "libras": ("g", 453.592),
+    "oz": ("g", 28.3495),
+    "ml": ("ml", 1.0),
+    "cl": ("ml", 10.0),
+    "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0),
+    "lt": ("ml", 1000.0),
+    "litro": ("ml", 1000.0),
+    "litros": ("ml", 1000.0),
+    "tsp": ("ml", 5.0),
+    "cucharadita": ("ml", 5.0),
+    "cucharaditas": ("ml", 5.0),
+    "tbsp": ("ml", 15.0),
+    "cucharada": ("ml", 15.0),
+    "cucharadas": ("ml", 15.0),
+    "cup": ("ml", 240.0),
+    "cups": ("ml", 240.0),
+    "taza": ("ml", 240.0),
+    "tazas": ("ml", 240.0),
+    "": ("unit", 1.0),
+    "u": ("unit", 1.0),
+    "un": ("unit", 1.0),
+    "unit": ("unit", 1.0),
+    "units": ("unit", 1.0),
+    "unidad": ("unit", 1.0),
+    "unidades": ("unit", 1.0),
+    "pc": ("unit", 1.0),
+    "pcs": ("unit", 1.0),
+    "piece": ("unit", 1.0),
+    "pieces": ("unit", 1.0),
+    "dozen": ("unit", 12.0),
+    "docena": ("unit", 12.0),
+}
+
+
+def parse_amount(amount):
+    """
+    Parses an amount written as a number, a decimal with comma or a fraction.
+
+    Args:
+        amount (str): The amount, for example "2", "2,5", "1/2" or "1 1/2".
+
+    Returns:
+        float: The parsed amount, or None if it cannot be parsed.
+    """
+    if isinstance(amount, (int, float)):
+        return float(amount)
+    parts = str(amount or "").replace(",", ".").split()
+    if not parts:
+        return None
+    try:
+        return float(sum(Fraction(part) for part in parts))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def unit_key(unit):
+    """
+    Returns the lookup key of a unit, ignoring case, spaces and a trailing dot.
+
+    Args:
+        unit (str): The unit as written by the user.
+
+    Returns:
+        str: The normalized unit.
+    """
+    return (unit or "").strip().lower().rstrip(".")
+
+
+def normalize(amount, unit):
+    """
+    Converts an amount to the base unit of its dimension.
+
+    Args:
+        amount (str): The amount as stored in the database.
+        unit (str): The unit of the amount.
+
+    Returns:
+        tuple: The amount in base units and the base unit, or None if the amount
+        cannot be parsed or the unit is unknown.
+    """
+    quantity = parse_amount(amount)
+    conversion = UNITS.get(unit_key(unit))
+    if quantity is None or conversion is None:
+        return None
+    base_unit, factor = conversion
+    return quantity * factor, base_unit
+
+
+_UNIT_IDS = {}
+
+
+def unit_id(unit):
+    """
+    Returns the ID of a unit in the `units` table.
+
+    The table is read once per process; it only changes through migrations.
+
+    Args:
+        unit (str): The unit as written by the user.
+
+    Returns:
+        int: The ID of the unit, or None if the unit is unknown.
+    """
+    if not _UNIT_IDS:
+        _UNIT_IDS.update(Unit.select(Unit.nameUnit, Unit.idUnit).tuples())
+    return _UNIT_IDS.get(unit_key(unit))
+
+
+def quantity_columns(amount, unit):
+    """
+    Returns the numeric quantity columns of an amount and its unit.
+
+    Args:
+        amount (str): The amount as written by the user.
+        unit (str): The unit of the amount.
+
+    Returns:
+        dict: The `quantityBase` and `unitId` column values, both None when
+        the amount cannot be normalized.
+    """
+    normalized = normalize(amount, unit)
+    if normalized is None:
+        return {"quantityBase": None, "unitId": None}
+    return {"quantityBase": normalized[0], "unitId": unit_id(unit)}
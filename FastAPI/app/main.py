@@ -1,99 +1,114 @@
 """This module is the main module of the FastAPI application."""
 
-from contextlib import asynccontextmanager
+import time
+_import_started = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import asyncio
+import importlib
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Depends
-from starlette.responses import RedirectResponse
-from app.helpers.api_key_auth import get_api_key
+from fastapi.responses import ORJSONResponse
+from starlette.responses import RedirectResponse, Response
+from app.helpers.health import readiness, startup_timings
+from app.helpers.api_key_auth import get_admin_api_key, get_api_key
+from app.helpers.db_session import get_db
+from app.helpers.compression import CompressionMiddleware
+from app.helpers.http_cache import ConditionalRequestMiddleware, check_not_modified
+from app.helpers.metrics import MetricsMiddleware, register_pool, render_metrics
+from app.helpers.profiling import ProfilingMiddleware
 from app.config.database import database as connection
-from app.routes.user_route import user_router
-from app.routes.shopping_list_route import shopping_list_router
-from app.routes.role_route import role_router
-from app.routes.recipe_route import recipe_router
-from app.routes.pantry_route import pantry_router
-from app.routes.notification_route import notification_router
-from app.routes.menu_route import menu_router
-from app.routes.ingredient_route import ingredient_router
-from app.routes.ingredient_inventory_route import ingredient_inventory_router
-from app.routes.family_route import family_router
-from app.routes.category_recipe_route import category_recipe_router
-from app.routes.category_ingredient_route import category_ingredient_router
+from app.config.async_database import close_pool
+from app.config.settings import EXPIRY_SCAN, METRICS
+from app.helpers.scheduler import PeriodicJob
+from app.services.expiry_service import scan_expiring_items
+from app.routes.stats_route import stats_router
+
+startup_timings.started = _import_started
+startup_timings.record("imports", time.perf_counter() - _import_started)
+
+# Module in app.routes, router attribute, prefix and tag of each API router.
+ROUTERS = (
+    ("user_route", "user_router", "/api/users", "Users"),
+    ("shopping_list_route", "shopping_list_router", "/api/shopping-lists", "Shopping Lists"),
+    ("role_route", "role_router", "/api/roles", "Roles"),
+    ("recipe_route", "recipe_router", "/api/recipes", "Recipes"),
+    ("pantry_route", "pantry_router", "/api/pantries", "Pantries"),
+    ("notification_route", "notification_router", "/api/notifications", "Notifications"),
+    ("menu_route", "menu_router", "/api/menus", "Menus"),
+    ("ingredient_route", "ingredient_router", "/api/ingredients", "Ingredients"),
+    ("ingredient_inventory_route", "ingredient_inventory_router",
+     "/api/ingredient-inventories", "Ingredient Inventories"),
+    ("family_route", "family_router", "/api/families", "Families"),
+    ("category_recipe_route", "category_recipe_router", "/api/category-recipes",
+     "Category Recipes"),
+    ("category_ingredient_route", "category_ingredient_router", "/api/category-ingredients",
+     "Category Ingredients"),
+)
 
 @asynccontextmanager
 async def lifespan(_):
     """Asynchronous context manager for managing the lifespan of the FastAPI application."""
-    if connection.is_closed():
-        connection.connect()
+    with startup_timings.phase("lifespan"):
+        expiry_job = PeriodicJob("expiry_scan", scan_expiring_items,
+                                 EXPIRY_SCAN["interval_seconds"], connection,
+                                 lock_file=EXPIRY_SCAN["lock_file"])
+        if EXPIRY_SCAN["enabled"]:
+            expiry_job.start()
+        # The database is connected in the background: a slow MySQL delays readiness, not startup.
+        connect = asyncio.create_task(readiness.connect_with_retry(), name="database_connect")
+    startup_timings.mark_ready()
     try:
         yield
     finally:
-        if not connection.is_closed():
-            connection.close()
+        connect.cancel()
+        with suppress(asyncio.CancelledError):
+            await connect
+        await expiry_job.stop()
+        connection.close_all()
+        await close_pool()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(ConditionalRequestMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+register_pool(connection)
 
 @app.get("/")
 def read_root():
     """Redirects the root path to the documentation."""
     return RedirectResponse(url="/docs")
-#------ USER ROUTES -------
-app.include_router(user_router, 
-                   tags=["Users"], 
-                   prefix="/api/users", 
-                   dependencies=[Depends(get_api_key)])
-#------ SHOPPING LIST ROUTES -------
-app.include_router(shopping_list_router, 
-                   tags=["Shopping Lists"], 
-                   prefix="/api/shopping-lists", 
-                   dependencies=[Depends(get_api_key)])
-#------ ROLE ROUTES -------
-app.include_router(role_router, 
-                   tags=["Roles"], 
-                   prefix="/api/roles", 
-                   dependencies=[Depends(get_api_key)])
 
-#------ RECIPE ROUTES -------
-app.include_router(recipe_router, 
-                   tags=["Recipes"], 
-                   prefix="/api/recipes", 
-                   dependencies=[Depends(get_api_key)])
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Exposes the request, database and pool metrics in the Prometheus text format."""
+    if not METRICS["enabled"]:
+        return Response(status_code=404)
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+@app.get("/healthz", include_in_schema=False)
+def read_liveness():
+    """Tells the process is up; it never checks the database, so MySQL never restarts it."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def read_readiness():
+    """Tells whether the worker can serve requests: the database must answer."""
+    if await readiness.check():
+        return {"status": "ready"}
+    return ORJSONResponse({"status": "unavailable", **readiness.snapshot()}, status_code=503)
 
-#------ PANTRY ROUTES -------
-app.include_router(pantry_router, 
-                   tags=["Pantries"], 
-                   prefix="/api/pantries", 
-                   dependencies=[Depends(get_api_key)])
-#------ NOTIFICATION ROUTES -------
-app.include_router(notification_router, 
-                   tags=["Notifications"], 
-                   prefix="/api/notifications", 
-                   dependencies=[Depends(get_api_key)])
-#------ MENU ROUTES -------
-app.include_router(menu_router, 
-                   tags=["Menus"], 
-                   prefix="/api/menus", 
-                   dependencies=[Depends(get_api_key)])
-#------ INGREDIENT ROUTES -------
-app.include_router(ingredient_router, 
-                   tags=["Ingredients"], 
-                   prefix="/api/ingredients", 
-                   dependencies=[Depends(get_api_key)])
-#------ INGREDIENT INVENTORY ROUTES -------
-app.include_router(ingredient_inventory_router, 
-                   tags=["Ingredient Inventories"], 
-                   prefix="/api/ingredient-inventories", 
-                   dependencies=[Depends(get_api_key)])
-#------ FAMILY ROUTES -------
-app.include_router(family_router, 
-                   tags=["Families"], 
-                   prefix="/api/families", 
-                   dependencies=[Depends(get_api_key)])
-#------ CATEGORY RECIPE ROUTES -------
-app.include_router(category_recipe_router, 
-                   tags=["Category Recipes"], 
-                   prefix="/api/category-recipes", 
-                   dependencies=[Depends(get_api_key)])
-#------ CATEGORY INGREDIENT ROUTES -------
-app.include_router(category_ingredient_router, 
-                   tags=["Category Ingredients"], 
-                   prefix="/api/category-ingredients", 
-                   dependencies=[Depends(get_api_key)])
+for module_name, router_name, prefix, tag in ROUTERS:
+    with startup_timings.phase(f"router {prefix}"):
+        router = getattr(importlib.import_module(f"app.routes.{module_name}"), router_name)
+        app.include_router(router,
+                           tags=[tag],
+                           prefix=prefix,
+                           dependencies=[Depends(get_api_key), Depends(get_db),
+                                         Depends(check_not_modified)])
+#------ STATS ROUTES -------
+app.include_router(stats_router, 
+                   tags=["Stats"], 
+                   prefix="/api/stats", 
+                   dependencies=[Depends(get_admin_api_key)])
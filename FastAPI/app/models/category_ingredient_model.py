@@ -1,7 +1,7 @@
 """
 This module contains the Pydantic model for category ingredient data.
 """
-
+from typing import Optional
 from pydantic import BaseModel
 
 class CategoryIngredient(BaseModel):
@@ -15,3 +15,16 @@ class CategoryIngredient(BaseModel):
     idCategoryIngredient : int
     nameCategoryIngredient : str
     descriptionCategoryIngredient : str
+
+class CategoryIngredientResponse(BaseModel):
+    """
+    Category ingredient returned by the read endpoints. Every attribute but the ID is
+    optional, since the `fields` parameter can leave it out.
+    Attributes:
+        id (int): The unique identifier of the category ingredient.
+        name (str): The name of the category ingredient.
+        description (str): The description of the category ingredient.
+    """
+    id : int
+    name : Optional[str] = None
+    description : Optional[str] = None
@@ -1,6 +1,7 @@
 """
 This module contains the Pydantic model for category recipe data.
 """
+from typing import Optional
 from pydantic import BaseModel
 
 class CategoryRecipe(BaseModel):
@@ -14,3 +15,16 @@ class CategoryRecipe(BaseModel):
     idCategoryRecipe : int
     nameCategoryRecipe : str
     descriptionCategoryRecipe : str
+
+class CategoryRecipeResponse(BaseModel):
+    """
+    Category recipe returned by the read endpoints. Every attribute but the ID is
+    optional, since the `fields` parameter can leave it out.
+    Attributes:
+        id (int): The unique identifier of the category recipe.
+        name (str): The name of the category recipe.
+        description (str): The description of the category recipe.
+    """
+    id : int
+    name : Optional[str] = None
+    description : Optional[str] = None
@@ -1,6 +1,8 @@
 """
 This module contains the Pydantic model for family data.
 """
+from datetime import date
+from typing import List, Optional
 from pydantic import BaseModel
 
 class Family(BaseModel):
@@ -12,3 +14,87 @@ class Family(BaseModel):
     """
     idFamily : int
     nameFamily : str
+
+class FamilyResponse(BaseModel):
+    """
+    Family returned by the read endpoints.
+    Attributes:
+        id (int): The unique identifier of the family.
+        name (str): The name of the family.
+    """
+    id : int
+    name : str
+
+class FamilyPantryItemResponse(BaseModel):
+    """
+    Inventory item of a pantry in the family pantry snapshot.
+    Attributes:
+        id (int): The unique identifier of the inventory item.
+        name (str): The name of the ingredient.
+        amount (str): The amount of the ingredient.
+        unit (str): The unit of the amount.
+        date_expiration (date): The date of expiration of the ingredient.
+    """
+    id : int
+    name : str
+    amount : str
+    unit : str
+    date_expiration : date
+
+class FamilyPantryResponse(BaseModel):
+    """
+    Pantry of a member in the family pantry snapshot.
+    Attributes:
+        id (int): The unique identifier of the pantry.
+        items (list): The inventory items of the pantry.
+    """
+    id : int
+    items : List[FamilyPantryItemResponse]
+
+class FamilyMemberResponse(BaseModel):
+    """
+    Member of a family in the family pantry snapshot.
+    Attributes:
+        id (int): The unique identifier of the user.
+        name (str): The name of the user.
+        email (str): The email of the user.
+        photo (str): The photo of the user.
+        pantries (list): The pantries of the user.
+    """
+    id : int
+    name : str
+    email : str
+    photo : Optional[str] = None
+    pantries : List[FamilyPantryResponse]
+
+class FamilyIngredientTotalResponse(BaseModel):
+    """
+    Ingredient held across the pantries of a family.
+    Attributes:
+        name (str): The name of the ingredient.
+        unit (str): The unit of the amounts.
+        items (int): The number of inventory items of the ingredient.
+        first_expiration (date): The earliest expiration date among them.
+    """
+    name : str
+    unit : str
+    items : int
+    first_expiration : date
+
+class FamilyPantrySnapshotResponse(BaseModel):
+    """
+    Snapshot of the pantries of a family.
+    Attributes:
+        id (int): The unique identifier of the family.
+        name (str): The name of the family.
+        members (list): The members with their pantries and inventory.
+        ingredients (list): The ingredients held by the family, by name and unit.
+        pantry_count (int): The number of pantries of the family.
+        item_count (int): The number of inventory items of the family.
+    """
+    id : int
+    name : str
+    members : List[FamilyMemberResponse]
+    ingredients : List[FamilyIngredientTotalResponse]
+    pantry_count : int
+    item_count : int
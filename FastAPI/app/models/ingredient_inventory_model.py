@@ -2,6 +2,7 @@
 This module contains the Pydantic model for ingredient inventory data.
 """
 from datetime import date
+from typing import Optional
 from pydantic import BaseModel
 
 class IngredientInventory(BaseModel):
@@ -19,4 +20,36 @@ class IngredientInventory(BaseModel):
     amount : float
     unit : str
     dateExpiration : date
-    
\ No newline at end of file
+
+class IngredientInventoryBulkItem(BaseModel):
+    """
+    Ingredient Inventory of a creation request, single or bulk.
+    Attributes:
+        name (str): The name of the ingredient inventory.
+        amount (float): The amount of the ingredient inventory.
+        unit (str): The unit of the ingredient inventory.
+        dateExpiration (date): The date of expiration of the ingredient inventory.
+        pantryId (int): The unique identifier of the pantry holding the ingredient.
+    """
+    name : str
+    amount : float
+    unit : str
+    dateExpiration : date
+    pantryId : int
+
+class IngredientInventoryResponse(BaseModel):
+    """
+    Ingredient inventory returned by the read endpoints. Every attribute but the ID is
+    optional, since the `fields` parameter can leave it out.
+    Attributes:
+        id (int): The unique identifier of the ingredient inventory.
+        name (str): The name of the ingredient inventory.
+        amount (str): The amount of the ingredient inventory.
+        unit (str): The unit of the ingredient inventory.
+        date_expiration (date): The date of expiration of the ingredient inventory.
+    """
+    id : int
+    name : Optional[str] = None
+    amount : Optional[str] = None
+    unit : Optional[str] = None
+    date_expiration : Optional[date] = None
@@ -2,6 +2,7 @@
 This module contains the Pydantic model for ingredient data.
 """
 from datetime import date
+from typing import Optional
 from pydantic import BaseModel
 
 class Ingredient(BaseModel):
@@ -19,3 +20,38 @@ class Ingredient(BaseModel):
     amountIngredient : float
     unitIngredient : str
     dateExpirationIngredient : date
+
+class IngredientBulkItem(BaseModel):
+    """
+    Ingredient of a creation request, single or bulk.
+    Attributes:
+        nameIngredient (str): The name of the ingredient.
+        amountIngredient (float): The amount of the ingredient.
+        unitIngredient (str): The unit of the ingredient.
+        dateExpirationIngredient (date): The date of expiration of the ingredient.
+        recipeId (int): The unique identifier of the recipe using the ingredient.
+        categoryIdIngredient (int): The unique identifier of the category of the ingredient.
+    """
+    nameIngredient : str
+    amountIngredient : float
+    unitIngredient : str
+    dateExpirationIngredient : date
+    recipeId : int
+    categoryIdIngredient : int
+
+class IngredientResponse(BaseModel):
+    """
+    Ingredient returned by the read endpoints. Every attribute but the ID is
+    optional, since the `fields` parameter can leave it out.
+    Attributes:
+        id (int): The unique identifier of the ingredient.
+        name (str): The name of the ingredient.
+        amount (str): The amount of the ingredient.
+        unit (str): The unit of the ingredient.
+        date_expiration (date): The date of expiration of the ingredient.
+    """
+    id : int
+    name : Optional[str] = None
+    amount : Optional[str] = None
+    unit : Optional[str] = None
+    date_expiration : Optional[date] = None
@@ -13,3 +13,13 @@ class Menu(BaseModel):
     """
     idMenu : int
     dateMenu : date
+
+class MenuResponse(BaseModel):
+    """
+    Menu returned by the read endpoints.
+    Attributes:
+        id (int): The unique identifier of the menu.
+        date (date): The date of the menu.
+    """
+    id : int
+    date : date
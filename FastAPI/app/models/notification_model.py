@@ -1,7 +1,9 @@
 """
 This module contains the Pydantic model for notification data.
 """
+import datetime
 from datetime import date
+from typing import Optional
 from pydantic import BaseModel
 
 class Notification(BaseModel):
@@ -14,4 +16,29 @@ class Notification(BaseModel):
     """
     idNotification : int
     message : str
-    dateNotification : date
\ No newline at end of file
+    dateNotification : date
+
+class NotificationBulkItem(BaseModel):
+    """
+    Notification item of a bulk creation request.
+    Attributes:
+        message (str): The message of the notification.
+        dateNotification (date): The date of the notification.
+        userId (int): The unique identifier of the notified user.
+    """
+    message : str
+    dateNotification : date
+    userId : int
+
+class NotificationResponse(BaseModel):
+    """
+    Notification returned by the read endpoints. Every attribute but the ID is
+    optional, since the `fields` parameter can leave it out.
+    Attributes:
+        id (int): The unique identifier of the notification.
+        message (str): The message of the notification.
+        date (date): The date of the notification.
+    """
+    id : int
+    message : Optional[str] = None
+    date : Optional[datetime.date] = None
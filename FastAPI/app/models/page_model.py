@@ -0,0 +1,17 @@
+"""
+This module contains the Pydantic model for the pages of the list endpoints.
+"""
+from typing import Generic, Optional, TypeVar
+from pydantic import BaseModel
+
+ItemT = TypeVar("ItemT")
+
+class Page(BaseModel, Generic[ItemT]):
+    """
+    Page model class.
+    Attributes:
+        items (list): The items of the page.
+        next_cursor (int): The cursor of the following page, or None on the last one.
+    """
+    items : list[ItemT]
+    next_cursor : Optional[int] = None
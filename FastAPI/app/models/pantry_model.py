@@ -1,6 +1,8 @@
 """
 This module contains the Pydantic model for pantry data.
 """
+from datetime import date
+from typing import List, Optional
 from pydantic import BaseModel
 
 class Pantry(BaseModel):
@@ -10,3 +12,63 @@ class Pantry(BaseModel):
         idPantry (int): The unique identifier of the user.
     """
     idPantry : int
+
+class PantryResponse(BaseModel):
+    """
+    Pantry returned by the read endpoints.
+    Attributes:
+        id (int): The unique identifier of the pantry.
+    """
+    id : int
+
+class PantryTotalResponse(BaseModel):
+    """
+    Inventory of a pantry summed by ingredient and base unit.
+    Attributes:
+        name (str): The name of the ingredient.
+        unit (str): The base unit of the quantity, None if the unit is unknown.
+        quantity (float): The total quantity, None if no amount could be converted.
+        items (int): The number of inventory items summed.
+        first_expiration (date): The earliest expiration date among them.
+    """
+    name : str
+    unit : Optional[str] = None
+    quantity : Optional[float] = None
+    items : int
+    first_expiration : date
+
+class PantryTotalsResponse(BaseModel):
+    """
+    Totals of the inventory of a pantry.
+    Attributes:
+        pantryId (int): The unique identifier of the pantry.
+        totals (list): The totals by ingredient and base unit.
+    """
+    pantryId : int
+    totals : List[PantryTotalResponse]
+
+class CookableRecipeResponse(BaseModel):
+    """
+    Recipe ranked by the ingredients of a pantry it uses.
+    Attributes:
+        id (int): The unique identifier of the recipe.
+        name (str): The name of the recipe.
+        matched (int): The number of its ingredients in the pantry.
+        total (int): The number of its ingredients.
+        missing (int): The number of its ingredients not in the pantry.
+    """
+    id : int
+    name : Optional[str] = None
+    matched : int
+    total : int
+    missing : int
+
+class PantryCookableResponse(BaseModel):
+    """
+    Recipes that use the most ingredients of a pantry.
+    Attributes:
+        pantryId (int): The unique identifier of the pantry.
+        recipes (list): The recipes, best match first.
+    """
+    pantryId : int
+    recipes : List[CookableRecipeResponse]
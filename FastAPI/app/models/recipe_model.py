@@ -1,7 +1,12 @@
 """
 This module contains the Pydantic model for recipe data.
 """
+from datetime import time
+from typing import List, Optional
 from pydantic import BaseModel
+from app.models.category_ingredient_model import CategoryIngredientResponse
+from app.models.category_recipe_model import CategoryRecipeResponse
+from app.models.ingredient_model import IngredientResponse
 
 class Recipe(BaseModel):
     """
@@ -24,3 +29,46 @@ class Recipe(BaseModel):
     timePreparation : int
     instructions : str
     nutritionalData : str
+
+class RecipeIngredientResponse(IngredientResponse):
+    """
+    Ingredient embedded in a recipe by `expand=ingredients`.
+    Attributes:
+        category (CategoryIngredientResponse): The category of the ingredient.
+    """
+    category : Optional[CategoryIngredientResponse] = None
+
+class RecipeResponse(BaseModel):
+    """
+    Recipe returned by the read endpoints. Every attribute but the ID is
+    optional, since the `fields` parameter can leave it out.
+    Attributes:
+        id (int): The unique identifier of the recipe.
+        name (str): The name of the recipe.
+        description (str): The description of the recipe.
+        category (str): The category of the recipe.
+        difficulty (str): The difficulty of the recipe.
+        timePreparation (time): The preparation time of the recipe.
+        instructions (str): The instructions of the recipe.
+        nutritionalData (str): The nutritional data of the recipe.
+        ingredients (list): The ingredients of the recipe, with `expand=ingredients`.
+        categories (list): The categories of the recipe, with `expand=categories`.
+    """
+    id : int
+    name : Optional[str] = None
+    description : Optional[str] = None
+    category : Optional[str] = None
+    difficulty : Optional[str] = None
+    timePreparation : Optional[time] = None
+    instructions : Optional[str] = None
+    nutritionalData : Optional[str] = None
+    ingredients : Optional[List[RecipeIngredientResponse]] = None
+    categories : Optional[List[CategoryRecipeResponse]] = None
+
+class RecipeSearchResponse(RecipeResponse):
+    """
+    Recipe returned by the search endpoint.
+    Attributes:
+        relevance (float): How well the recipe matches the search, higher first.
+    """
+    relevance : float
@@ -14,3 +14,15 @@ class Role(BaseModel):
     idRole : int
     nameRole : str
     permissions : str
+
+class RoleResponse(BaseModel):
+    """
+    Role returned by the read endpoints.
+    Attributes:
+        id (int): The unique identifier of the role.
+        name (str): The name of the role.
+        permissions (str): The permissions of the role.
+    """
+    id : int
+    name : str
+    permissions : str
@@ -10,4 +10,12 @@ class ShoppingList(BaseModel):
         idShoppingList (int): The unique identifier of the shopping list.
     """
     idShoppingList : int
-    
\ No newline at end of file
+    
+
+class ShoppingListResponse(BaseModel):
+    """
+    ShoppingList returned by the read endpoints.
+    Attributes:
+        id (int): The unique identifier of the shopping list.
+    """
+    id : int
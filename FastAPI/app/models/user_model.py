@@ -1,6 +1,7 @@
 """
 This module contains the Pydantic model for customer data.
 """
+from typing import Optional
 from pydantic import BaseModel
 
 class User(BaseModel):
@@ -18,3 +19,20 @@ class User(BaseModel):
     password : str
     email : str
     photo : str
+
+class UserResponse(BaseModel):
+    """
+    User returned by the read endpoints. Every attribute but the ID is
+    optional, since the `fields` parameter can leave it out.
+    Attributes:
+        id (int): The unique identifier of the user.
+        name (str): The name of the user.
+        password (str): The password of the user.
+        email (str): The email address of the user.
+        photo (str): The photo of the user.
+    """
+    id : int
+    name : Optional[str] = None
+    password : Optional[str] = None
+    email : Optional[str] = None
+    photo : Optional[str] = None
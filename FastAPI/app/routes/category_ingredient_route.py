@@ -2,18 +2,25 @@
 This module contains the routes for managing category ingredient data.
 """
 
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.category_ingredient_model import CategoryIngredient
+from app.models.category_ingredient_model import CategoryIngredient, CategoryIngredientResponse
+from app.models.page_model import Page
+from app.helpers.fields import fields_param
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.category_ingredient_service import (
+    CATEGORY_INGREDIENT_FIELDS,
     create_category_ingredient_service,
     get_all_category_ingredients_service,
+    stream_all_category_ingredients_service,
     get_category_ingredient_service,
     update_category_ingredient_service,
     delete_category_ingredient_service
 )
 
 category_ingredient_router = APIRouter()
+get_fields = fields_param(CATEGORY_INGREDIENT_FIELDS)
 
 @category_ingredient_router.post("/")
 def create_category_ingredient(category_ingredient: CategoryIngredient = Body(...)):
@@ -29,13 +36,17 @@ def create_category_ingredient(category_ingredient: CategoryIngredient = Body(..
     """
     return create_category_ingredient_service(category_ingredient)
 
-@category_ingredient_router.get("/{category_ingredient_id}")
-def read_category_ingredient(category_ingredient_id: int):
+@category_ingredient_router.get("/{category_ingredient_id}",
+                                response_model=CategoryIngredientResponse,
+                                response_model_exclude_unset=True)
+async def read_category_ingredient(category_ingredient_id: int,
+                                   fields: tuple = Depends(get_fields)):
     """
     Retrieves a category ingredient by its ID.
 
     Args:
         category_ingredient_id (int): The ID of the category ingredient to retrieve.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
         CategoryIngredient: The category ingredient object.
@@ -44,19 +55,30 @@ def read_category_ingredient(category_ingredient_id: int):
         HTTPException: If the category ingredient is not found.
     """
     try:
-        return get_category_ingredient_service(category_ingredient_id)
+        return await get_category_ingredient_service(category_ingredient_id, fields)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="CategoryIngredient not found") from exc
 
-@category_ingredient_router.get("/")
-def read_category_ingredients():
+@category_ingredient_router.get("/", response_model=Page[CategoryIngredientResponse],
+                                response_model_exclude_unset=True)
+async def read_category_ingredients(page: dict = Depends(get_page_params),
+                                    stream: bool = Depends(wants_ndjson),
+                                    fields: tuple = Depends(get_fields)):
     """
-    Reads and returns all category ingredients.
+    Reads and returns a page of category ingredients, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
-        List[CategoryIngredient]: A list of all category ingredients.
+        dict: The category ingredients of the page and the `next_cursor` of the following one.
+        StreamingResponse: The category ingredients as NDJSON when streaming is requested.
     """
-    return get_all_category_ingredients_service()
+    if stream:
+        return ndjson_response(stream_all_category_ingredients_service(page["after_id"], fields))
+    return await get_all_category_ingredients_service(**page, fields=fields)
 
 @category_ingredient_router.put("/{category_ingredient_id}")
 def update_category_ingredient(category_ingredient_id: int, 
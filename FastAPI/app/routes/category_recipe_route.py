@@ -1,18 +1,25 @@
 """
 This module contains the routes for managing category_recipe data.
 """
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.category_recipe_model import CategoryRecipe
+from app.models.category_recipe_model import CategoryRecipe, CategoryRecipeResponse
+from app.models.page_model import Page
+from app.helpers.fields import fields_param
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.category_recipe_service import (
+    CATEGORY_RECIPE_FIELDS,
     create_category_recipe_service,
     get_all_category_recipes_service,
+    stream_all_category_recipes_service,
     get_category_recipe_service,
     update_category_recipe_service,
     delete_category_recipe_service
 )
 
 category_recipe_router = APIRouter()
+get_fields = fields_param(CATEGORY_RECIPE_FIELDS)
 
 @category_recipe_router.post("/")
 def create_category_recipe(category_recipe: CategoryRecipe = Body(...)):
@@ -27,13 +34,15 @@ def create_category_recipe(category_recipe: CategoryRecipe = Body(...)):
     """
     return create_category_recipe_service(category_recipe)
 
-@category_recipe_router.get("/{category_recipe_id}")
-def read_category_recipe(category_recipe_id: int):
+@category_recipe_router.get("/{category_recipe_id}", response_model=CategoryRecipeResponse,
+                            response_model_exclude_unset=True)
+async def read_category_recipe(category_recipe_id: int, fields: tuple = Depends(get_fields)):
     """
     Retrieves a categoryRecipe by its ID.
 
     Args:
         category_recipe_id (int): The ID of the categoryRecipe to retrieve.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
         CategoryRecipe: The categoryRecipe object.
@@ -42,19 +51,30 @@ def read_category_recipe(category_recipe_id: int):
         HTTPException: If the categoryRecipe is not found.
     """
     try:
-        return get_category_recipe_service(category_recipe_id)
+        return await get_category_recipe_service(category_recipe_id, fields)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="CategoryRecipe not found") from exc
 
-@category_recipe_router.get("/")
-def read_category_recipes():
+@category_recipe_router.get("/", response_model=Page[CategoryRecipeResponse],
+                            response_model_exclude_unset=True)
+async def read_category_recipes(page: dict = Depends(get_page_params),
+                                stream: bool = Depends(wants_ndjson),
+                                fields: tuple = Depends(get_fields)):
     """
-    Reads and returns all categoryRecipes.
+    Reads and returns a page of categoryRecipes, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
-        List[CategoryRecipe]: A list of all categoryRecipes.
+        dict: The categoryRecipes of the page and the `next_cursor` of the following one.
+        StreamingResponse: The categoryRecipes as NDJSON when streaming is requested.
     """
-    return get_all_category_recipes_service()
+    if stream:
+        return ndjson_response(stream_all_category_recipes_service(page["after_id"], fields))
+    return await get_all_category_recipes_service(**page, fields=fields)
 
 @category_recipe_router.put("/{category_recipe_id}")
 def update_category_recipe(category_recipe_id: int, 
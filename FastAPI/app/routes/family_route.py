@@ -1,13 +1,18 @@
 """
 This module contains the routes for managing family data.
 """
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.family_model import Family
+from app.models.family_model import Family, FamilyPantrySnapshotResponse, FamilyResponse
+from app.models.page_model import Page
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.family_service import (
     create_family_service,
     get_all_families_service,
+    stream_all_families_service,
     get_family_service,
+    get_family_pantry_service,
     update_family_service,
     delete_family_service
 )
@@ -27,8 +32,8 @@ def create_family(family: Family = Body(...)):
     """
     return create_family_service(family)
 
-@family_router.get("/{family_id}")
-def read_family(family_id: int):
+@family_router.get("/{family_id}", response_model=FamilyResponse)
+async def read_family(family_id: int):
     """
     Retrieves a family by its ID.
 
@@ -42,19 +47,47 @@ def read_family(family_id: int):
         HTTPException: If the family is not found.
     """
     try:
-        return get_family_service(family_id)
+        return await get_family_service(family_id)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Family not found") from exc
 
-@family_router.get("/")
-def read_families():
+@family_router.get("/{family_id}/pantry", response_model=FamilyPantrySnapshotResponse)
+async def read_family_pantry(family_id: int):
     """
-    Reads and returns all families.
+    Retrieves the pantries of every member of a family in a single request.
+
+    Args:
+        family_id (int): The ID of the family.
+
+    Returns:
+        dict: The family members with their pantries and inventory items,
+        plus the items grouped by ingredient.
+
+    Raises:
+        HTTPException: If the family is not found.
+    """
+    try:
+        return await get_family_pantry_service(family_id)
+    except DoesNotExist as exc:
+        raise HTTPException(status_code=404, detail="Family not found") from exc
+
+@family_router.get("/", response_model=Page[FamilyResponse])
+async def read_families(page: dict = Depends(get_page_params),
+                        stream: bool = Depends(wants_ndjson)):
+    """
+    Reads and returns a page of families, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
 
     Returns:
-        List[Family]: A list of all families.
+        dict: The families of the page and the `next_cursor` of the following one.
+        StreamingResponse: The families as NDJSON when streaming is requested.
     """
-    return get_all_families_service()
+    if stream:
+        return ndjson_response(stream_all_families_service(page["after_id"]))
+    return await get_all_families_service(**page)
 
 @family_router.put("/{family_id}")
 def update_family(family_id: int, family_data: Family = Body(...)):
@@ -1,39 +1,102 @@
 """
 This module contains the routes for managing ingredient inventory data.
 """
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.ingredient_inventory_model import IngredientInventory
+from app.models.ingredient_inventory_model import (
+    IngredientInventory,
+    IngredientInventoryBulkItem,
+    IngredientInventoryResponse
+)
+from app.models.page_model import Page
+from app.helpers.bulk import check_bulk_size
+from app.helpers.fields import fields_param
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.ingredient_inventory_service import (
+    INGREDIENT_INVENTORY_FIELDS,
+    create_ingredient_inventories_bulk_service,
+    update_ingredient_inventories_bulk_service,
+    delete_ingredient_inventories_bulk_service,
     create_ingredient_inventory_service,
     get_all_ingredient_inventories_service,
+    stream_all_ingredient_inventories_service,
     get_ingredient_inventory_service,
     update_ingredient_inventory_service,
     delete_ingredient_inventory_service
 )
 
 ingredient_inventory_router = APIRouter()
+get_fields = fields_param(INGREDIENT_INVENTORY_FIELDS)
 
 @ingredient_inventory_router.post("/")
-def create_ingredient_inventory(ingredient_inventory: IngredientInventory = Body(...)):
+def create_ingredient_inventory(
+        ingredient_inventory: IngredientInventoryBulkItem = Body(...)):
     """
     Creates a new ingredient inventory in the database.
 
     Parameters:
-        ingredient_inventory (IngredientInventory): An object containing the ingredient details.
+        ingredient_inventory (IngredientInventoryBulkItem): An object containing the
+        ingredient details, with its pantry.
         
     Returns:
         The created ingredient inventory object.
     """
     return create_ingredient_inventory_service(ingredient_inventory)
 
-@ingredient_inventory_router.get("/{ingredient_inventory_id}")
-def read_ingredient_inventory(ingredient_inventory_id: int):
+@ingredient_inventory_router.post("/bulk")
+def create_ingredient_inventories_bulk(items: list[dict] = Body(...)):
+    """
+    Creates many ingredient inventories in a single transaction.
+
+    Parameters:
+        items (list[dict]): The ingredient inventories to create, each with its `pantryId`.
+
+    Returns:
+        dict: The number of created ingredient inventories and the items that failed.
+    """
+    check_bulk_size(items)
+    return create_ingredient_inventories_bulk_service(items)
+
+@ingredient_inventory_router.put("/bulk")
+def update_ingredient_inventories_bulk(items: list[dict] = Body(...)):
+    """
+    Updates many ingredient inventories in a single transaction.
+
+    Parameters:
+        items (list[dict]): The ingredient inventories to update, each with its ID.
+
+    Returns:
+        dict: The number of updated ingredient inventories and the items that failed.
+    """
+    check_bulk_size(items)
+    return update_ingredient_inventories_bulk_service(items)
+
+@ingredient_inventory_router.delete("/bulk")
+def delete_ingredient_inventories_bulk(ingredient_inventory_ids: list[int] = Body(...)):
+    """
+    Deletes many ingredient inventories in a single transaction.
+
+    Parameters:
+        ingredient_inventory_ids (list[int]): The IDs of the ingredient inventories to delete.
+
+    Returns:
+        dict: The number of deleted ingredient inventories and the IDs that were not found.
+    """
+    check_bulk_size(ingredient_inventory_ids)
+    return delete_ingredient_inventories_bulk_service(ingredient_inventory_ids)
+
+@ingredient_inventory_router.get("/{ingredient_inventory_id}",
+                                 response_model=IngredientInventoryResponse,
+                                 response_model_exclude_unset=True)
+async def read_ingredient_inventory(ingredient_inventory_id: int,
+                                    fields: tuple = Depends(get_fields)):
     """
     Retrieves an ingredient inventory by its ID.
 
     Args:
         ingredient_inventory_id (int): The ID of the ingredient inventory to retrieve.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
         IngredientInventory: The ingredient inventory object.
@@ -42,19 +105,30 @@ def read_ingredient_inventory(ingredient_inventory_id: int):
         HTTPException: If the ingredient inventory is not found.
     """
     try:
-        return get_ingredient_inventory_service(ingredient_inventory_id)
+        return await get_ingredient_inventory_service(ingredient_inventory_id, fields)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Ingredient inventory not found") from exc
     
-@ingredient_inventory_router.get("/")
-def read_ingredient_inventories():
+@ingredient_inventory_router.get("/", response_model=Page[IngredientInventoryResponse],
+                                 response_model_exclude_unset=True)
+async def read_ingredient_inventories(page: dict = Depends(get_page_params),
+                                      stream: bool = Depends(wants_ndjson),
+                                      fields: tuple = Depends(get_fields)):
     """
-    Reads and returns all ingredient inventories.
+    Reads and returns a page of ingredient inventories, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
-        List[IngredientInventory]: A list of all ingredient inventories.
+        dict: The ingredient inventories of the page and the `next_cursor` of the following one.
+        StreamingResponse: The ingredient inventories as NDJSON when streaming is requested.
     """
-    return get_all_ingredient_inventories_service()
+    if stream:
+        return ndjson_response(stream_all_ingredient_inventories_service(page["after_id"], fields))
+    return await get_all_ingredient_inventories_service(**page, fields=fields)
 
 @ingredient_inventory_router.put("/{ingredient_inventory_id}")
 def update_ingredient_inventory(ingredient_inventory_id: int, 
@@ -2,39 +2,95 @@
 This module contains the routes for managing ingredient data.
 """
 
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.ingredient_model import Ingredient
+from app.models.ingredient_model import Ingredient, IngredientBulkItem, IngredientResponse
+from app.models.page_model import Page
+from app.helpers.bulk import check_bulk_size
+from app.helpers.fields import fields_param
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.ingredient_service import (
+    INGREDIENT_FIELDS,
+    create_ingredients_bulk_service,
+    update_ingredients_bulk_service,
+    delete_ingredients_bulk_service,
     create_ingredient_service,
     get_all_ingredients_service,
+    stream_all_ingredients_service,
     get_ingredient_service,
     update_ingredient_service,
     delete_ingredient_service
 )
 
 ingredient_router = APIRouter()
+get_fields = fields_param(INGREDIENT_FIELDS)
 
 @ingredient_router.post("/")
-def create_ingredient(ingredient: Ingredient = Body(...)):
+def create_ingredient(ingredient: IngredientBulkItem = Body(...)):
     """
     Creates a new ingredient in the database.
 
     Parameters:
-        ingredient (Ingredient): An object containing the ingredient details.
+        ingredient (IngredientBulkItem): An object containing the ingredient details,
+        with its recipe and category.
         
     Returns:
         The created ingredient object.
     """
     return create_ingredient_service(ingredient)
 
-@ingredient_router.get("/{ingredient_id}")
-def read_ingredient(ingredient_id: int):
+@ingredient_router.post("/bulk")
+def create_ingredients_bulk(items: list[dict] = Body(...)):
+    """
+    Creates many ingredients in a single transaction.
+
+    Parameters:
+        items (list[dict]): The ingredients to create, each with its recipe and category.
+
+    Returns:
+        dict: The number of created ingredients and the items that failed.
+    """
+    check_bulk_size(items)
+    return create_ingredients_bulk_service(items)
+
+@ingredient_router.put("/bulk")
+def update_ingredients_bulk(items: list[dict] = Body(...)):
+    """
+    Updates many ingredients in a single transaction.
+
+    Parameters:
+        items (list[dict]): The ingredients to update, each with its ID.
+
+    Returns:
+        dict: The number of updated ingredients and the items that failed.
+    """
+    check_bulk_size(items)
+    return update_ingredients_bulk_service(items)
+
+@ingredient_router.delete("/bulk")
+def delete_ingredients_bulk(ingredient_ids: list[int] = Body(...)):
+    """
+    Deletes many ingredients in a single transaction.
+
+    Parameters:
+        ingredient_ids (list[int]): The IDs of the ingredients to delete.
+
+    Returns:
+        dict: The number of deleted ingredients and the IDs that were not found.
+    """
+    check_bulk_size(ingredient_ids)
+    return delete_ingredients_bulk_service(ingredient_ids)
+
+@ingredient_router.get("/{ingredient_id}", response_model=IngredientResponse,
+                       response_model_exclude_unset=True)
+async def read_ingredient(ingredient_id: int, fields: tuple = Depends(get_fields)):
     """
     Retrieves an ingredient by its ID.
 
     Args:
         ingredient_id (int): The ID of the ingredient to retrieve.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
         Ingredient: The ingredient object.
@@ -43,19 +99,30 @@ def read_ingredient(ingredient_id: int):
         HTTPException: If the ingredient is not found.
     """
     try:
-        return get_ingredient_service(ingredient_id)
+        return await get_ingredient_service(ingredient_id, fields)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Ingredient not found") from exc
     
-@ingredient_router.get("/")
-def read_ingredients():
+@ingredient_router.get("/", response_model=Page[IngredientResponse],
+                       response_model_exclude_unset=True)
+async def read_ingredients(page: dict = Depends(get_page_params),
+                           stream: bool = Depends(wants_ndjson),
+                           fields: tuple = Depends(get_fields)):
     """
-    Reads and returns all ingredients.
+    Reads and returns a page of ingredients, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
-        List[Ingredient]: A list of all ingredients.
+        dict: The ingredients of the page and the `next_cursor` of the following one.
+        StreamingResponse: The ingredients as NDJSON when streaming is requested.
     """
-    return get_all_ingredients_service()
+    if stream:
+        return ndjson_response(stream_all_ingredients_service(page["after_id"], fields))
+    return await get_all_ingredients_service(**page, fields=fields)
 
 @ingredient_router.put("/{ingredient_id}")
 def update_ingredient(ingredient_id: int, ingredient_data: Ingredient = Body(...)):
@@ -1,16 +1,23 @@
 """
 This module contains the routes for managing menu data.
 """
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.menu_model import Menu
+from app.models.menu_model import Menu, MenuResponse
+from app.models.page_model import Page
+from app.helpers.bulk import check_bulk_size
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.menu_service import (
+    add_menu_recipes_bulk_service,
     create_menu_service,
     get_all_menus_service,
+    stream_all_menus_service,
     get_menu_service,
     update_menu_service,
     delete_menu_service
 )
+from app.services.shopping_list_service import generate_shopping_list_service
 
 menu_router = APIRouter()
 
@@ -27,8 +34,48 @@ def create_menu(menu: Menu = Body(...)):
     """
     return create_menu_service(menu)
 
-@menu_router.get("/{menu_id}")
-def read_menu(menu_id: int):
+@menu_router.post("/{menu_id}/recipes/bulk")
+def add_menu_recipes_bulk(menu_id: int, recipe_ids: list[int] = Body(...)):
+    """
+    Adds many recipes to a menu in a single transaction.
+
+    Parameters:
+        menu_id (int): The ID of the menu.
+        recipe_ids (list[int]): The IDs of the recipes to add.
+
+    Returns:
+        dict: The number of recipes added and the items that failed.
+
+    Raises:
+        HTTPException: If the menu does not exist.
+    """
+    check_bulk_size(recipe_ids)
+    try:
+        return add_menu_recipes_bulk_service(menu_id, recipe_ids)
+    except DoesNotExist as exc:
+        raise HTTPException(status_code=404, detail="Menu not found") from exc
+
+@menu_router.post("/{menu_id}/shopping-list")
+def create_menu_shopping_list(menu_id: int):
+    """
+    Generates the shopping list of a menu from its recipes and the owner's pantry.
+
+    Parameters:
+        menu_id (int): The ID of the menu.
+
+    Returns:
+        dict: The created shopping list and the ingredients to buy.
+
+    Raises:
+        HTTPException: If the menu does not exist.
+    """
+    try:
+        return generate_shopping_list_service(menu_id)
+    except DoesNotExist as exc:
+        raise HTTPException(status_code=404, detail="Menu not found") from exc
+
+@menu_router.get("/{menu_id}", response_model=MenuResponse)
+async def read_menu(menu_id: int):
     """
     Retrieves a menu by its ID.
 
@@ -42,19 +89,27 @@ def read_menu(menu_id: int):
         HTTPException: If the menu is not found.
     """
     try:
-        return get_menu_service(menu_id)
+        return await get_menu_service(menu_id)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Menu not found") from exc
 
-@menu_router.get("/")
-def read_menus():
+@menu_router.get("/", response_model=Page[MenuResponse])
+async def read_menus(page: dict = Depends(get_page_params),
+                     stream: bool = Depends(wants_ndjson)):
     """
-    Reads and returns all menus.
+    Reads and returns a page of menus, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
 
     Returns:
-        List[Menu]: A list of all menus.
+        dict: The menus of the page and the `next_cursor` of the following one.
+        StreamingResponse: The menus as NDJSON when streaming is requested.
     """
-    return get_all_menus_service()
+    if stream:
+        return ndjson_response(stream_all_menus_service(page["after_id"]))
+    return await get_all_menus_service(**page)
 
 @menu_router.put("/{menu_id}")
 def update_menu(menu_id: int, menu_data: Menu = Body(...)):
@@ -1,18 +1,27 @@
 """
 This module contains the routes for managing notification data.
 """
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.notification_model import Notification
+from app.models.notification_model import Notification, NotificationResponse
+from app.models.page_model import Page
+from app.helpers.bulk import check_bulk_size
+from app.helpers.fields import fields_param
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.notification_service import (
+    NOTIFICATION_FIELDS,
+    create_notifications_bulk_service,
     create_notification_service,
     get_all_notifications_service,
+    stream_all_notifications_service,
     get_notification_service,
     update_notification_service,
     delete_notification_service
 )
 
 notification_router = APIRouter()
+get_fields = fields_param(NOTIFICATION_FIELDS)
 
 @notification_router.post("/")
 def create_notification(notification: Notification = Body(...)):
@@ -27,13 +36,29 @@ def create_notification(notification: Notification = Body(...)):
     """
     return create_notification_service(notification)
 
-@notification_router.get("/{notification_id}")
-def read_notification(notification_id: int):
+@notification_router.post("/bulk")
+def create_notifications_bulk(items: list[dict] = Body(...)):
+    """
+    Creates many notifications in a single transaction.
+
+    Parameters:
+        items (list[dict]): The notifications to create, each with its `userId`.
+
+    Returns:
+        dict: The number of created notifications and the items that failed.
+    """
+    check_bulk_size(items)
+    return create_notifications_bulk_service(items)
+
+@notification_router.get("/{notification_id}", response_model=NotificationResponse,
+                         response_model_exclude_unset=True)
+async def read_notification(notification_id: int, fields: tuple = Depends(get_fields)):
     """
     Retrieves a notification by its ID.
 
     Args:
         notification_id (int): The ID of the notification to retrieve.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
         Notification: The notification object.
@@ -42,19 +67,30 @@ def read_notification(notification_id: int):
         HTTPException: If the notification is not found.
     """
     try:
-        return get_notification_service(notification_id)
+        return await get_notification_service(notification_id, fields)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Notification not found") from exc
 
-@notification_router.get("/")
-def read_notifications():
+@notification_router.get("/", response_model=Page[NotificationResponse],
+                         response_model_exclude_unset=True)
+async def read_notifications(page: dict = Depends(get_page_params),
+                             stream: bool = Depends(wants_ndjson),
+                             fields: tuple = Depends(get_fields)):
     """
-    Reads and returns all notifications.
+    Reads and returns a page of notifications, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
-        List[Notification]: A list of all notifications.
+        dict: The notifications of the page and the `next_cursor` of the following one.
+        StreamingResponse: The notifications as NDJSON when streaming is requested.
     """
-    return get_all_notifications_service()
+    if stream:
+        return ndjson_response(stream_all_notifications_service(page["after_id"], fields))
+    return await get_all_notifications_service(**page, fields=fields)
 
 @notification_router.put("/{notification_id}")
 def update_notification(notification_id: int, notification_data: Notification = Body(...)):
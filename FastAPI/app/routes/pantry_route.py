@@ -1,13 +1,25 @@
 """
 This module contains the routes for managing pantry data.
 """
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from peewee import DoesNotExist
-from app.models.pantry_model import Pantry
+from app.models.pantry_model import (
+    Pantry,
+    PantryCookableResponse,
+    PantryResponse,
+    PantryTotalsResponse
+)
+from app.models.page_model import Page
+from app.config.settings import RECIPE_INDEX
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.pantry_service import (
     create_pantry_service,
     get_all_pantries_service,
+    stream_all_pantries_service,
     get_pantry_service,
+    get_pantry_cookable_service,
+    get_pantry_totals_service,
     # update_pantry_service,
     delete_pantry_service
 )
@@ -27,8 +39,8 @@ def create_pantry(pantry: Pantry = Body(...)):
     """
     return create_pantry_service(pantry)
 
-@pantry_router.get("/{pantry_id}")
-def read_pantry(pantry_id: int):
+@pantry_router.get("/{pantry_id}", response_model=PantryResponse)
+async def read_pantry(pantry_id: int):
     """
     Retrieves a pantry by its ID.
 
@@ -42,19 +54,69 @@ def read_pantry(pantry_id: int):
         HTTPException: If the pantry is not found.
     """
     try:
-        return get_pantry_service(pantry_id)
+        return await get_pantry_service(pantry_id)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Pantry not found") from exc
 
-@pantry_router.get("/")
-def read_pantries():
+@pantry_router.get("/{pantry_id}/totals", response_model=PantryTotalsResponse)
+async def read_pantry_totals(pantry_id: int):
     """
-    Reads and returns all pantries.
+    Retrieves the inventory of a pantry summed by ingredient.
+
+    Args:
+        pantry_id (int): The ID of the pantry.
+
+    Returns:
+        dict: The total quantity in base units of each ingredient of the pantry.
+
+    Raises:
+        HTTPException: If the pantry is not found.
+    """
+    try:
+        return await get_pantry_totals_service(pantry_id)
+    except DoesNotExist as exc:
+        raise HTTPException(status_code=404, detail="Pantry not found") from exc
+
+@pantry_router.get("/{pantry_id}/cookable", response_model=PantryCookableResponse)
+async def read_pantry_cookable(
+    pantry_id: int,
+    limit: int = Query(RECIPE_INDEX["default_limit"], ge=1, le=RECIPE_INDEX["max_limit"]),
+):
+    """
+    Retrieves the recipes that use the most ingredients available in a pantry.
+
+    Args:
+        pantry_id (int): The ID of the pantry.
+        limit (int): The maximum number of recipes to return.
+
+    Returns:
+        dict: The best matching recipes with their matched and missing ingredient counts.
+
+    Raises:
+        HTTPException: If the pantry is not found.
+    """
+    try:
+        return await get_pantry_cookable_service(pantry_id, limit)
+    except DoesNotExist as exc:
+        raise HTTPException(status_code=404, detail="Pantry not found") from exc
+
+@pantry_router.get("/", response_model=Page[PantryResponse])
+async def read_pantries(page: dict = Depends(get_page_params),
+                        stream: bool = Depends(wants_ndjson)):
+    """
+    Reads and returns a page of pantries, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
 
     Returns:
-        List[Pantry]: A list of all pantries.
+        dict: The pantries of the page and the `next_cursor` of the following one.
+        StreamingResponse: The pantries as NDJSON when streaming is requested.
     """
-    return get_all_pantries_service()
+    if stream:
+        return ndjson_response(stream_all_pantries_service(page["after_id"]))
+    return await get_all_pantries_service(**page)
 
 # @pantry_router.put("/{pantry_id}")
 # def update_pantry(pantry_id: int, pantry_data: Pantry = Body(...)):
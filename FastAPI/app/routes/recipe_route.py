@@ -1,18 +1,30 @@
 """
 This module contains the routes for managing recipe data.
 """
-from fastapi import APIRouter, Body, HTTPException
-from peewee import DoesNotExist
-from app.models.recipe_model import Recipe
+from typing import Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from peewee import DoesNotExist, IntegrityError
+from app.models.recipe_model import Recipe, RecipeResponse, RecipeSearchResponse
+from app.models.page_model import Page
+from app.config.settings import PAGINATION
+from app.helpers.fields import expand_param, fields_param
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.recipe_service import (
+    RECIPE_EXPANSIONS,
+    RECIPE_FIELDS,
     create_recipe_service,
     get_all_recipes_service,
+    stream_all_recipes_service,
     get_recipe_service,
+    search_recipes_service,
     update_recipe_service,
     delete_recipe_service
 )
 
 recipe_router = APIRouter()
+get_fields = fields_param(RECIPE_FIELDS)
+get_expand = expand_param(RECIPE_EXPANSIONS)
 
 @recipe_router.post("/")
 def create_recipe(recipe: Recipe = Body(...)):
@@ -28,12 +40,43 @@ def create_recipe(recipe: Recipe = Body(...)):
 
     return create_recipe_service(recipe)
 
-@recipe_router.get("/{recipe_id}")
-def read_recipe(recipe_id: int):
+@recipe_router.get("/search", response_model=Page[RecipeSearchResponse],
+                   response_model_exclude_unset=True)
+async def search_recipes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(PAGINATION["default_limit"], ge=1, le=PAGINATION["max_limit"]),
+    cursor: Optional[int] = Query(None, ge=0),
+    category_id: Optional[int] = Query(None, ge=1),
+    difficulty: Optional[str] = Query(None, max_length=255),
+    fields: tuple = Depends(get_fields),
+):
+    """
+    Searches recipes by name, description and instructions, best match first.
+
+    Parameters:
+        q (str): The words to search for.
+        limit (int): The maximum number of recipes to return.
+        cursor (int): The `next_cursor` returned by the previous page, if any.
+        category_id (int): Only recipes of this category, if given.
+        difficulty (str): Only recipes of this difficulty, if given.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
+
+    Returns:
+        dict: The matching recipes with their relevance and the `next_cursor`
+        of the following page.
+    """
+    return await search_recipes_service(q, limit, cursor, category_id, difficulty, fields)
+
+@recipe_router.get("/{recipe_id}", response_model=RecipeResponse, response_model_exclude_unset=True)
+async def read_recipe(recipe_id: int, fields: tuple = Depends(get_fields),
+                      expand: tuple = Depends(get_expand)):
     """
     Retrieves a recipe by their ID.
     Args:
         recipe_id (int): The ID of the recipe to retrieve.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
+        expand (tuple): The related resources to embed, from the comma-separated
+            `expand` parameter: `ingredients` (with their category) and `categories`.
     Returns:
         Recipe: The recipe object.
     Raises:
@@ -41,19 +84,37 @@ def read_recipe(recipe_id: int):
     """
 
     try:
-        return get_recipe_service(recipe_id)
+        return await get_recipe_service(recipe_id, fields, expand)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Recipe not found") from exc
     
-@recipe_router.get("/")
-def read_recipes():
+@recipe_router.get("/", response_model=Page[RecipeResponse], response_model_exclude_unset=True)
+async def read_recipes(page: dict = Depends(get_page_params),
+                       stream: bool = Depends(wants_ndjson),
+                       fields: tuple = Depends(get_fields),
+                       expand: tuple = Depends(get_expand)):
     """
-    Reads and returns all recipes.
+    Reads and returns a page of recipes, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
+        expand (tuple): The related resources to embed in each recipe, from the
+            comma-separated `expand` parameter; not available when streaming.
     Returns:
-        List[Recipe]: A list of all recipes.
+        dict: The recipes of the page and the `next_cursor` of the following one.
+        StreamingResponse: The recipes as NDJSON when streaming is requested.
+    Raises:
+        HTTPException: If expansions are requested together with streaming.
     """
 
-    return get_all_recipes_service()
+    if stream:
+        if expand:
+            raise HTTPException(status_code=400,
+                                detail="The expand parameter is not supported when streaming")
+        return ndjson_response(stream_all_recipes_service(page["after_id"], fields))
+    return await get_all_recipes_service(**page, fields=fields, expand=expand)
 
 @recipe_router.put("/{recipe_id}")
 def update_recipe(recipe_id: int, recipe_data: Recipe = Body(...)):
@@ -81,10 +142,13 @@ def delete_recipe(recipe_id: int):
     Returns:
     - NOne
     Raises:
-    - HTTPException: If the recipe does not exist.
+    - HTTPException: If the recipe does not exist, or is still in a menu or a shopping list.
     """
     try:
         return delete_recipe_service(recipe_id)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Recipe not found") from exc
+    except IntegrityError as exc:
+        raise HTTPException(status_code=409,
+                            detail="Recipe is used by a menu or a shopping list") from exc
     
\ No newline at end of file
@@ -2,12 +2,16 @@
 This module contains the routes for managing role data.
 """
 
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.role_model import Role
+from app.models.role_model import Role, RoleResponse
+from app.models.page_model import Page
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.role_service import (
     create_role_service,
     get_all_roles_service,
+    stream_all_roles_service,
     get_role_service,
     update_role_service,
     delete_role_service
@@ -28,8 +32,8 @@ def create_role(role: Role = Body(...)):
     """
     return create_role_service(role)
 
-@role_router.get("/{role_id}")
-def read_role(role_id: int):
+@role_router.get("/{role_id}", response_model=RoleResponse)
+async def read_role(role_id: int):
     """
     Retrieves a role by its ID.
 
@@ -43,19 +47,27 @@ def read_role(role_id: int):
         HTTPException: If the role is not found.
     """
     try:
-        return get_role_service(role_id)
+        return await get_role_service(role_id)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Role not found") from exc
 
-@role_router.get("/")
-def read_roles():
+@role_router.get("/", response_model=Page[RoleResponse])
+async def read_roles(page: dict = Depends(get_page_params),
+                     stream: bool = Depends(wants_ndjson)):
     """
-    Reads and returns all roles.
+    Reads and returns a page of roles, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
 
     Returns:
-        List[Role]: A list of all roles.
+        dict: The roles of the page and the `next_cursor` of the following one.
+        StreamingResponse: The roles as NDJSON when streaming is requested.
     """
-    return get_all_roles_service()
+    if stream:
+        return ndjson_response(stream_all_roles_service(page["after_id"]))
+    return await get_all_roles_service(**page)
 
 @role_router.put("/{role_id}")
 def update_role(role_id: int, role_data: Role = Body(...)):
@@ -1,12 +1,16 @@
 """
 This module contains the routes for managing shoppingList data.
 """
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.shopping_list_model import ShoppingList
+from app.models.shopping_list_model import ShoppingList, ShoppingListResponse
+from app.models.page_model import Page
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.shopping_list_service import (
     create_shopping_list_service,
     get_all_shopping_lists_service,
+    stream_all_shopping_lists_service,
     get_shopping_list_service,
     #update_shopping_list_service,
     delete_shopping_list_service
@@ -27,8 +31,8 @@ def create_shopping_list(shopping_list: ShoppingList = Body(...)):
     """
     return create_shopping_list_service(shopping_list)
 
-@shopping_list_router.get("/{shopping_list_id}")
-def read_shopping_list(shopping_list_id: int):
+@shopping_list_router.get("/{shopping_list_id}", response_model=ShoppingListResponse)
+async def read_shopping_list(shopping_list_id: int):
     """
     Retrieves a shoppingList by its ID.
 
@@ -42,19 +46,27 @@ def read_shopping_list(shopping_list_id: int):
         HTTPException: If the shoppingList is not found.
     """
     try:
-        return get_shopping_list_service(shopping_list_id)
+        return await get_shopping_list_service(shopping_list_id)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="ShoppingList not found") from exc
 
-@shopping_list_router.get("/")
-def read_shopping_lists():
+@shopping_list_router.get("/", response_model=Page[ShoppingListResponse])
+async def read_shopping_lists(page: dict = Depends(get_page_params),
+                              stream: bool = Depends(wants_ndjson)):
     """
-    Reads and returns all shoppingLists.
+    Reads and returns a page of shoppingLists, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
 
     Returns:
-        List[ShoppingList]: A list of all shoppingLists.
+        dict: The shoppingLists of the page and the `next_cursor` of the following one.
+        StreamingResponse: The shoppingLists as NDJSON when streaming is requested.
     """
-    return get_all_shopping_lists_service()
+    if stream:
+        return ndjson_response(stream_all_shopping_lists_service(page["after_id"]))
+    return await get_all_shopping_lists_service(**page)
 
 # @shopping_list_router.put("/{shopping_list_id}")
 # def update_shopping_list(shopping_list_id: int, shopping_list_data: ShoppingList = Body(...)):
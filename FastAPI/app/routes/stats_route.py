@@ -0,0 +1,151 @@
+"""
+This module contains the routes for inspecting runtime statistics of the application.
+"""
+from fastapi import APIRouter, HTTPException, Query
+from starlette.responses import PlainTextResponse
+from app.config.database import database
+from app.config.slow_queries import slow_query_log
+from app.helpers.api_key_auth import api_keys
+from app.helpers.cache import cache_stats
+from app.helpers.compression import compression_stats
+from app.helpers.health import readiness, startup_timings
+from app.helpers.profiling import profiles
+from app.helpers.recipe_index import recipe_index
+from app.helpers.scheduler import job_stats
+
+stats_router = APIRouter()
+
+@stats_router.get("/pool")
+def read_pool_stats():
+    """
+    Retrieves the metrics of the database connection pool.
+
+    Returns:
+        dict: The connections in use, idle and waiting, plus checkout latency.
+    """
+    return database.stats()
+
+@stats_router.get("/cache")
+def read_cache_stats():
+    """
+    Retrieves the counters of the lookup caches.
+
+    Returns:
+        dict: The hits, misses and evictions of each cache by name.
+    """
+    return cache_stats()
+
+@stats_router.get("/api-keys")
+def read_api_key_stats():
+    """
+    Retrieves the state of the API key cache of this worker.
+
+    Returns:
+        dict: The cached keys, the age of the cache and the requests rejected
+        as invalid, lacking a scope or over their rate limit.
+    """
+    return api_keys.stats()
+
+@stats_router.get("/jobs")
+def read_job_stats():
+    """
+    Retrieves the metrics of the background jobs.
+
+    Returns:
+        dict: The runs, failures and last run details of each job by name.
+    """
+    return job_stats()
+
+@stats_router.get("/recipe-index")
+def read_recipe_index_stats():
+    """
+    Retrieves the size and age of the recipe ingredient index.
+
+    Returns:
+        dict: The number of recipes and ingredient names indexed.
+    """
+    return recipe_index.stats()
+
+@stats_router.get("/compression")
+def read_compression_stats():
+    """
+    Retrieves the counters of the response compression.
+
+    Returns:
+        dict: The bytes saved and compression time per response of each encoding.
+    """
+    return compression_stats()
+
+@stats_router.get("/profiles")
+def read_profiles():
+    """
+    Lists the stored request profiles, newest first.
+
+    Returns:
+        list: The ID, path, status, duration, samples and SQL figures of each profile.
+    """
+    return profiles.summaries()
+
+@stats_router.get("/profiles/{profile_id}")
+def read_profile(profile_id: str, output: str = Query("json", pattern="^(json|folded)$")):
+    """
+    Retrieves a request profile by the ID returned in its `X-Profile-Id` header.
+
+    Parameters:
+        profile_id (str): The ID of the profile.
+        output (str): `json` for the whole profile, `folded` for the stacks only,
+            ready for flamegraph.pl or speedscope.
+
+    Returns:
+        dict: The profile, with its folded stacks and SQL statements.
+        PlainTextResponse: The folded stacks when `output=folded`.
+
+    Raises:
+        HTTPException: If the profile is not found.
+    """
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if output == "folded":
+        return PlainTextResponse(profile["folded"])
+    return profile
+
+@stats_router.get("/slow-queries")
+def read_slow_queries(limit: int = Query(20, ge=1, le=100),
+                      order: str = Query("total_ms", pattern="^(total_ms|max_ms|count)$")):
+    """
+    Retrieves the slowest query shapes recorded by the slow query log.
+
+    Parameters:
+        limit (int): The maximum number of shapes to return.
+        order (str): Sort by total time (`total_ms`), worst run (`max_ms`) or `count`.
+
+    Returns:
+        list: Each shape with its count, total, average and maximum duration,
+        the service functions that issued it, the last redacted parameters
+        and its `EXPLAIN` plan.
+    """
+    return slow_query_log.top(limit, order)
+
+@stats_router.delete("/slow-queries")
+def clear_slow_queries():
+    """
+    Clears the slow query log, for instance after deploying an index.
+
+    Returns:
+        dict: A message confirming the log was cleared.
+    """
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+@stats_router.get("/startup")
+def read_startup_stats():
+    """
+    Retrieves the startup timings of the worker and the state of its database connection.
+
+    Returns:
+        dict: The milliseconds spent importing, registering each router and
+        running the lifespan, the total against the startup budget, and the
+        attempts made to reach the database.
+    """
+    return {**startup_timings.report(), "database": readiness.snapshot()}
@@ -2,18 +2,25 @@
 This module contains the routes for managing user data.
 """
 
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from peewee import DoesNotExist
-from app.models.user_model import User
+from app.models.user_model import User, UserResponse
+from app.models.page_model import Page
+from app.helpers.fields import fields_param
+from app.helpers.pagination import get_page_params
+from app.helpers.streaming import ndjson_response, wants_ndjson
 from app.services.user_service import (
+    USER_FIELDS,
     create_user_service,
     get_all_users_service,
+    stream_all_users_service,
     get_user_service,
     update_user_service,
     delete_user_service
 )
 
 user_router = APIRouter()
+get_fields = fields_param(USER_FIELDS)
 
 @user_router.post("/")
 def create_user(user: User = Body(...)):
@@ -28,13 +35,14 @@ def create_user(user: User = Body(...)):
     """
     return create_user_service(user)
 
-@user_router.get("/{user_id}")
-def read_user(user_id: int):
+@user_router.get("/{user_id}", response_model=UserResponse, response_model_exclude_unset=True)
+async def read_user(user_id: int, fields: tuple = Depends(get_fields)):
     """
     Retrieves a user by their ID.
 
     Args:
         user_id (int): The ID of the user to retrieve.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
         User: The user object.
@@ -43,19 +51,29 @@ def read_user(user_id: int):
         HTTPException: If the user is not found.
     """
     try:
-        return get_user_service(user_id)
+        return await get_user_service(user_id, fields)
     except DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="User not found") from exc
     
-@user_router.get("/")
-def read_users():
+@user_router.get("/", response_model=Page[UserResponse], response_model_exclude_unset=True)
+async def read_users(page: dict = Depends(get_page_params),
+                     stream: bool = Depends(wants_ndjson),
+                     fields: tuple = Depends(get_fields)):
     """
-    Reads and returns all users.
+    Reads and returns a page of users, ordered by ID, or streams them as NDJSON.
+
+    Parameters:
+        page (dict): The `limit` and `after_id` cursor of the requested page.
+        stream (bool): Whether the client asked for `application/x-ndjson` streaming.
+        fields (tuple): The fields to return, from the comma-separated `fields` parameter.
 
     Returns:
-        List[User]: A list of all users.
+        dict: The users of the page and the `next_cursor` of the following one.
+        StreamingResponse: The users as NDJSON when streaming is requested.
     """
-    return get_all_users_service()
+    if stream:
+        return ndjson_response(stream_all_users_service(page["after_id"], fields))
+    return await get_all_users_service(**page, fields=fields)
 
 @user_router.put("/{user_id}")
 def update_user(user_id: int, user_data: User = Body(...)):
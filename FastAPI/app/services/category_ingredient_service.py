@@ -1,6 +1,16 @@
 """This module contains the service functions for the categoryIngredient class."""
 from app.models.category_ingredient_model import CategoryIngredient
+from app.config.database import CategoryIngredient as CategoryIngredientModel
+from app.config.async_database import fetch_one
+from app.helpers.fields import FieldMap
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.cache import cached_async, create_cache
+from app.helpers.http_cache import bumps_data_version
 
+_category_ingredient_cache = create_cache("category_ingredients")
+
+@bumps_data_version
 def create_category_ingredient_service(category_ingredient):
     """
     Creates a new categoryIngredient in the database.
@@ -19,43 +29,78 @@ def create_category_ingredient_service(category_ingredient):
     )
     return category_ingredient_record
 
-def get_category_ingredient_service(category_ingredient_id: int):
+def _category_ingredient_to_dict(category_ingredient):
+    """Builds the dictionary returned to the client for a categoryIngredient record."""
+    return {
+        "id": category_ingredient.idCategoryIngredient,
+        "name": category_ingredient.nameCategoryIngredient,
+        "description": category_ingredient.descriptionCategoryIngredient
+    }
+
+CATEGORY_INGREDIENT_FIELDS = FieldMap(
+    CategoryIngredientModel.idCategoryIngredient,
+    name=CategoryIngredientModel.nameCategoryIngredient,
+    description=CategoryIngredientModel.descriptionCategoryIngredient
+)
+
+async def get_category_ingredient_service(category_ingredient_id: int, fields: tuple = None):
     """
-    Retrieves a categoryIngredient by its ID.
+    Retrieves a categoryIngredient by its ID without blocking the event loop.
 
     Args:
         category_ingredient_id (int): The unique identifier of the categoryIngredient.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
         DICT: A dictionary containing the categoryIngredient's details.
-        
+
     Raises:
         DoesNotExist: If the categoryIngredient with the given ID does not exist.
     """
-    category_ingredient = CategoryIngredient.get_by_id(category_ingredient_id)
-    return {
-        "id": category_ingredient.idCategoryIngredient,
-        "name": category_ingredient.nameCategoryIngredient,
-        "description": category_ingredient.descriptionCategoryIngredient
-    }
+    async def load():
+        query = CategoryIngredientModel.select().where(
+            CategoryIngredientModel.idCategoryIngredient == category_ingredient_id)
+        return _category_ingredient_to_dict(await fetch_one(query))
+    category_ingredient = await cached_async(_category_ingredient_cache,
+                                             category_ingredient_id, load)
+    return CATEGORY_INGREDIENT_FIELDS.pick(category_ingredient, fields)
 
-def get_all_category_ingredients_service():
+async def get_all_category_ingredients_service(limit: int, after_id: int = None,
+                                               fields: tuple = None):
     """
-    Retrieves all categoryIngredients from the database.
+    Retrieves a page of categoryIngredients ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of categoryIngredients to return.
+        after_id (int): The cursor of the previous page, if any.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
-        List: A list of dictionaries containing the data of each categoryIngredient's details.
+        dict: The categoryIngredients of the page and the cursor of the next one.
     """
-    category_ingredients = list(CategoryIngredient.select())
-    return [
-        {
-        "id": category_ingredient.idCategoryIngredient,
-        "name": category_ingredient.nameCategoryIngredient,
-        "description": category_ingredient.descriptionCategoryIngredient
-        }
-        for category_ingredient in category_ingredients
-    ]
+    query, serializer = CATEGORY_INGREDIENT_FIELDS.project(fields, _category_ingredient_to_dict)
+    return await paginate_async(query, CategoryIngredientModel.idCategoryIngredient,
+                                serializer, limit, after_id)
+
+def stream_all_category_ingredients_service(after_id: int = None, fields: tuple = None):
+    """
+    Yields every categoryIngredient ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only categoryIngredients with a greater ID are streamed, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
+
+    Yields:
+        dict: The details of each categoryIngredient.
+    """
+    query, serializer = CATEGORY_INGREDIENT_FIELDS.project(fields, _category_ingredient_to_dict)
+    query = query.order_by(CategoryIngredientModel.idCategoryIngredient)
+    if after_id is not None:
+        query = query.where(CategoryIngredientModel.idCategoryIngredient > after_id)
+    for category_ingredient in iterate_rows(query):
+        yield serializer(category_ingredient)
 
+@bumps_data_version
 def update_category_ingredient_service(category_ingredient_id: int, 
                                        category_data_i: CategoryIngredient):
     """
@@ -67,17 +112,19 @@ def update_category_ingredient_service(category_ingredient_id: int,
         updated categoryIngredient details.
         
     Returns:
-        CategoryIngredientModel: The updated categoryIngredient record.
+        dict: The updated categoryIngredient details.
         
     Raises:
         DoesNotExist: If the categoryIngredient with the given ID does not exist.
     """
-    category_ingre = CategoryIngredient.get_by_id(category_ingredient_id)
+    category_ingre = CategoryIngredientModel.get_by_id(category_ingredient_id)
     category_ingre.nameCategoryIngredient = category_data_i.nameCategoryIngredient
     category_ingre.descriptionCategoryIngredient = category_data_i.descriptionCategoryIngredient
     category_ingre.save()
-    return category_ingre
+    _category_ingredient_cache.delete(category_ingredient_id)
+    return _category_ingredient_to_dict(category_ingre)
 
+@bumps_data_version
 def delete_category_ingredient_service(category_ingredient_id: int):
     """
     Deletes a categoryIngredient from the database by its ID.
@@ -91,6 +138,7 @@ def delete_category_ingredient_service(category_ingredient_id: int):
     Raises:
         DoesNotExist: If the categoryIngredient with the given ID does not exist.
     """
-    category_ingredient = CategoryIngredient.get_by_id(category_ingredient_id)
+    category_ingredient = CategoryIngredientModel.get_by_id(category_ingredient_id)
     category_ingredient.delete_instance()
+    _category_ingredient_cache.delete(category_ingredient_id)
     return {"message": "CategoryIngredient deleted successfully"}
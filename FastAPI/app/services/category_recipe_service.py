@@ -1,6 +1,16 @@
 """This module contains the service functions for the categoryRecipe class."""
 from app.models.category_recipe_model import CategoryRecipe
+from app.config.database import CategoryRecipe as CategoryRecipeModel
+from app.config.async_database import fetch_one
+from app.helpers.fields import FieldMap
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.cache import cached_async, create_cache
+from app.helpers.http_cache import bumps_data_version
 
+_category_recipe_cache = create_cache("category_recipes")
+
+@bumps_data_version
 def create_category_recipe_service(category_recipe):
     """
     Creates a new categoryRecipe in the database.
@@ -18,43 +28,77 @@ def create_category_recipe_service(category_recipe):
     )
     return category_recipe_record
 
-def get_category_recipe_service(category_recipe_id: int):
+def _category_recipe_to_dict(category_recipe):
+    """Builds the dictionary returned to the client for a categoryRecipe record."""
+    return {
+        "id": category_recipe.idCategoryRecipe,
+        "name": category_recipe.nameCategoryRecipe,
+        "description": category_recipe.descriptionCategoryRecipe
+    }
+
+CATEGORY_RECIPE_FIELDS = FieldMap(
+    CategoryRecipeModel.idCategoryRecipe,
+    name=CategoryRecipeModel.nameCategoryRecipe,
+    description=CategoryRecipeModel.descriptionCategoryRecipe
+)
+
+async def get_category_recipe_service(category_recipe_id: int, fields: tuple = None):
     """
-    Retrieves a categoryRecipe by its ID.
+    Retrieves a categoryRecipe by its ID without blocking the event loop.
 
     Args:
         category_recipe_id (int): The unique identifier of the categoryRecipe.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
         DICT: A dictionary containing the categoryRecipe's details.
-        
+
     Raises:
         DoesNotExist: If the categoryRecipe with the given ID does not exist.
     """
-    category_recipe = CategoryRecipe.get_by_id(category_recipe_id)
-    return {
-        "id": category_recipe.idCategoryRecipe,
-        "name": category_recipe.nameCategoryRecipe,
-        "description": category_recipe.descriptionCategoryRecipe
-    }
+    async def load():
+        query = CategoryRecipeModel.select().where(
+            CategoryRecipeModel.idCategoryRecipe == category_recipe_id)
+        return _category_recipe_to_dict(await fetch_one(query))
+    category_recipe = await cached_async(_category_recipe_cache, category_recipe_id, load)
+    return CATEGORY_RECIPE_FIELDS.pick(category_recipe, fields)
 
-def get_all_category_recipes_service():
+async def get_all_category_recipes_service(limit: int, after_id: int = None,
+                                           fields: tuple = None):
     """
-    Retrieves all categoryRecipes from the database.
+    Retrieves a page of categoryRecipes ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of categoryRecipes to return.
+        after_id (int): The cursor of the previous page, if any.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
-        List: A list of dictionaries containing the data of each categoryRecipe's details.
+        dict: The categoryRecipes of the page and the cursor of the next one.
     """
-    category_recipes = list(CategoryRecipe.select())
-    return [
-        {
-        "id": category_recipe.idCategoryRecipe,
-        "name": category_recipe.nameCategoryRecipe,
-        "description": category_recipe.descriptionCategoryRecipe
-        }
-        for category_recipe in category_recipes
-    ]
+    query, serializer = CATEGORY_RECIPE_FIELDS.project(fields, _category_recipe_to_dict)
+    return await paginate_async(query, CategoryRecipeModel.idCategoryRecipe,
+                                serializer, limit, after_id)
+
+def stream_all_category_recipes_service(after_id: int = None, fields: tuple = None):
+    """
+    Yields every categoryRecipe ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only categoryRecipes with a greater ID are streamed, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
+
+    Yields:
+        dict: The details of each categoryRecipe.
+    """
+    query, serializer = CATEGORY_RECIPE_FIELDS.project(fields, _category_recipe_to_dict)
+    query = query.order_by(CategoryRecipeModel.idCategoryRecipe)
+    if after_id is not None:
+        query = query.where(CategoryRecipeModel.idCategoryRecipe > after_id)
+    for category_recipe in iterate_rows(query):
+        yield serializer(category_recipe)
 
+@bumps_data_version
 def update_category_recipe_service(category_recipe_id: int, category_recipe_data: CategoryRecipe):
     """
     Updates an existing categoryRecipe's details by its ID.
@@ -65,17 +109,19 @@ def update_category_recipe_service(category_recipe_id: int, category_recipe_data
         the updated categoryRecipe details.
         
     Returns:
-        CategoryRecipeModel: The updated categoryRecipe record.
+        dict: The updated categoryRecipe details.
         
     Raises:
         DoesNotExist: If the categoryRecipe with the given ID does not exist.
     """
-    category_recipe = CategoryRecipe.get_by_id(category_recipe_id)
+    category_recipe = CategoryRecipeModel.get_by_id(category_recipe_id)
     category_recipe.nameCategoryRecipe = category_recipe_data.nameCategoryRecipe
     category_recipe.descriptionCategoryRecipe = category_recipe_data.descriptionCategoryRecipe
     category_recipe.save()
-    return category_recipe
+    _category_recipe_cache.delete(category_recipe_id)
+    return _category_recipe_to_dict(category_recipe)
 
+@bumps_data_version
 def delete_category_recipe_service(category_recipe_id: int):
     """
     Deletes a categoryRecipe from the database by its ID.
@@ -89,6 +135,7 @@ def delete_category_recipe_service(category_recipe_id: int):
     Raises:
         DoesNotExist: If the categoryRecipe with the given ID does not exist.
     """
-    category_recipe = CategoryRecipe.get_by_id(category_recipe_id)
+    category_recipe = CategoryRecipeModel.get_by_id(category_recipe_id)
     category_recipe.delete_instance()
+    _category_recipe_cache.delete(category_recipe_id)
     return {"message": "CategoryRecipe deleted successfully"}
@@ -0,0 +1,97 @@
+"""This module contains the expiry scan that notifies users about expiring ingredients."""
+import datetime
+import time
+from app.config.database import IngredientInventory as IngredientInventoryModel
+from app.config.database import Notification as NotificationModel
+from app.config.database import Pantry as PantryModel
+from app.config.settings import EXPIRY_SCAN
+from app.helpers.bulk import bulk_insert
+from app.helpers.http_cache import bump_data_version
+
+_MESSAGE_LENGTH = NotificationModel.messageNotification.max_length
+
+def _expiry_message(name, date):
+    """Builds the notification message of an expiring item."""
+    suffix = f" expires on {date:%Y-%m-%d}"
+    return f"{name[:_MESSAGE_LENGTH - len(suffix)]}{suffix}"
+
+def _expiring_batch(start, end, after, batch_size):
+    """
+    Reads the next batch of items expiring between two dates, following the
+    date index with a `(date, id)` keyset so no batch rescans the previous ones.
+    """
+    date_field = IngredientInventoryModel.dateExpirationIngredient
+    key = IngredientInventoryModel.ingredientId
+    query = (IngredientInventoryModel
+             .select(key, IngredientInventoryModel.nameIngredient, date_field,
+                     PantryModel.userId)
+             .join(PantryModel)
+             .where(date_field.between(start, end)))
+    if after is not None:
+        last_date, last_id = after
+        query = query.where((date_field > last_date) |
+                            ((date_field == last_date) & (key > last_id)))
+    return list(query.order_by(date_field, key).limit(batch_size).tuples())
+
+def _already_notified(user_ids, since):
+    """Returns the `(user, message)` pairs already notified since the given date."""
+    query = (NotificationModel
+             .select(NotificationModel.userId, NotificationModel.messageNotification)
+             .where(NotificationModel.userId.in_(user_ids) &
+                    (NotificationModel.dateNotification >= since))
+             .tuples())
+    return set(query)
+
+def scan_expiring_items(days: int = None, batch_size: int = None, today: datetime.date = None):
+    """
+    Creates a notification for every inventory item expiring within the next days.
+
+    Items are read in bounded batches along the expiration date index and the
+    notifications of each batch are written with a single bulk insert. A user
+    is notified once per item name and expiration date, so the scan can run
+    as often as needed.
+
+    Args:
+        days (int): How many days ahead to look, defaults to the configured value.
+        batch_size (int): The number of items per batch, defaults to the configured value.
+        today (date): The date of the scan, defaults to the current date.
+
+    Returns:
+        dict: The number of scanned items, created notifications, batches and
+        the duration of the scan in milliseconds.
+    """
+    days = EXPIRY_SCAN["days_ahead"] if days is None else days
+    batch_size = batch_size or EXPIRY_SCAN["batch_size"]
+    today = today or datetime.date.today()
+    end = today + datetime.timedelta(days=days)
+    since = today - datetime.timedelta(days=days)
+    started = time.perf_counter()
+    result = {"scanned": 0, "notified": 0, "batches": 0}
+    after = None
+    while True:
+        batch = _expiring_batch(today, end, after, batch_size)
+        if not batch:
+            break
+        result["scanned"] += len(batch)
+        result["batches"] += 1
+        pending = {}
+        for _, name, date, user_id in batch:
+            pending.setdefault((user_id, _expiry_message(name, date)), None)
+        notified = _already_notified({user_id for user_id, _ in pending}, since)
+        rows = [(index, {"messageNotification": message,
+                         "dateNotification": today,
+                         "userId": user_id})
+                for index, (user_id, message) in enumerate(pending)
+                if (user_id, message) not in notified]
+        if rows:
+            created, _ = bulk_insert(NotificationModel, rows)
+            result["notified"] += created
+        last_id, _, last_date, _ = batch[-1]
+        after = (last_date, last_id)
+        if len(batch) < batch_size:
+            break
+    if result["notified"]:
+        # The new notifications must not be hidden behind the ETags handed out before.
+        bump_data_version()
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
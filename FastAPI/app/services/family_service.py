@@ -1,6 +1,16 @@
 """This module contains the service functions for the family class."""
+from peewee import JOIN
 from app.models.family_model import Family
+from app.config.database import Family as FamilyModel
+from app.config.database import IngredientInventory as IngredientInventoryModel
+from app.config.database import Pantry as PantryModel
+from app.config.database import User as UserModel
+from app.config.async_database import fetch_all, fetch_one
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_family_service(family):
     """
     Creates a new family in the database.
@@ -17,41 +27,141 @@ def create_family_service(family):
     )
     return family_record
 
-def get_family_service(family_id: int):
+def _family_to_dict(family):
+    """Builds the dictionary returned to the client for a family record."""
+    return {
+        "id": family.idFamily,
+        "name": family.nameFamily
+    }
+
+async def get_family_service(family_id: int):
     """
-    Retrieves a family by its ID.
+    Retrieves a family by its ID without blocking the event loop.
 
     Args:
         family_id (int): The unique identifier of the family.
 
     Returns:
         DICT: A dictionary containing the family's details.
-        
+
     Raises:
         DoesNotExist: If the family with the given ID does not exist.
     """
-    family = Family.get_by_id(family_id)
+    family = await fetch_one(FamilyModel.select().where(FamilyModel.idFamily == family_id))
+    return _family_to_dict(family)
+
+async def get_all_families_service(limit: int, after_id: int = None):
+    """
+    Retrieves a page of families ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of families to return.
+        after_id (int): The cursor of the previous page, if any.
+
+    Returns:
+        dict: The families of the page and the cursor of the next one.
+    """
+    return await paginate_async(FamilyModel.select(), FamilyModel.idFamily,
+                                _family_to_dict, limit, after_id)
+
+def stream_all_families_service(after_id: int = None):
+    """
+    Yields every family ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only families with a greater ID are streamed, if given.
+
+    Yields:
+        dict: The details of each family.
+    """
+    query = FamilyModel.select().order_by(FamilyModel.idFamily)
+    if after_id is not None:
+        query = query.where(FamilyModel.idFamily > after_id)
+    for family in iterate_rows(query):
+        yield _family_to_dict(family)
+
+def _family_pantry_query(family_id: int):
+    """Builds the single query joining a family with its users, pantries and inventory."""
+    return (FamilyModel
+            .select(FamilyModel.idFamily, FamilyModel.nameFamily,
+                    UserModel.idUser, UserModel.nameUser, UserModel.emailUser,
+                    UserModel.photoUser, PantryModel.idPantry,
+                    IngredientInventoryModel.ingredientId,
+                    IngredientInventoryModel.nameIngredient,
+                    IngredientInventoryModel.amountIngredient,
+                    IngredientInventoryModel.unitIngredient,
+                    IngredientInventoryModel.dateExpirationIngredient)
+            .join(UserModel, JOIN.LEFT_OUTER, on=UserModel.familyId == FamilyModel.idFamily)
+            .join(PantryModel, JOIN.LEFT_OUTER, on=PantryModel.userId == UserModel.idUser)
+            .join(IngredientInventoryModel, JOIN.LEFT_OUTER,
+                  on=IngredientInventoryModel.pantryId == PantryModel.idPantry)
+            .where(FamilyModel.idFamily == family_id)
+            .order_by(UserModel.idUser, PantryModel.idPantry,
+                      IngredientInventoryModel.ingredientId)
+            .dicts())
+
+def _build_family_pantry(rows):
+    """Folds the joined rows into the nested snapshot of a family's pantries."""
+    members, pantries, totals = {}, {}, {}
+    for row in rows:
+        if row["idUser"] is not None and row["idUser"] not in members:
+            members[row["idUser"]] = {
+                "id": row["idUser"],
+                "name": row["nameUser"],
+                "email": row["emailUser"],
+                "photo": row["photoUser"],
+                "pantries": []
+            }
+        if row["idPantry"] is not None and row["idPantry"] not in pantries:
+            pantries[row["idPantry"]] = {"id": row["idPantry"], "items": []}
+            members[row["idUser"]]["pantries"].append(pantries[row["idPantry"]])
+        if row["ingredientId"] is None:
+            continue
+        pantries[row["idPantry"]]["items"].append({
+            "id": row["ingredientId"],
+            "name": row["nameIngredient"],
+            "amount": row["amountIngredient"],
+            "unit": row["unitIngredient"],
+            "date_expiration": row["dateExpirationIngredient"]
+        })
+        total = totals.setdefault((row["nameIngredient"], row["unitIngredient"]), {
+            "name": row["nameIngredient"],
+            "unit": row["unitIngredient"],
+            "items": 0,
+            "first_expiration": row["dateExpirationIngredient"]
+        })
+        total["items"] += 1
+        total["first_expiration"] = min(total["first_expiration"],
+                                        row["dateExpirationIngredient"])
     return {
-        "id": family.idFamily,
-        "name": family.nameFamily
+        "id": rows[0]["idFamily"],
+        "name": rows[0]["nameFamily"],
+        "members": list(members.values()),
+        "ingredients": sorted(totals.values(), key=lambda total: total["name"]),
+        "pantry_count": len(pantries),
+        "item_count": sum(len(pantry["items"]) for pantry in pantries.values())
     }
 
-def get_all_families_service():
+async def get_family_pantry_service(family_id: int):
     """
-    Retrieves all families from the database.
+    Retrieves the pantry snapshot of a family without blocking the event loop.
+
+    Args:
+        family_id (int): The unique identifier of the family.
 
     Returns:
-        List: A list of dictionaries containing the data of each family's details.
+        dict: The family, its members with their pantries and items, and the
+        items grouped by ingredient name and unit.
+
+    Raises:
+        DoesNotExist: If the family with the given ID does not exist.
     """
-    families = list(Family.select())
-    return [
-        {
-        "id": family.idFamily,
-        "name": family.nameFamily
-        }
-        for family in families
-    ]
+    rows = await fetch_all(_family_pantry_query(family_id))
+    if not rows:
+        raise FamilyModel.DoesNotExist(f"Family {family_id} does not exist")
+    return _build_family_pantry(rows)
 
+@bumps_data_version
 def update_family_service(family_id: int, family_data: Family):
     """
     Updates an existing family's details by its ID.
@@ -71,6 +181,7 @@ def update_family_service(family_id: int, family_data: Family):
     family.save()
     return family
 
+@bumps_data_version
 def delete_family_service(family_id: int):
     """
     Deletes a family from the database by its ID.
@@ -1,66 +1,112 @@
 """This module contains the service functions for the ingredientInventory class."""
-from app.models.ingredient_inventory_model import IngredientInventory
+from app.models.ingredient_inventory_model import IngredientInventory, IngredientInventoryBulkItem
+from app.config.database import IngredientInventory as IngredientInventoryModel
+from app.config.async_database import fetch_one
+from app.helpers.bulk import (
+    bulk_delete,
+    bulk_insert,
+    bulk_update,
+    merge_failures,
+    validate_items
+)
+from app.helpers.fields import FieldMap
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.units import quantity_columns
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_ingredient_inventory_service(ingredient_inventory):
     """
     Creates a new ingredientInventory in the database.
 
     Args:
-        ingredient_inventory (IngredientInventory): An object containing the ingredient details.
+        ingredient_inventory (IngredientInventoryBulkItem): An object containing the
+        ingredient details.
         
     Returns:
-        IngredientInventoryModel: The created ingredientInventory record.
-    """
-    ingredient_inventory_record = IngredientInventory.create(
-        idIngredientInventory=ingredient_inventory.idIngredientInventory,
-        name=ingredient_inventory.name,
-        amount=ingredient_inventory.amount,
-        unit=ingredient_inventory.unit,
-        dateExpiration=ingredient_inventory.dateExpiration
+        dict: The created ingredientInventory details.
+    """
+    ingredient_inventory_record = IngredientInventoryModel.create(
+        **_ingredient_inventory_columns(ingredient_inventory),
+        pantryId=ingredient_inventory.pantryId
     )
-    return ingredient_inventory_record
+    return _ingredient_inventory_to_dict(ingredient_inventory_record)
+
+def _ingredient_inventory_to_dict(ingredient_inventory):
+    """Builds the dictionary returned to the client for an ingredientInventory record."""
+    return {
+        "id": ingredient_inventory.ingredientId,
+        "name": ingredient_inventory.nameIngredient,
+        "amount": ingredient_inventory.amountIngredient,
+        "unit": ingredient_inventory.unitIngredient,
+        "date_expiration": ingredient_inventory.dateExpirationIngredient
+    }
+
+INGREDIENT_INVENTORY_FIELDS = FieldMap(
+    IngredientInventoryModel.ingredientId,
+    name=IngredientInventoryModel.nameIngredient,
+    amount=IngredientInventoryModel.amountIngredient,
+    unit=IngredientInventoryModel.unitIngredient,
+    date_expiration=IngredientInventoryModel.dateExpirationIngredient
+)
 
-def get_ingredient_inventory_service(ingredient_inventory_id: int):
+async def get_ingredient_inventory_service(ingredient_inventory_id: int,
+                                           fields: tuple = None):
     """
-    Retrieves an ingredientInventory by its ID.
+    Retrieves an ingredientInventory by its ID without blocking the event loop.
 
     Args:
         ingredient_inventory_id (int): The unique identifier of the ingredientInventory.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
         DICT: A dictionary containing the ingredientInventory's details.
-        
+
     Raises:
         DoesNotExist: If the ingredientInventory with the given ID does not exist.
     """
-    ingredient_inventory = IngredientInventory.get_by_id(ingredient_inventory_id)
-    return {
-        "id": ingredient_inventory.idIngredientInventory,
-        "name": ingredient_inventory.name,
-        "amount": ingredient_inventory.amount,
-        "unit": ingredient_inventory.unit,
-        "date_expiration": ingredient_inventory.dateExpiration
-    }
+    query, serializer = INGREDIENT_INVENTORY_FIELDS.project(fields, _ingredient_inventory_to_dict)
+    query = query.where(IngredientInventoryModel.ingredientId == ingredient_inventory_id)
+    ingredient_inventory = await fetch_one(query)
+    return serializer(ingredient_inventory)
     
-def get_all_ingredient_inventories_service():
+async def get_all_ingredient_inventories_service(limit: int, after_id: int = None,
+                                                 fields: tuple = None):
     """
-    Retrieves all ingredientInventories from the database.
+    Retrieves a page of ingredientInventories ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of ingredientInventories to return.
+        after_id (int): The cursor of the previous page, if any.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
-        List: A list of dictionaries containing the data of each ingredientInventory's details.
-    """
-    ingredient_inventories = list(IngredientInventory.select())
-    return [
-        {
-        "id": ingredient_inventory.idIngredientInventory,
-        "name": ingredient_inventory.name,
-        "amount": ingredient_inventory.amount,
-        "unit": ingredient_inventory.unit,
-        "date_expiration": ingredient_inventory.dateExpiration
-        }
-        for ingredient_inventory in ingredient_inventories
-    ]
+        dict: The ingredientInventories of the page and the cursor of the next one.
+    """
+    query, serializer = INGREDIENT_INVENTORY_FIELDS.project(fields, _ingredient_inventory_to_dict)
+    return await paginate_async(query, IngredientInventoryModel.ingredientId,
+                                serializer, limit, after_id)
+
+def stream_all_ingredient_inventories_service(after_id: int = None, fields: tuple = None):
+    """
+    Yields every ingredientInventory ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only ingredientInventories with a greater ID are streamed, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
+
+    Yields:
+        dict: The details of each ingredientInventory.
+    """
+    query, serializer = INGREDIENT_INVENTORY_FIELDS.project(fields, _ingredient_inventory_to_dict)
+    query = query.order_by(IngredientInventoryModel.ingredientId)
+    if after_id is not None:
+        query = query.where(IngredientInventoryModel.ingredientId > after_id)
+    for ingredient_inventory in iterate_rows(query):
+        yield serializer(ingredient_inventory)
     
+@bumps_data_version
 def update_ingredient_inventory_service(ingredient_inventory_id: int, 
                                         ingredient_inventory_data: IngredientInventory):
     """
@@ -72,19 +118,18 @@ def update_ingredient_inventory_service(ingredient_inventory_id: int,
         updated ingredientInventory details.
         
     Returns:
-        IngredientInventoryModel: The updated ingredientInventory record.
+        dict: The updated ingredientInventory details.
         
     Raises:
         DoesNotExist: If the ingredientInventory with the given ID does not exist.
     """
-    ingredient_inventory = IngredientInventory.get_by_id(ingredient_inventory_id)
-    ingredient_inventory.name = ingredient_inventory_data.name
-    ingredient_inventory.amount = ingredient_inventory_data.amount
-    ingredient_inventory.unit = ingredient_inventory_data.unit
-    ingredient_inventory.dateExpiration = ingredient_inventory_data.dateExpiration
+    ingredient_inventory = IngredientInventoryModel.get_by_id(ingredient_inventory_id)
+    for column, value in _ingredient_inventory_columns(ingredient_inventory_data).items():
+        setattr(ingredient_inventory, column, value)
     ingredient_inventory.save()
-    return ingredient_inventory
+    return _ingredient_inventory_to_dict(ingredient_inventory)
 
+@bumps_data_version
 def delete_ingredient_inventory_service(ingredient_inventory_id: int):
     """
     Deletes an ingredientInventory from the database by its ID.
@@ -98,6 +143,77 @@ def delete_ingredient_inventory_service(ingredient_inventory_id: int):
     Raises:
         DoesNotExist: If the ingredientInventory with the given ID does not exist.
     """
-    ingredient_inventory = IngredientInventory.get_by_id(ingredient_inventory_id)
+    ingredient_inventory = IngredientInventoryModel.get_by_id(ingredient_inventory_id)
     ingredient_inventory.delete_instance()
     return {"message": "IngredientInventory deleted successfully"}
+
+def _ingredient_inventory_columns(ingredient_inventory):
+    """Maps the fields of a request item to the columns of an ingredientInventory record."""
+    return {
+        "nameIngredient": ingredient_inventory.name,
+        "amountIngredient": str(ingredient_inventory.amount),
+        "unitIngredient": ingredient_inventory.unit,
+        "dateExpirationIngredient": ingredient_inventory.dateExpiration,
+        **quantity_columns(ingredient_inventory.amount, ingredient_inventory.unit)
+    }
+
+@bumps_data_version
+def create_ingredient_inventories_bulk_service(items: list):
+    """
+    Creates many ingredientInventories in a single transaction.
+
+    Args:
+        items (list): The raw ingredientInventory items of the request.
+
+    Returns:
+        dict: The number of created ingredientInventories and the items that failed.
+    """
+    valid, failed = validate_items(items, IngredientInventoryBulkItem)
+    rows = [
+        (index, {**_ingredient_inventory_columns(item), "pantryId": item.pantryId})
+        for index, item in valid
+    ]
+    created, errors = bulk_insert(IngredientInventoryModel, rows)
+    return {"created": created, "failed": merge_failures(failed, errors)}
+
+@bumps_data_version
+def update_ingredient_inventories_bulk_service(items: list):
+    """
+    Updates many ingredientInventories in a single transaction.
+
+    Args:
+        items (list): The raw ingredientInventory items of the request, with their ID.
+
+    Returns:
+        dict: The number of updated ingredientInventories and the items that failed.
+    """
+    valid, failed = validate_items(items, IngredientInventory)
+    records = [
+        (index, IngredientInventoryModel(ingredientId=item.idIngredientInventory,
+                                         **_ingredient_inventory_columns(item)))
+        for index, item in valid
+    ]
+    fields = [
+        IngredientInventoryModel.nameIngredient,
+        IngredientInventoryModel.amountIngredient,
+        IngredientInventoryModel.unitIngredient,
+        IngredientInventoryModel.dateExpirationIngredient,
+        IngredientInventoryModel.quantityBase,
+        IngredientInventoryModel.unitId
+    ]
+    updated, errors = bulk_update(IngredientInventoryModel, records, fields)
+    return {"updated": updated, "failed": merge_failures(failed, errors)}
+
+@bumps_data_version
+def delete_ingredient_inventories_bulk_service(ingredient_inventory_ids: list):
+    """
+    Deletes many ingredientInventories in a single transaction.
+
+    Args:
+        ingredient_inventory_ids (list): The IDs of the ingredientInventories to delete.
+
+    Returns:
+        dict: The number of deleted ingredientInventories and the IDs that were not found.
+    """
+    deleted, failed = bulk_delete(IngredientInventoryModel, ingredient_inventory_ids)
+    return {"deleted": deleted, "failed": failed}
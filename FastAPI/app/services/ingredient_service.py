@@ -1,66 +1,111 @@
 """This module contains the service functions for the ingredient class."""
-from app.models.ingredient_model import Ingredient
+from app.models.ingredient_model import Ingredient, IngredientBulkItem
+from app.config.database import Ingredient as IngredientModel
+from app.config.async_database import fetch_one
+from app.helpers.bulk import (
+    bulk_delete,
+    bulk_insert,
+    bulk_update,
+    merge_failures,
+    validate_items
+)
+from app.helpers.fields import FieldMap
+from app.helpers.pagination import paginate_async
+from app.helpers.recipe_index import recipe_index
+from app.helpers.streaming import iterate_rows
+from app.helpers.units import quantity_columns
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_ingredient_service(ingredient):
     """
     Creates a new ingredient in the database.
 
     Args:
-        ingredient (Ingredient): An object containing the ingredient details.
+        ingredient (IngredientBulkItem): An object containing the ingredient details.
         
     Returns:
-        IngredientModel: The created ingredient record.
-    """
-    ingredient_record = Ingredient.create(
-        idIngredient=ingredient.idIngredient,
-        nameIngredient=ingredient.nameIngredient,
-        amountIngredient=ingredient.amountIngredient,
-        unitIngredient=ingredient.unitIngredient,
-        dateExpirationIngredient=ingredient.dateExpirationIngredient
+        dict: The created ingredient details.
+    """
+    ingredient_record = IngredientModel.create(
+        **_ingredient_columns(ingredient),
+        recipeId=ingredient.recipeId,
+        categoryIdIngredient=ingredient.categoryIdIngredient
     )
-    return ingredient_record
+    recipe_index.refresh([ingredient_record.recipeId_id])
+    return _ingredient_to_dict(ingredient_record)
 
-def get_ingredient_service(ingredient_id: int):
+def _ingredient_to_dict(ingredient):
+    """Builds the dictionary returned to the client for an ingredient record."""
+    return {
+        "id": ingredient.idIngredient,
+        "name": ingredient.nameIngredient,
+        "amount": ingredient.amountIngredient,
+        "unit": ingredient.unitIngredient,
+        "date_expiration": ingredient.dateExpirationIngredient
+    }
+
+INGREDIENT_FIELDS = FieldMap(
+    IngredientModel.idIngredient,
+    name=IngredientModel.nameIngredient,
+    amount=IngredientModel.amountIngredient,
+    unit=IngredientModel.unitIngredient,
+    date_expiration=IngredientModel.dateExpirationIngredient
+)
+
+async def get_ingredient_service(ingredient_id: int, fields: tuple = None):
     """
-    Retrieves an ingredient by its ID.
+    Retrieves an ingredient by its ID without blocking the event loop.
 
     Args:
         ingredient_id (int): The unique identifier of the ingredient.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
         DICT: A dictionary containing the ingredient's details.
-        
+
     Raises:
         DoesNotExist: If the ingredient with the given ID does not exist.
     """
-    ingredient = Ingredient.get_by_id(ingredient_id)
-    return {
-        "id": ingredient.idIngredient,
-        "name": ingredient.nameIngredient,
-        "amount": ingredient.amountIngredient,
-        "unit": ingredient.unitIngredient,
-        "date_expiration": ingredient.dateExpirationIngredient
-    }
+    query, serializer = INGREDIENT_FIELDS.project(fields, _ingredient_to_dict)
+    query = query.where(IngredientModel.idIngredient == ingredient_id)
+    ingredient = await fetch_one(query)
+    return serializer(ingredient)
     
-def get_all_ingredients_service():
+async def get_all_ingredients_service(limit: int, after_id: int = None, fields: tuple = None):
     """
-    Retrieves all ingredients from the database.
+    Retrieves a page of ingredients ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of ingredients to return.
+        after_id (int): The cursor of the previous page, if any.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
-        List: A list of dictionaries containing the data of each ingredient's details.
-    """
-    ingredients = list(Ingredient.select())
-    return [
-        {
-            "id": ingredient.idIngredient,
-            "name": ingredient.nameIngredient,
-            "amount": ingredient.amountIngredient,
-            "unit": ingredient.unitIngredient,
-            "date_expiration": ingredient.dateExpirationIngredient
-        }
-        for ingredient in ingredients
-    ]
+        dict: The ingredients of the page and the cursor of the next one.
+    """
+    query, serializer = INGREDIENT_FIELDS.project(fields, _ingredient_to_dict)
+    return await paginate_async(query, IngredientModel.idIngredient, serializer, limit, after_id)
+
+def stream_all_ingredients_service(after_id: int = None, fields: tuple = None):
+    """
+    Yields every ingredient ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only ingredients with a greater ID are streamed, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
+
+    Yields:
+        dict: The details of each ingredient.
+    """
+    query, serializer = INGREDIENT_FIELDS.project(fields, _ingredient_to_dict)
+    query = query.order_by(IngredientModel.idIngredient)
+    if after_id is not None:
+        query = query.where(IngredientModel.idIngredient > after_id)
+    for ingredient in iterate_rows(query):
+        yield serializer(ingredient)
     
+@bumps_data_version
 def update_ingredient_service(ingredient_id: int, ingredient_data: Ingredient):
     """
     Updates an existing ingredient's details by its ID.
@@ -70,19 +115,19 @@ def update_ingredient_service(ingredient_id: int, ingredient_data: Ingredient):
         ingredient_data (Ingredient): An object containing the updated ingredient details.
         
     Returns:
-        IngredientModel: The updated ingredient record.
+        dict: The updated ingredient details.
         
     Raises:
         DoesNotExist: If the ingredient with the given ID does not exist.
     """
-    ingredient = Ingredient.get_by_id(ingredient_id)
-    ingredient.nameIngredient = ingredient_data.nameIngredient
-    ingredient.amountIngredient = ingredient_data.amountIngredient
-    ingredient.unitIngredient = ingredient_data.unitIngredient
-    ingredient.dateExpirationIngredient = ingredient_data.dateExpirationIngredient
+    ingredient = IngredientModel.get_by_id(ingredient_id)
+    for column, value in _ingredient_columns(ingredient_data).items():
+        setattr(ingredient, column, value)
     ingredient.save()
-    return ingredient
+    recipe_index.refresh([ingredient.recipeId_id])
+    return _ingredient_to_dict(ingredient)
 
+@bumps_data_version
 def delete_ingredient_service(ingredient_id: int):
     """
     Deletes an ingredient from the database by its ID.
@@ -96,6 +141,94 @@ def delete_ingredient_service(ingredient_id: int):
     Raises:
         DoesNotExist: If the ingredient with the given ID does not exist.
     """
-    ingredient = Ingredient.get_by_id(ingredient_id)
+    ingredient = IngredientModel.get_by_id(ingredient_id)
     ingredient.delete_instance()
+    recipe_index.refresh([ingredient.recipeId_id])
     return {"message": "Ingredient deleted successfully"}
+
+def _ingredient_columns(ingredient):
+    """Maps the fields of a request item to the columns of an ingredient record."""
+    return {
+        "nameIngredient": ingredient.nameIngredient,
+        "amountIngredient": str(ingredient.amountIngredient),
+        "unitIngredient": ingredient.unitIngredient,
+        "dateExpirationIngredient": ingredient.dateExpirationIngredient,
+        **quantity_columns(ingredient.amountIngredient, ingredient.unitIngredient)
+    }
+
+def _recipe_ids(ingredient_ids):
+    """Returns the IDs of the recipes using the given ingredients."""
+    query = (IngredientModel
+             .select(IngredientModel.recipeId)
+             .where(IngredientModel.idIngredient.in_(ingredient_ids))
+             .distinct()
+             .tuples())
+    return {recipe_id for (recipe_id,) in query}
+
+@bumps_data_version
+def create_ingredients_bulk_service(items: list):
+    """
+    Creates many ingredients in a single transaction.
+
+    Args:
+        items (list): The raw ingredient items of the request.
+
+    Returns:
+        dict: The number of created ingredients and the items that failed.
+    """
+    valid, failed = validate_items(items, IngredientBulkItem)
+    rows = [
+        (index, {
+            **_ingredient_columns(item),
+            "recipeId": item.recipeId,
+            "categoryIdIngredient": item.categoryIdIngredient
+        })
+        for index, item in valid
+    ]
+    created, errors = bulk_insert(IngredientModel, rows)
+    recipe_index.refresh(row["recipeId"] for _, row in rows)
+    return {"created": created, "failed": merge_failures(failed, errors)}
+
+@bumps_data_version
+def update_ingredients_bulk_service(items: list):
+    """
+    Updates many ingredients in a single transaction.
+
+    Args:
+        items (list): The raw ingredient items of the request, with their ID.
+
+    Returns:
+        dict: The number of updated ingredients and the items that failed.
+    """
+    valid, failed = validate_items(items, Ingredient)
+    records = [
+        (index, IngredientModel(idIngredient=item.idIngredient, **_ingredient_columns(item)))
+        for index, item in valid
+    ]
+    fields = [
+        IngredientModel.nameIngredient,
+        IngredientModel.amountIngredient,
+        IngredientModel.unitIngredient,
+        IngredientModel.dateExpirationIngredient,
+        IngredientModel.quantityBase,
+        IngredientModel.unitId
+    ]
+    updated, errors = bulk_update(IngredientModel, records, fields)
+    recipe_index.refresh(_recipe_ids([record.idIngredient for _, record in records]))
+    return {"updated": updated, "failed": merge_failures(failed, errors)}
+
+@bumps_data_version
+def delete_ingredients_bulk_service(ingredient_ids: list):
+    """
+    Deletes many ingredients in a single transaction.
+
+    Args:
+        ingredient_ids (list): The IDs of the ingredients to delete.
+
+    Returns:
+        dict: The number of deleted ingredients and the IDs that were not found.
+    """
+    recipe_ids = _recipe_ids(ingredient_ids)
+    deleted, failed = bulk_delete(IngredientModel, ingredient_ids)
+    recipe_index.refresh(recipe_ids)
+    return {"deleted": deleted, "failed": failed}
@@ -1,6 +1,13 @@
 """This module contains the service functions for the menu class."""
 from app.models.menu_model import Menu
+from app.config.database import Menu as MenuModel, Menu_Recipe as MenuRecipeModel
+from app.config.async_database import fetch_one
+from app.helpers.bulk import bulk_insert
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_menu_service(menu):
     """
     Creates a new menu in the database.
@@ -17,41 +24,60 @@ def create_menu_service(menu):
     )
     return menu_record
 
-def get_menu_service(menu_id: int):
+def _menu_to_dict(menu):
+    """Builds the dictionary returned to the client for a menu record."""
+    return {
+        "id": menu.idMenu,
+        "date": menu.dateMenu
+    }
+
+async def get_menu_service(menu_id: int):
     """
-    Retrieves a menu by its ID.
+    Retrieves a menu by its ID without blocking the event loop.
 
     Args:
         menu_id (int): The unique identifier of the menu.
 
     Returns:
         DICT: A dictionary containing the menu's details.
-        
+
     Raises:
         DoesNotExist: If the menu with the given ID does not exist.
     """
-    menu = Menu.get_by_id(menu_id)
-    return {
-        "id": menu.idMenu,
-        "date": menu.dateMenu
-    }
+    menu = await fetch_one(MenuModel.select().where(MenuModel.idMenu == menu_id))
+    return _menu_to_dict(menu)
 
-def get_all_menus_service():
+async def get_all_menus_service(limit: int, after_id: int = None):
     """
-    Retrieves all menus from the database.
+    Retrieves a page of menus ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of menus to return.
+        after_id (int): The cursor of the previous page, if any.
 
     Returns:
-        List: A list of dictionaries containing the data of each menu's details.
+        dict: The menus of the page and the cursor of the next one.
     """
-    menus = list(Menu.select())
-    return [
-        {
-        "id": menu.idMenu,
-        "date": menu.dateMenu
-        }
-        for menu in menus
-    ]
+    return await paginate_async(MenuModel.select(), MenuModel.idMenu,
+                                _menu_to_dict, limit, after_id)
 
+def stream_all_menus_service(after_id: int = None):
+    """
+    Yields every menu ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only menus with a greater ID are streamed, if given.
+
+    Yields:
+        dict: The details of each menu.
+    """
+    query = MenuModel.select().order_by(MenuModel.idMenu)
+    if after_id is not None:
+        query = query.where(MenuModel.idMenu > after_id)
+    for menu in iterate_rows(query):
+        yield _menu_to_dict(menu)
+
+@bumps_data_version
 def update_menu_service(menu_id: int, menu_data: Menu):
     """
     Updates an existing menu's details by its ID.
@@ -71,6 +97,7 @@ def update_menu_service(menu_id: int, menu_data: Menu):
     menu.save()
     return menu
 
+@bumps_data_version
 def delete_menu_service(menu_id: int):
     """
     Deletes a menu from the database by its ID.
@@ -87,3 +114,26 @@ def delete_menu_service(menu_id: int):
     menu = Menu.get_by_id(menu_id)
     menu.delete_instance()
     return {"message": "Menu deleted successfully"}
+
+@bumps_data_version
+def add_menu_recipes_bulk_service(menu_id: int, recipe_ids: list):
+    """
+    Adds many recipes to a menu in a single transaction.
+
+    Args:
+        menu_id (int): The ID of the menu.
+        recipe_ids (list): The IDs of the recipes to add.
+
+    Returns:
+        dict: The number of recipes added and the items that failed.
+
+    Raises:
+        DoesNotExist: If the menu with the given ID does not exist.
+    """
+    menu = MenuModel.get_by_id(menu_id)
+    rows = [
+        (index, {"menuIdMR": menu.idMenu, "recipeIdMR": recipe_id})
+        for index, recipe_id in enumerate(recipe_ids)
+    ]
+    created, failed = bulk_insert(MenuRecipeModel, rows)
+    return {"created": created, "failed": failed}
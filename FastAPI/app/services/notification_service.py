@@ -1,6 +1,14 @@
 """This module contains the service functions for the notification class."""
-from app.models.notification_model import Notification
+from app.models.notification_model import Notification, NotificationBulkItem
+from app.config.database import Notification as NotificationModel
+from app.config.async_database import fetch_one
+from app.helpers.bulk import bulk_insert, merge_failures, validate_items
+from app.helpers.fields import FieldMap
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_notification_service(notification):
     """
     Creates a new notification in the database.
@@ -18,43 +26,75 @@ def create_notification_service(notification):
     )
     return notification_record
 
-def get_notification_service(notification_id: int):
+def _notification_to_dict(notification):
+    """Builds the dictionary returned to the client for a notification record."""
+    return {
+        "id": notification.idNotification,
+        "message": notification.messageNotification,
+        "date": notification.dateNotification
+    }
+
+NOTIFICATION_FIELDS = FieldMap(
+    NotificationModel.idNotification,
+    message=NotificationModel.messageNotification,
+    date=NotificationModel.dateNotification
+)
+
+async def get_notification_service(notification_id: int, fields: tuple = None):
     """
-    Retrieves a notification by its ID.
+    Retrieves a notification by its ID without blocking the event loop.
 
     Args:
         notification_id (int): The unique identifier of the notification.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
         DICT: A dictionary containing the notification's details.
-        
+
     Raises:
         DoesNotExist: If the notification with the given ID does not exist.
     """
-    notification = Notification.get_by_id(notification_id)
-    return {
-        "id": notification.idNotification,
-        "message": notification.message,
-        "date": notification.dateNotification
-    }
+    query, serializer = NOTIFICATION_FIELDS.project(fields, _notification_to_dict)
+    query = query.where(NotificationModel.idNotification == notification_id)
+    notification = await fetch_one(query)
+    return serializer(notification)
 
-def get_all_notifications_service():
+async def get_all_notifications_service(limit: int, after_id: int = None,
+                                        fields: tuple = None):
     """
-    Retrieves all notifications from the database.
+    Retrieves a page of notifications ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of notifications to return.
+        after_id (int): The cursor of the previous page, if any.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
-        List: A list of dictionaries containing the data of each notification's details.
+        dict: The notifications of the page and the cursor of the next one.
     """
-    notifications = list(Notification.select())
-    return [
-        {
-        "id": notification.idNotification,
-        "message": notification.message,
-        "date": notification.dateNotification
-        }
-        for notification in notifications
-    ]
+    query, serializer = NOTIFICATION_FIELDS.project(fields, _notification_to_dict)
+    return await paginate_async(query, NotificationModel.idNotification,
+                                serializer, limit, after_id)
+
+def stream_all_notifications_service(after_id: int = None, fields: tuple = None):
+    """
+    Yields every notification ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only notifications with a greater ID are streamed, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
+
+    Yields:
+        dict: The details of each notification.
+    """
+    query, serializer = NOTIFICATION_FIELDS.project(fields, _notification_to_dict)
+    query = query.order_by(NotificationModel.idNotification)
+    if after_id is not None:
+        query = query.where(NotificationModel.idNotification > after_id)
+    for notification in iterate_rows(query):
+        yield serializer(notification)
 
+@bumps_data_version
 def update_notification_service(notification_id: int, notification_data: Notification):
     """
     Updates an existing notification's details by its ID.
@@ -75,6 +115,7 @@ def update_notification_service(notification_id: int, notification_data: Notific
     notification.save()
     return notification
 
+@bumps_data_version
 def delete_notification_service(notification_id: int):
     """
     Deletes a notification from the database by its ID.
@@ -91,3 +132,26 @@ def delete_notification_service(notification_id: int):
     notification = Notification.get_by_id(notification_id)
     notification.delete_instance()
     return {"message": "Notification deleted successfully"}
+
+@bumps_data_version
+def create_notifications_bulk_service(items: list):
+    """
+    Creates many notifications in a single transaction.
+
+    Args:
+        items (list): The raw notification items of the request.
+
+    Returns:
+        dict: The number of created notifications and the items that failed.
+    """
+    valid, failed = validate_items(items, NotificationBulkItem)
+    rows = [
+        (index, {
+            "messageNotification": item.message,
+            "dateNotification": item.dateNotification,
+            "userId": item.userId
+        })
+        for index, item in valid
+    ]
+    created, errors = bulk_insert(NotificationModel, rows)
+    return {"created": created, "failed": merge_failures(failed, errors)}
@@ -1,6 +1,18 @@
 """This module contains the service functions for the pantry class."""
+from peewee import JOIN, fn
+from starlette.concurrency import run_in_threadpool
 from app.models.pantry_model import Pantry
+from app.config.database import IngredientInventory as IngredientInventoryModel
+from app.config.database import Pantry as PantryModel
+from app.config.database import Recipe as RecipeModel
+from app.config.database import Unit as UnitModel
+from app.config.async_database import fetch_all, fetch_one
+from app.helpers.pagination import paginate_async
+from app.helpers.recipe_index import recipe_index
+from app.helpers.streaming import iterate_rows
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_pantry_service(pantry):
     """
     Creates a new pantry in the database.
@@ -16,38 +28,137 @@ def create_pantry_service(pantry):
     )
     return pantry_record
 
-def get_pantry_service(pantry_id: int):
+def _pantry_to_dict(pantry):
+    """Builds the dictionary returned to the client for a pantry record."""
+    return {
+        "id": pantry.idPantry
+    }
+
+async def get_pantry_service(pantry_id: int):
     """
-    Retrieves a pantry by its ID.
+    Retrieves a pantry by its ID without blocking the event loop.
 
     Args:
         pantry_id (int): The unique identifier of the pantry.
 
     Returns:
         DICT: A dictionary containing the pantry's details.
-        
+
     Raises:
         DoesNotExist: If the pantry with the given ID does not exist.
     """
-    pantry = Pantry.get_by_id(pantry_id)
-    return {
-        "id": pantry.idPantry
-    }
+    pantry = await fetch_one(PantryModel.select().where(PantryModel.idPantry == pantry_id))
+    return _pantry_to_dict(pantry)
+
+async def get_all_pantries_service(limit: int, after_id: int = None):
+    """
+    Retrieves a page of pantries ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of pantries to return.
+        after_id (int): The cursor of the previous page, if any.
 
-def get_all_pantries_service():
+    Returns:
+        dict: The pantries of the page and the cursor of the next one.
     """
-    Retrieves all pantries from the database.
+    return await paginate_async(PantryModel.select(), PantryModel.idPantry,
+                                _pantry_to_dict, limit, after_id)
+
+def _pantry_totals_query(pantry_id: int):
+    """Builds the query summing the inventory of a pantry by ingredient and base unit."""
+    name_key = fn.LOWER(fn.TRIM(IngredientInventoryModel.nameIngredient))
+    return (IngredientInventoryModel
+            .select(fn.MIN(IngredientInventoryModel.nameIngredient).alias("name"),
+                    UnitModel.baseUnit.alias("unit"),
+                    fn.SUM(IngredientInventoryModel.quantityBase).alias("quantity"),
+                    fn.COUNT(IngredientInventoryModel.ingredientId).alias("items"),
+                    fn.MIN(IngredientInventoryModel.dateExpirationIngredient)
+                    .alias("first_expiration"))
+            .join(UnitModel, JOIN.LEFT_OUTER)
+            .where(IngredientInventoryModel.pantryId == pantry_id)
+            .group_by(name_key, UnitModel.baseUnit)
+            .order_by(name_key)
+            .dicts())
+
+async def get_pantry_totals_service(pantry_id: int):
+    """
+    Sums the inventory of a pantry by ingredient without blocking the event loop.
+
+    Args:
+        pantry_id (int): The unique identifier of the pantry.
 
     Returns:
-        List: A list of dictionaries containing the data of each pantry's details.
+        dict: The pantry ID and, per ingredient and base unit, the total
+        quantity, the number of items and the first expiration date.
+
+    Raises:
+        DoesNotExist: If the pantry with the given ID does not exist.
+    """
+    await fetch_one(PantryModel.select(PantryModel.idPantry)
+                    .where(PantryModel.idPantry == pantry_id))
+    return {"pantryId": pantry_id, "totals": await fetch_all(_pantry_totals_query(pantry_id))}
+
+def _cookable_recipes(matches, names):
+    """Builds the ranked recipes returned to the client from the index matches."""
+    return [{
+        "id": recipe_id,
+        "name": names.get(recipe_id),
+        "matched": matched,
+        "total": total,
+        "missing": total - matched
+    } for recipe_id, matched, total in matches]
+
+async def get_pantry_cookable_service(pantry_id: int, limit: int):
+    """
+    Ranks the recipes by how many of their ingredients are in a pantry.
+
+    The ingredient names of the pantry are matched against the recipe index,
+    so the cost does not grow with the number of recipes.
+
+    Args:
+        pantry_id (int): The unique identifier of the pantry.
+        limit (int): The maximum number of recipes to return.
+
+    Returns:
+        dict: The pantry ID and the best matching recipes, with the number of
+        their ingredients in stock and missing.
+
+    Raises:
+        DoesNotExist: If the pantry with the given ID does not exist.
+    """
+    await fetch_one(PantryModel.select(PantryModel.idPantry)
+                    .where(PantryModel.idPantry == pantry_id))
+    rows = await fetch_all(IngredientInventoryModel
+                           .select(IngredientInventoryModel.nameIngredient)
+                           .where(IngredientInventoryModel.pantryId == pantry_id)
+                           .distinct()
+                           .tuples())
+    await run_in_threadpool(recipe_index.ensure_built)
+    matches = recipe_index.top_matches((name for (name,) in rows), limit)
+    names = {}
+    if matches:
+        recipe_ids = [recipe_id for recipe_id, _, _ in matches]
+        names = dict(await fetch_all(RecipeModel
+                                     .select(RecipeModel.idRecipe, RecipeModel.nameRecipe)
+                                     .where(RecipeModel.idRecipe.in_(recipe_ids))
+                                     .tuples()))
+    return {"pantryId": pantry_id, "recipes": _cookable_recipes(matches, names)}
+
+def stream_all_pantries_service(after_id: int = None):
+    """
+    Yields every pantry ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only pantries with a greater ID are streamed, if given.
+
+    Yields:
+        dict: The details of each pantry.
     """
-    pantries = list(Pantry.select())
-    return [
-        {
-            "id": pantry.idPantry
-        }
-        for pantry in pantries
-    ]
+    query = PantryModel.select().order_by(PantryModel.idPantry)
+    if after_id is not None:
+        query = query.where(PantryModel.idPantry > after_id)
+    for pantry in iterate_rows(query):
+        yield _pantry_to_dict(pantry)
 
 #  def update_pantry_service(pantry_id: int, pantry_data: Pantry):
 #     """
@@ -67,6 +178,7 @@ def get_all_pantries_service():
 #     pantry.save()
 #     return pantry
 
+@bumps_data_version
 def delete_pantry_service(pantry_id: int):
     """
     Deletes a pantry from the database by its ID.
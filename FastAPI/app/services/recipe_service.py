@@ -1,6 +1,36 @@
 """This module contains the service functions for the recipe model."""
+from peewee import JOIN, Case, IntegrityError, MySQLDatabase
+from playhouse.mysql_ext import Match
 from app.models.recipe_model import Recipe
+from app.config.database import Recipe as RecipeModel
+from app.config.database import Recipe_Category as RecipeCategoryModel
+from app.config.database import Ingredient as IngredientModel
+from app.config.database import Menu_Recipe as MenuRecipeModel
+from app.config.database import ShoppingList_Ingredient as ShoppingListIngredientModel
+from app.config.database import CategoryIngredient as CategoryIngredientModel
+from app.config.database import CategoryRecipe as CategoryRecipeModel
+from app.config.async_database import fetch_all, fetch_one
+from app.helpers.fields import FieldMap
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.cache import cached_async, create_cache
+from app.helpers.recipe_index import recipe_index
+from app.helpers.http_cache import bumps_data_version
 
+_recipe_cache = create_cache("recipes")
+
+# Columns searched, with the weight of a match in each one when no full-text index is used.
+_SEARCH_FIELDS = (
+    (RecipeModel.nameRecipe, 3),
+    (RecipeModel.descriptionRecipe, 2),
+    (RecipeModel.instructions, 1),
+)
+_SEARCH_MAX_TERMS = 8
+
+# Related resources a recipe read can embed with `?expand=`.
+RECIPE_EXPANSIONS = ("ingredients", "categories")
+
+@bumps_data_version
 def create_recipe_service(recipe):
     """
     Creates a new recipe in the database.
@@ -23,53 +53,238 @@ def create_recipe_service(recipe):
     )
     return recipe_record
 
-def get_recipe_service(recipe_id: int):
+def _recipe_to_dict(recipe):
+    """Builds the dictionary returned to the client for a recipe record."""
+    return {
+        "id": recipe.idRecipe,
+        "name": recipe.nameRecipe,
+        "description": recipe.descriptionRecipe,
+        "category": recipe.categoryRecipe,
+        "difficulty": recipe.difficultyRecipe,
+        "timePreparation": recipe.timePreparation,
+        "instructions": recipe.instructions,
+        "nutritionalData": recipe.nutritionalData
+    }
+
+RECIPE_FIELDS = FieldMap(
+    RecipeModel.idRecipe,
+    name=RecipeModel.nameRecipe,
+    description=RecipeModel.descriptionRecipe,
+    category=RecipeModel.categoryRecipe,
+    difficulty=RecipeModel.difficultyRecipe,
+    timePreparation=RecipeModel.timePreparation,
+    instructions=RecipeModel.instructions,
+    nutritionalData=RecipeModel.nutritionalData
+)
+
+def _ingredients_query(recipe_ids):
+    """Builds the query of the ingredients of some recipes, joined with their category."""
+    return (IngredientModel
+            .select(IngredientModel.idIngredient, IngredientModel.recipeId,
+                    IngredientModel.nameIngredient, IngredientModel.amountIngredient,
+                    IngredientModel.unitIngredient, IngredientModel.dateExpirationIngredient,
+                    CategoryIngredientModel.idCategoryIngredient,
+                    CategoryIngredientModel.nameCategoryIngredient,
+                    CategoryIngredientModel.descriptionCategoryIngredient)
+            .join(CategoryIngredientModel, join_type=JOIN.LEFT_OUTER)
+            .where(IngredientModel.recipeId.in_(recipe_ids))
+            .order_by(IngredientModel.idIngredient)
+            .dicts())
+
+def _categories_query(recipe_ids):
+    """Builds the query of the categories of some recipes, through the bridge table."""
+    return (CategoryRecipeModel
+            .select(RecipeCategoryModel.recetaIdCR, CategoryRecipeModel.idCategoryRecipe,
+                    CategoryRecipeModel.nameCategoryRecipe,
+                    CategoryRecipeModel.descriptionCategoryRecipe)
+            .join(RecipeCategoryModel,
+                  on=RecipeCategoryModel.categoriaIdCR == CategoryRecipeModel.idCategoryRecipe)
+            .where(RecipeCategoryModel.recetaIdCR.in_(recipe_ids))
+            .order_by(CategoryRecipeModel.idCategoryRecipe)
+            .dicts())
+
+def _ingredient_to_dict(row):
+    """Builds the dictionary of an ingredient embedded in a recipe, with its category."""
+    category = None
+    if row["idCategoryIngredient"] is not None:
+        category = {
+            "id": row["idCategoryIngredient"],
+            "name": row["nameCategoryIngredient"],
+            "description": row["descriptionCategoryIngredient"]
+        }
+    return {
+        "id": row["idIngredient"],
+        "name": row["nameIngredient"],
+        "amount": row["amountIngredient"],
+        "unit": row["unitIngredient"],
+        "date_expiration": row["dateExpirationIngredient"],
+        "category": category
+    }
+
+def _category_to_dict(row):
+    """Builds the dictionary of a category embedded in a recipe."""
+    return {
+        "id": row["idCategoryRecipe"],
+        "name": row["nameCategoryRecipe"],
+        "description": row["descriptionCategoryRecipe"]
+    }
+
+async def _expand_recipes(recipes, expand: tuple):
     """
-    Retrieves a user by their ID.
+    Embeds the requested related resources in some recipes.
+
+    Each expansion is loaded with a single query for every recipe at once, so
+    the number of queries does not depend on the number of recipes nor on the
+    number of ingredients or categories of each one.
 
     Args:
-        recipe_id (int): The unique identifier of the user.
+        recipes (list): The dictionaries of the recipes, with their `id`.
+        expand (tuple): The names of the expansions, from `RECIPE_EXPANSIONS`.
+
+    Returns:
+        list: New dictionaries of the recipes with the `ingredients` and
+        `categories` lists requested.
+    """
+    recipes = [dict(recipe) for recipe in recipes]
+    if not recipes or not expand:
+        return recipes
+    recipe_ids = [recipe["id"] for recipe in recipes]
+    if "ingredients" in expand:
+        ingredients = {recipe_id: [] for recipe_id in recipe_ids}
+        for row in await fetch_all(_ingredients_query(recipe_ids)):
+            ingredients[row["recipeId"]].append(_ingredient_to_dict(row))
+        for recipe in recipes:
+            recipe["ingredients"] = ingredients[recipe["id"]]
+    if "categories" in expand:
+        categories = {recipe_id: [] for recipe_id in recipe_ids}
+        for row in await fetch_all(_categories_query(recipe_ids)):
+            categories[row["recetaIdCR"]].append(_category_to_dict(row))
+        for recipe in recipes:
+            recipe["categories"] = categories[recipe["id"]]
+    return recipes
+
+async def get_recipe_service(recipe_id: int, fields: tuple = None, expand: tuple = ()):
+    """
+    Retrieves a recipe by its ID without blocking the event loop.
+
+    Args:
+        recipe_id (int): The unique identifier of the recipe.
+        fields (tuple): The names of the fields to return, or None for every field.
+        expand (tuple): The related resources to embed, from `RECIPE_EXPANSIONS`.
 
     Returns:
         DICT: A dictionary containing the recipe's details.
-        
+
     Raises:
         DoesNotExist: If the recipe with the given ID does not exist.
     """
-    recipe = Recipe.get_by_id(recipe_id)
-    return{
-        "id": recipe.idRecipe,
-        "name": recipe.nameRecipe,
-        "description": recipe.descriptionRecipe,
-        "category": recipe.category,
-        "difficulty": recipe.difficulty,
-        "timePreparation": recipe.timePreparation,
-        "instructions": recipe.instructions,
-        "nutritionalData": recipe.nutritionalData
-    }
+    async def load():
+        recipe = await fetch_one(RecipeModel.select().where(RecipeModel.idRecipe == recipe_id))
+        return _recipe_to_dict(recipe)
+    recipe = RECIPE_FIELDS.pick(await cached_async(_recipe_cache, recipe_id, load), fields)
+    if expand:
+        [recipe] = await _expand_recipes([recipe], expand)
+    return recipe
     
-def get_all_recipes_service():
+async def get_all_recipes_service(limit: int, after_id: int = None, fields: tuple = None,
+                                  expand: tuple = ()):
     """
-    Retrieves all recipes from the database.
+    Retrieves a page of recipes ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of recipes to return.
+        after_id (int): The cursor of the previous page, if any.
+        fields (tuple): The names of the fields to return, or None for every field.
+        expand (tuple): The related resources to embed, from `RECIPE_EXPANSIONS`.
 
     Returns:
-        List: A list of dictionaries containing the data of each recipe's details.
+        dict: The recipes of the page and the cursor of the next one.
     """
-    recipes = list(Recipe.select())
-    return [
-        {
-        "id": recipe.idRecipe,
-        "name": recipe.nameRecipe,
-        "description": recipe.descriptionRecipe,
-        "category": recipe.category,
-        "difficulty": recipe.difficulty,
-        "timePreparation": recipe.timePreparation,
-        "instructions": recipe.instructions,
-        "nutritionalData": recipe.nutritionalData
-        }
-        for recipe in recipes
-    ]
+    query, serializer = RECIPE_FIELDS.project(fields, _recipe_to_dict)
+    page = await paginate_async(query, RecipeModel.idRecipe, serializer, limit, after_id)
+    if expand:
+        page["items"] = await _expand_recipes(page["items"], expand)
+    return page
+
+def stream_all_recipes_service(after_id: int = None, fields: tuple = None):
+    """
+    Yields every recipe ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only recipes with a greater ID are streamed, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
 
+    Yields:
+        dict: The details of each recipe.
+    """
+    query, serializer = RECIPE_FIELDS.project(fields, _recipe_to_dict)
+    query = query.order_by(RecipeModel.idRecipe)
+    if after_id is not None:
+        query = query.where(RecipeModel.idRecipe > after_id)
+    for recipe in iterate_rows(query):
+        yield serializer(recipe)
+
+def _search_query(text: str, category_id: int = None, difficulty: str = None,
+                  fields: tuple = None):
+    """
+    Builds the recipe search query ranked by relevance.
+
+    On MySQL the FULLTEXT index over name, description and instructions is
+    used in natural language mode. Other databases fall back to `LIKE`
+    matching, scored by the weighted number of terms found in each column.
+    Returns the query and the serializer of the requested fields.
+    """
+    columns = [field for field, _ in _SEARCH_FIELDS]
+    if isinstance(RecipeModel._meta.database, MySQLDatabase):  # pylint: disable=protected-access
+        relevance = Match(columns, text, modifier="IN NATURAL LANGUAGE MODE")
+    else:
+        terms = text.split()[:_SEARCH_MAX_TERMS]
+        relevance = sum(Case(None, ((field.contains(term), weight),), 0)
+                        for term in terms for field, weight in _SEARCH_FIELDS)
+    query, serializer = RECIPE_FIELDS.project(fields, _recipe_to_dict)
+    query = query.select_extend(relevance.alias("relevance")).where(relevance > 0)
+    if category_id is not None:
+        in_bridge = (RecipeCategoryModel
+                     .select(RecipeCategoryModel.recetaIdCR)
+                     .where(RecipeCategoryModel.categoriaIdCR == category_id))
+        query = query.where((RecipeModel.categoriaId == category_id) |
+                            RecipeModel.idRecipe.in_(in_bridge))
+    if difficulty is not None:
+        query = query.where(RecipeModel.difficultyRecipe == difficulty)
+    return query.order_by(relevance.desc(), RecipeModel.idRecipe), serializer
+
+def _search_page(rows, serializer, limit: int, offset: int):
+    """Builds the page of search results and the cursor of the next one."""
+    return {
+        "items": [{**serializer(row), "relevance": float(row.relevance)}
+                  for row in rows[:limit]],
+        "next_cursor": offset + limit if len(rows) > limit else None
+    }
+
+async def search_recipes_service(text: str, limit: int, cursor: int = None,
+                                 category_id: int = None, difficulty: str = None,
+                                 fields: tuple = None):
+    """
+    Searches recipes by name, description and instructions without blocking the event loop.
+
+    Args:
+        text (str): The words to search for.
+        limit (int): The maximum number of recipes to return.
+        cursor (int): The cursor returned by the previous page, if any.
+        category_id (int): Only recipes of this category, if given.
+        difficulty (str): Only recipes of this difficulty, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
+
+    Returns:
+        dict: The matching recipes of the page with their relevance, and the
+        cursor of the next page.
+    """
+    offset = cursor or 0
+    query, serializer = _search_query(text, category_id, difficulty, fields)
+    rows = await fetch_all(query.offset(offset).limit(limit + 1))
+    return _search_page(rows, serializer, limit, offset)
+
+@bumps_data_version
 def update_recipe_service(recipe_id: int, recipe_data: Recipe):
     """
     Updates an existing recipe's details by their ID.
@@ -79,25 +294,30 @@ def update_recipe_service(recipe_id: int, recipe_data: Recipe):
         recipe_data (Recipe): An object containing the updated user details.
         
     Returns:
-        RecipeModel: The updated recipe record.
+        dict: The updated recipe details.
         
     Raises:
         DoesNotExist: If the recipe with the given ID does not exist.
     """
-    recipe = Recipe.get_by_id(recipe_id)
-    recipe.nameRecipe = recipe_data.name
+    recipe = RecipeModel.get_by_id(recipe_id)
+    recipe.nameRecipe = recipe_data.nameRecipe
     recipe.descriptionRecipe = recipe_data.descriptionRecipe
-    recipe.category = recipe_data.category
-    recipe.difficulty = recipe_data.difficulty
+    recipe.categoryRecipe = recipe_data.category
+    recipe.difficultyRecipe = recipe_data.difficulty
     recipe.timePreparation = recipe_data.timePreparation
     recipe.instructions = recipe_data.instructions
     recipe.nutritionalData = recipe_data.nutritionalData
     recipe.save()
-    return recipe
+    _recipe_cache.delete(recipe_id)
+    return _recipe_to_dict(recipe)
 
+@bumps_data_version
 def delete_recipe_service(recipe_id: int):
     """
-    Deletes a recipe from the database by their ID.
+    Deletes a recipe from the database by their ID, with its ingredients and category links.
+
+    Menus and shopping lists belong to their users, so a recipe still used by
+    one of them is not deleted.
 
     Args:
         recipe_id (int): The ID of the recipe to delete.
@@ -107,8 +327,22 @@ def delete_recipe_service(recipe_id: int):
         
     Raises:
         DoesNotExist: If the recipe with the given ID does not exist.
+        IntegrityError: If the recipe is still in a menu or a shopping list.
     """
-    recipe = Recipe.get_by_id(recipe_id)
-    recipe.delete_instance()
+    recipe = RecipeModel.get_by_id(recipe_id)
+    ingredients = IngredientModel.select(IngredientModel.idIngredient).where(
+        IngredientModel.recipeId == recipe_id)
+    db = recipe._meta.database  # pylint: disable=protected-access
+    with db.atomic():
+        in_menu = MenuRecipeModel.select().where(MenuRecipeModel.recipeIdMR == recipe_id).exists()
+        in_list = (ShoppingListIngredientModel.select()
+                   .where(ShoppingListIngredientModel.ingredientId.in_(ingredients))
+                   .exists())
+        if in_menu or in_list:
+            raise IntegrityError(f"Recipe {recipe_id} is used by a menu or a shopping list")
+        RecipeCategoryModel.delete().where(RecipeCategoryModel.recetaIdCR == recipe_id).execute()
+        IngredientModel.delete().where(IngredientModel.recipeId == recipe_id).execute()
+        recipe.delete_instance()
+    _recipe_cache.delete(recipe_id)
+    recipe_index.refresh([recipe_id])
     return {"message": "Recipe deleted successfully"}
-    
\ No newline at end of file
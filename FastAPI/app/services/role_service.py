@@ -1,6 +1,12 @@
 """This module contains the service functions for the role class."""
 from app.models.role_model import Role
+from app.config.database import Role as RoleModel
+from app.config.async_database import fetch_one
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_role_service(role):
     """
     Creates a new role in the database.
@@ -18,43 +24,61 @@ def create_role_service(role):
     )
     return role_record
 
-def get_role_service(role_id: int):
+def _role_to_dict(role):
+    """Builds the dictionary returned to the client for a role record."""
+    return {
+        "id": role.idRole,
+        "name": role.nameRole,
+        "permissions": role.permissions
+    }
+
+async def get_role_service(role_id: int):
     """
-    Retrieves a role by its ID.
+    Retrieves a role by its ID without blocking the event loop.
 
     Args:
         role_id (int): The unique identifier of the role.
 
     Returns:
         DICT: A dictionary containing the role's details.
-        
+
     Raises:
         DoesNotExist: If the role with the given ID does not exist.
     """
-    role = Role.get_by_id(role_id)
-    return {
-        "id": role.idRole,
-        "name": role.nameRole,
-        "permissions": role.permissions
-    }
+    role = await fetch_one(RoleModel.select().where(RoleModel.idRole == role_id))
+    return _role_to_dict(role)
 
-def get_all_roles_service():
+async def get_all_roles_service(limit: int, after_id: int = None):
     """
-    Retrieves all roles from the database.
+    Retrieves a page of roles ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of roles to return.
+        after_id (int): The cursor of the previous page, if any.
 
     Returns:
-        List: A list of dictionaries containing the data of each role's details.
+        dict: The roles of the page and the cursor of the next one.
     """
-    roles = list(Role.select())
-    return [
-        {
-        "id": role.idRole,
-        "name": role.nameRole,
-        "permissions": role.permissions
-        }
-        for role in roles
-    ]
+    return await paginate_async(RoleModel.select(), RoleModel.idRole,
+                                _role_to_dict, limit, after_id)
+
+def stream_all_roles_service(after_id: int = None):
+    """
+    Yields every role ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only roles with a greater ID are streamed, if given.
+
+    Yields:
+        dict: The details of each role.
+    """
+    query = RoleModel.select().order_by(RoleModel.idRole)
+    if after_id is not None:
+        query = query.where(RoleModel.idRole > after_id)
+    for role in iterate_rows(query):
+        yield _role_to_dict(role)
 
+@bumps_data_version
 def update_role_service(role_id: int, role_data: Role):
     """
     Updates an existing role's details by its ID.
@@ -75,6 +99,7 @@ def update_role_service(role_id: int, role_data: Role):
     role.save()
     return role
 
+@bumps_data_version
 def delete_role_service(role_id: int):
     """
     Deletes a role from the database by its ID.
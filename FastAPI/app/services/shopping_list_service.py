@@ -1,6 +1,23 @@
 """This module contains the service functions for the shoppingList class."""
+from peewee import fn
 from app.models.shopping_list_model import ShoppingList
+from app.config.database import Ingredient as IngredientModel
+from app.config.database import IngredientInventory as IngredientInventoryModel
+from app.config.database import Menu as MenuModel
+from app.config.database import Menu_Recipe as MenuRecipeModel
+from app.config.database import Pantry as PantryModel
+from app.config.database import Unit as UnitModel
+from app.config.database import ShoppingList as ShoppingListModel
+from app.config.database import ShoppingList_Ingredient as ShoppingListIngredientModel
+from app.config.async_database import fetch_one
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.http_cache import bumps_data_version
 
+# Amounts below this, in base units, are considered covered by the pantry.
+_EPSILON = 1e-9
+
+@bumps_data_version
 def create_shopping_list_service(shopping_list):
     """
     Creates a new shoppingList in the database.
@@ -16,38 +33,150 @@ def create_shopping_list_service(shopping_list):
     )
     return shopping_list_record
 
-def get_shopping_list_service(shopping_list_id: int):
+def _shopping_list_to_dict(shopping_list):
+    """Builds the dictionary returned to the client for a shoppingList record."""
+    return {
+        "id": shopping_list.idShoppingList
+    }
+
+async def get_shopping_list_service(shopping_list_id: int):
     """
-    Retrieves a shoppingList by its ID.
+    Retrieves a shoppingList by its ID without blocking the event loop.
 
     Args:
         shopping_list_id (int): The unique identifier of the shoppingList.
 
     Returns:
         DICT: A dictionary containing the shoppingList's details.
-        
+
     Raises:
         DoesNotExist: If the shoppingList with the given ID does not exist.
     """
-    shopping_list = ShoppingList.get_by_id(shopping_list_id)
-    return {
-        "id": shopping_list.idShoppingList
-    }
+    query = ShoppingListModel.select().where(ShoppingListModel.idShoppingList == shopping_list_id)
+    shopping_list = await fetch_one(query)
+    return _shopping_list_to_dict(shopping_list)
 
-def get_all_shopping_lists_service():
+async def get_all_shopping_lists_service(limit: int, after_id: int = None):
     """
-    Retrieves all shoppingLists from the database.
+    Retrieves a page of shoppingLists ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of shoppingLists to return.
+        after_id (int): The cursor of the previous page, if any.
 
     Returns:
-        List: A list of dictionaries containing the data of each shoppingList's details.
+        dict: The shoppingLists of the page and the cursor of the next one.
+    """
+    return await paginate_async(ShoppingListModel.select(), ShoppingListModel.idShoppingList,
+                                _shopping_list_to_dict, limit, after_id)
+
+def stream_all_shopping_lists_service(after_id: int = None):
+    """
+    Yields every shoppingList ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only shoppingLists with a greater ID are streamed, if given.
+
+    Yields:
+        dict: The details of each shoppingList.
     """
-    shopping_lists = list(ShoppingList.select())
-    return [
-        {
-            "id": shopping_list.idShoppingList
-        }
-        for shopping_list in shopping_lists
-    ]
+    query = ShoppingListModel.select().order_by(ShoppingListModel.idShoppingList)
+    if after_id is not None:
+        query = query.where(ShoppingListModel.idShoppingList > after_id)
+    for shopping_list in iterate_rows(query):
+        yield _shopping_list_to_dict(shopping_list)
+
+def _name_key(field):
+    """Returns the SQL expression grouping ingredient names regardless of case and spaces."""
+    return fn.LOWER(fn.TRIM(field))
+
+def _menu_demand(menu_id: int):
+    """
+    Sums the ingredients of every recipe of a menu by name and base unit in SQL.
+
+    Ingredients without a numeric quantity are returned apart, with their raw
+    unit, since they cannot be added to or compared with the stock.
+    """
+    name_key = _name_key(IngredientModel.nameIngredient)
+    summed = (IngredientModel
+              .select(name_key, UnitModel.baseUnit, fn.MIN(IngredientModel.idIngredient),
+                      fn.MIN(IngredientModel.nameIngredient), fn.SUM(IngredientModel.quantityBase))
+              .join(MenuRecipeModel, on=MenuRecipeModel.recipeIdMR == IngredientModel.recipeId)
+              .switch(IngredientModel)
+              .join(UnitModel)
+              .where(MenuRecipeModel.menuIdMR == menu_id)
+              .group_by(name_key, UnitModel.baseUnit)
+              .tuples())
+    demand = {(key, base_unit): (ingredient_id, name, total, base_unit)
+              for key, base_unit, ingredient_id, name, total in summed}
+    raw = (IngredientModel
+           .select(name_key, IngredientModel.unitIngredient, fn.MIN(IngredientModel.idIngredient),
+                   fn.MIN(IngredientModel.nameIngredient))
+           .join(MenuRecipeModel, on=MenuRecipeModel.recipeIdMR == IngredientModel.recipeId)
+           .where((MenuRecipeModel.menuIdMR == menu_id) &
+                  (IngredientModel.quantityBase.is_null() | IngredientModel.unitId.is_null()))
+           .group_by(name_key, IngredientModel.unitIngredient)
+           .tuples())
+    unparsed = [(ingredient_id, name, None, unit) for _, unit, ingredient_id, name in raw]
+    return demand, unparsed
+
+def _pantry_stock(user_id: int, keys):
+    """Sums in SQL the inventory of a user's pantries by name and base unit."""
+    name_key = _name_key(IngredientInventoryModel.nameIngredient)
+    query = (IngredientInventoryModel
+             .select(name_key, UnitModel.baseUnit, fn.SUM(IngredientInventoryModel.quantityBase))
+             .join(PantryModel)
+             .switch(IngredientInventoryModel)
+             .join(UnitModel)
+             .where((PantryModel.userId == user_id) & name_key.in_(keys))
+             .group_by(name_key, UnitModel.baseUnit)
+             .tuples())
+    return {(key, base_unit): total for key, base_unit, total in query}
+
+@bumps_data_version
+def generate_shopping_list_service(menu_id: int):
+    """
+    Creates the shopping list of a menu: the ingredients of all its recipes
+    minus what the menu owner already has in their pantries.
+
+    Demand and stock are summed by the database over the numeric quantities,
+    in base units (grams, milliliters or units). The list and its items are
+    written in a single transaction.
+
+    Args:
+        menu_id (int): The ID of the menu.
+
+    Returns:
+        dict: The ID of the new shopping list and the ingredients to buy.
+
+    Raises:
+        DoesNotExist: If the menu with the given ID does not exist.
+    """
+    menu = MenuModel.get_by_id(menu_id)
+    demand, unparsed = _menu_demand(menu_id)
+    keys = {key for key, _ in demand}
+    stock = _pantry_stock(menu.userId_id, keys) if keys else {}
+    items = []
+    for key, (ingredient_id, name, needed, unit) in demand.items():
+        missing = needed - stock.get(key, 0.0)
+        if missing > _EPSILON:
+            items.append((ingredient_id, name, round(missing, 3), unit))
+    items.extend(unparsed)
+    with ShoppingListModel._meta.database.atomic():  # pylint: disable=protected-access
+        shopping_list = ShoppingListModel.create(menuId=menu_id)
+        if items:
+            ShoppingListIngredientModel.insert_many([{
+                "shoppingListId": shopping_list.idShoppingList,
+                "ingredientId": ingredient_id,
+                "amountIngredient": amount,
+                "unitIngredient": unit
+            } for ingredient_id, _, amount, unit in items]).execute()
+    return {
+        "id": shopping_list.idShoppingList,
+        "menuId": menu_id,
+        "items": [{"ingredientId": ingredient_id, "name": name, "amount": amount, "unit": unit}
+                  for ingredient_id, name, amount, unit in items]
+    }
 
 # def update_shopping_list_service(shopping_list_id: int, shopping_list_data: ShoppingList):
 #     """
@@ -67,6 +196,7 @@ def get_all_shopping_lists_service():
 #     shopping_list.save()
 #     return shopping_list
 
+@bumps_data_version
 def delete_shopping_list_service(shopping_list_id: int):
     """
     Deletes a shoppingList from the database by its ID.
@@ -1,6 +1,13 @@
 """This module contains the service functions for the user class."""
 from app.models.user_model import User
+from app.config.database import User as UserModel
+from app.config.async_database import fetch_one
+from app.helpers.fields import FieldMap
+from app.helpers.pagination import paginate_async
+from app.helpers.streaming import iterate_rows
+from app.helpers.http_cache import bumps_data_version
 
+@bumps_data_version
 def create_user_service(user):
     """
     Creates a new user in the database.
@@ -20,47 +27,76 @@ def create_user_service(user):
     )
     return user_record
 
-def get_user_service(user_id: int):
+def _user_to_dict(user):
+    """Builds the dictionary returned to the client for a user record."""
+    return {
+        "id": user.idUser,
+        "name": user.nameUser,
+        "password": user.passwordUser,
+        "email": user.emailUser,
+        "photo": user.photoUser
+    }
+
+USER_FIELDS = FieldMap(
+    UserModel.idUser,
+    name=UserModel.nameUser,
+    password=UserModel.passwordUser,
+    email=UserModel.emailUser,
+    photo=UserModel.photoUser
+)
+
+async def get_user_service(user_id: int, fields: tuple = None):
     """
-    Retrieves a user by their ID.
+    Retrieves a user by its ID without blocking the event loop.
 
     Args:
         user_id (int): The unique identifier of the user.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
         DICT: A dictionary containing the user's details.
-        
+
     Raises:
         DoesNotExist: If the user with the given ID does not exist.
     """
-    user = User.get_by_id(user_id)
-    return{
-        "id": user.idUser,
-        "name": user.name,
-        "password": user.password,
-        "email": user.email,
-        "photo": user.photo
-    }
+    query, serializer = USER_FIELDS.project(fields, _user_to_dict)
+    user = await fetch_one(query.where(UserModel.idUser == user_id))
+    return serializer(user)
     
-def get_all_users_service():
+async def get_all_users_service(limit: int, after_id: int = None, fields: tuple = None):
     """
-    Retrieves all users from the database.
+    Retrieves a page of users ordered by ID without blocking the event loop.
+
+    Args:
+        limit (int): The maximum number of users to return.
+        after_id (int): The cursor of the previous page, if any.
+        fields (tuple): The names of the fields to return, or None for every field.
 
     Returns:
-        List: A list of dictionaries containing the data of each user's details.
+        dict: The users of the page and the cursor of the next one.
     """
-    users = list(User.select())
-    return [
-        {
-        "id": user.idUser,
-        "name": user.name,
-        "password": user.password,
-        "email": user.email,
-        "photo": user.photo
-        }
-        for user in users
-    ]
+    query, serializer = USER_FIELDS.project(fields, _user_to_dict)
+    return await paginate_async(query, UserModel.idUser, serializer, limit, after_id)
+
+def stream_all_users_service(after_id: int = None, fields: tuple = None):
+    """
+    Yields every user ordered by ID, reading them from a server-side cursor.
+
+    Args:
+        after_id (int): Only users with a greater ID are streamed, if given.
+        fields (tuple): The names of the fields to return, or None for every field.
+
+    Yields:
+        dict: The details of each user.
+    """
+    query, serializer = USER_FIELDS.project(fields, _user_to_dict)
+    query = query.order_by(UserModel.idUser)
+    if after_id is not None:
+        query = query.where(UserModel.idUser > after_id)
+    for user in iterate_rows(query):
+        yield serializer(user)
     
+@bumps_data_version
 def update_user_service(user_id: int, user_data: User):
     """
     Updates an existing user's details by their ID.
@@ -83,6 +119,7 @@ def update_user_service(user_id: int, user_data: User):
     user.save()
     return user
 
+@bumps_data_version
 def delete_user_service(user_id: int):
     """
     Deletes a user from the database by their ID.
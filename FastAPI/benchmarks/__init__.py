@@ -0,0 +1 @@
+"""Benchmarks of the API, run against a temporary SQLite copy of the schema."""
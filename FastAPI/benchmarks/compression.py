@@ -0,0 +1,63 @@
+"""
+Measures the bytes saved and the CPU cost of the response compression on the
+list endpoints, for full pages and for the NDJSON streaming mode.
+
+Usage:
+    python -m benchmarks.compression [--rows 500] [--stream-rows 5000] [--rounds 20]
+"""
+import argparse
+from benchmarks.support import HEADERS, create_database, measure, seed, summarize
+# pylint: disable=wrong-import-order
+from fastapi.testclient import TestClient
+from app.helpers.compression import available_encodings, compression_stats
+from app.main import app
+
+
+def _wire_bytes(client, path, params, encoding):
+    with client.stream("GET", path, params=params,
+                       headers={**HEADERS, "accept-encoding": encoding}) as response:
+        response.raise_for_status()
+        return sum(len(chunk) for chunk in response.iter_raw())
+
+
+def main(argv=None):
+    """Seeds the catalog and prints the size, latency and compression time per encoding."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--stream-rows", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+    db = create_database()
+    seed(db, members=1, items=args.stream_rows, recipes=args.rows, ingredients=1)
+    cases = (
+        ("recipes page", "/api/recipes/", {"limit": args.rows}),
+        ("inventory page", "/api/ingredient-inventories/", {"limit": args.rows}),
+        ("inventory stream", "/api/ingredient-inventories/", {"stream": 1}),
+    )
+    print(f"{'case':>16}  {'encoding':>8}  {'bytes':>9}  {'ratio':>6}  {'p50':>9}  "
+          f"{'compress/resp':>13}")
+    with TestClient(app) as client:
+        for name, path, params in cases:
+            identity = None
+            for encoding in ["identity", *available_encodings()]:
+                size = _wire_bytes(client, path, params, encoding)
+                identity = identity or size
+                before = compression_stats()["encodings"].get(encoding, {})
+                samples = []
+                for _ in range(args.rounds):
+                    with measure(db) as result:
+                        _wire_bytes(client, path, params, encoding)
+                    samples.append(result["seconds"])
+                after = compression_stats()["encodings"].get(encoding, {})
+                cost = "-"
+                if after:
+                    responses = after["responses"] - before.get("responses", 0)
+                    total_ms = (after["ms_per_response"] * after["responses"] -
+                                before.get("ms_per_response", 0) * before.get("responses", 0))
+                    cost = f"{total_ms / responses:.3f} ms"
+                print(f"{name:>16}  {encoding:>8}  {size:9d}  {size / identity:6.3f}  "
+                      f"{summarize(samples)['p50_ms']:6.3f} ms  {cost:>13}")
+
+
+if __name__ == "__main__":
+    main()
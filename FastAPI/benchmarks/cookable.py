@@ -0,0 +1,88 @@
+"""
+Measures `GET /api/pantries/{id}/cookable` over a large recipe catalog: the
+time to build the recipe index once and the latency of ranking a pantry.
+
+Usage:
+    python -m benchmarks.cookable [--recipes 100000] [--vocabulary 2000] [--pantry 60]
+"""
+import argparse
+import datetime
+import random
+import time
+from benchmarks.support import HEADERS, create_database, measure, seed, summarize
+# pylint: disable=wrong-import-order
+from fastapi.testclient import TestClient
+from app.config.database import (CategoryIngredient, CategoryRecipe, Ingredient,
+                                 IngredientInventory, Recipe)
+from app.helpers.recipe_index import recipe_index
+from app.main import app
+
+BATCH = 500
+
+
+def seed_catalog(db, user_id, recipes, vocabulary, rng):
+    """Inserts the recipes, each with 3 to 15 ingredients skewed towards common names."""
+    category = CategoryIngredient.select().first()
+    category_recipe = CategoryRecipe.select().first()
+    today = datetime.date.today()
+    with db.atomic():
+        for start in range(0, recipes, BATCH):
+            Recipe.insert_many([{
+                "nameRecipe": f"recipe {number}", "descriptionRecipe": "",
+                "categoryRecipe": "main", "difficultyRecipe": "easy",
+                "timePreparation": datetime.time(0, 30), "instructions": "",
+                "nutritionalData": "", "userId": user_id,
+                "categoriaId": category_recipe.idCategoryRecipe,
+            } for number in range(start, min(start + BATCH, recipes))]).execute()
+        rows = []
+        for (recipe_id,) in Recipe.select(Recipe.idRecipe).tuples():
+            for _ in range(rng.randint(3, 15)):
+                rows.append({
+                    "nameIngredient": f"ingredient {int(vocabulary * rng.random() ** 2)}",
+                    "amountIngredient": "1", "unitIngredient": "g",
+                    "dateExpirationIngredient": today, "recipeId": recipe_id,
+                    "categoryIdIngredient": category.idCategoryIngredient,
+                })
+        for start in range(0, len(rows), BATCH):
+            Ingredient.insert_many(rows[start:start + BATCH]).execute()
+    return len(rows)
+
+
+def main(argv=None):
+    """Seeds the catalog and a pantry, then prints the index build time and latency."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--pantry", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+    rng = random.Random(13)
+    db = create_database()
+    ids = seed(db, members=1, items=0)
+    ingredients = seed_catalog(db, ids["users"][0], args.recipes, args.vocabulary, rng)
+    pantry_id = ids["pantries"][0]
+    IngredientInventory.insert_many([{
+        "nameIngredient": f"ingredient {int(args.vocabulary * rng.random() ** 2)}",
+        "amountIngredient": "1", "unitIngredient": "g",
+        "dateExpirationIngredient": datetime.date.today(), "pantryId": pantry_id,
+    } for _ in range(args.pantry)]).execute()
+    started = time.perf_counter()
+    recipe_index.build()
+    build_seconds = time.perf_counter() - started
+    samples = []
+    with TestClient(app) as client:
+        for _ in range(args.rounds):
+            with measure(db) as result:
+                response = client.get(f"/api/pantries/{pantry_id}/cookable", headers=HEADERS)
+            response.raise_for_status()
+            samples.append(result["seconds"])
+    report = summarize(samples)
+    print(f"{args.recipes} recipes, {ingredients} ingredients, {args.pantry} pantry items: "
+          f"index built in {build_seconds * 1000:.0f} ms, "
+          f"{recipe_index.stats()['names']} names")
+    print(f"cookable: p50 {report['p50_ms']:.3f} ms  p95 {report['p95_ms']:.3f} ms  "
+          f"{result['queries']} queries per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Checks that embedding related resources in recipes runs a constant number of queries.
+
+For each number of ingredients and categories per recipe, a fresh SQLite
+database is seeded and the recipe detail and list endpoints are read with and
+without `expand=ingredients,categories`. The statements of each request are
+counted and the command exits with status 1 if the counts change with the
+number of related rows, which would reveal an N+1, or if a response misses
+some of them.
+
+Usage:
+    python -m benchmarks.expand [--sizes 1 10 100] [--recipes 20]
+"""
+import argparse
+import sys
+from benchmarks.support import HEADERS, create_database, seed
+# pylint: disable=wrong-import-order
+from fastapi.testclient import TestClient
+from app.config.database import CategoryRecipe, Recipe_Category
+from app.main import app
+
+EXPAND = "ingredients,categories"
+
+
+def seed_categories(recipe_ids, categories):
+    """Links every recipe to the given number of new categories."""
+    ids = [CategoryRecipe.create(nameCategoryRecipe=f"category {number}",
+                                 descriptionCategoryRecipe="").idCategoryRecipe
+           for number in range(categories)]
+    Recipe_Category.insert_many([{"recetaIdCR": recipe_id, "categoriaIdCR": category_id}
+                                 for recipe_id in recipe_ids for category_id in ids]).execute()
+
+
+def count_queries(client, db, url):
+    """Sends a request and returns its response and the statements it ran."""
+    before = db.queries
+    response = client.get(url, headers=HEADERS)
+    response.raise_for_status()
+    return response.json(), db.queries - before
+
+
+def check(db, size, recipes):
+    """
+    Seeds recipes with `size` ingredients and categories each and reads them.
+
+    Returns:
+        tuple: The statements of each request by name, and the problems found.
+    """
+    ids = seed(db, recipes=recipes, ingredients=size)["recipes"]
+    seed_categories(ids, size)
+    problems = []
+    with TestClient(app) as client:
+        # The API keys are loaded on the first request; keep them out of the counts.
+        client.get("/api/roles/", headers=HEADERS)
+        # Distinct recipes, so the detail cache never serves the base row.
+        page = f"/api/recipes/?limit={recipes}&after_id={ids[0] - 1}"
+        requests = {
+            "detail": f"/api/recipes/{ids[0]}",
+            "detail expanded": f"/api/recipes/{ids[1]}?expand={EXPAND}",
+            "page": page,
+            "page expanded": f"{page}&expand={EXPAND}",
+        }
+        counts = {}
+        for name, url in requests.items():
+            body, counts[name] = count_queries(client, db, url)
+            if "expanded" not in name:
+                continue
+            for recipe in body.get("items", [body]):
+                if len(recipe["ingredients"]) != size or len(recipe["categories"]) != size:
+                    problems.append(f"{name}: recipe {recipe['id']} misses related rows")
+                    break
+    return counts, problems
+
+
+def main(argv=None):
+    """Prints the statements of each request per size and fails if they grow."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--recipes", type=int, default=20)
+    args = parser.parse_args(argv)
+    db = create_database()
+    results = {size: check(db, size, args.recipes) for size in args.sizes}
+    names = list(results[args.sizes[0]][0])
+    print(f"{'related rows':>12}  " + "  ".join(f"{name:>15}" for name in names))
+    for size, (counts, _) in results.items():
+        print(f"{size:12d}  " + "  ".join(f"{counts[name]:15d}" for name in names))
+    problems = [problem for _, found in results.values() for problem in found]
+    for name in names:
+        if len({counts[name] for counts, _ in results.values()}) > 1:
+            problems.append(f"{name}: the number of queries grows with the related rows")
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compares building a family's pantry view through the per-resource endpoints
+with the single `GET /api/families/{id}/pantry` request.
+
+Usage:
+    python -m benchmarks.family_pantry [--members 4] [--items 50] [--rounds 20]
+"""
+import argparse
+from benchmarks.support import HEADERS, create_database, measure, seed, summarize
+# pylint: disable=wrong-import-order
+from fastapi.testclient import TestClient
+from app.config.database import IngredientInventory, Pantry, User
+from app.main import app
+
+
+def family_layout(family_id):
+    """Returns the member, pantry and item IDs of a family, as clients learn them."""
+    layout = {}
+    query = (IngredientInventory
+             .select(User.idUser, Pantry.idPantry, IngredientInventory.ingredientId)
+             .join(Pantry).join(User)
+             .where(User.familyId == family_id)
+             .tuples())
+    for user_id, pantry_id, item_id in query:
+        layout.setdefault(user_id, {}).setdefault(pantry_id, []).append(item_id)
+    return layout
+
+
+def fan_out(client, family_id, layout):
+    """
+    Builds the pantry view the way clients did before the snapshot endpoint.
+
+    Returns:
+        int: The number of HTTP requests sent.
+    """
+    paths = [f"/api/families/{family_id}"]
+    for user_id, pantries in layout.items():
+        paths.append(f"/api/users/{user_id}")
+        for pantry_id, items in pantries.items():
+            paths.append(f"/api/pantries/{pantry_id}")
+            paths.extend(f"/api/ingredient-inventories/{item_id}" for item_id in items)
+    for path in paths:
+        client.get(path, headers=HEADERS).raise_for_status()
+    return len(paths)
+
+
+def snapshot(client, family_id, _):
+    """
+    Builds the pantry view with the snapshot endpoint.
+
+    Returns:
+        int: The number of HTTP requests sent.
+    """
+    client.get(f"/api/families/{family_id}/pantry", headers=HEADERS).raise_for_status()
+    return 1
+
+
+def run(strategy, client, db, family_id, layout, rounds):
+    """Runs a strategy several times and reports its requests, queries and latency."""
+    samples = []
+    for _ in range(rounds):
+        with measure(db) as result:
+            requests = strategy(client, family_id, layout)
+        samples.append(result["seconds"])
+    return {"requests": requests, "queries": result["queries"], **summarize(samples)}
+
+
+def main(argv=None):
+    """Seeds the database, runs both strategies and prints the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=4)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+    db = create_database()
+    family_id = seed(db, members=args.members, items=args.items)["families"][0]
+    layout = family_layout(family_id)
+    with TestClient(app) as client:
+        for name, strategy in (("fan-out", fan_out), ("snapshot", snapshot)):
+            report = run(strategy, client, db, family_id, layout, args.rounds)
+            print(f"{name:>9}: {report['requests']:4d} requests {report['queries']:5d} queries "
+                  f"p50 {report['p50_ms']:9.3f} ms  p95 {report['p95_ms']:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
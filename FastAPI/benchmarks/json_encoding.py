@@ -0,0 +1,90 @@
+"""
+Compares the encoding of full list pages with `jsonable_encoder` and the
+stdlib `json` (FastAPI's default path) against the response models and orjson
+the list endpoints now use.
+
+Usage:
+    python -m benchmarks.json_encoding [--rows 500] [--rounds 50]
+"""
+import argparse
+import asyncio
+import datetime
+import time
+from benchmarks.support import HEADERS, create_database, seed, summarize
+# pylint: disable=wrong-import-order
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from app.config.database import Notification
+from app.main import app
+from app.models.page_model import Page
+from app.models.ingredient_inventory_model import IngredientInventoryResponse
+from app.models.ingredient_model import IngredientResponse
+from app.models.notification_model import NotificationResponse
+from app.models.recipe_model import RecipeResponse
+from app.services.ingredient_inventory_service import get_all_ingredient_inventories_service
+from app.services.ingredient_service import get_all_ingredients_service
+from app.services.notification_service import get_all_notifications_service
+from app.services.recipe_service import get_all_recipes_service
+
+ENDPOINTS = (
+    ("/api/recipes/", get_all_recipes_service, RecipeResponse),
+    ("/api/ingredients/", get_all_ingredients_service, IngredientResponse),
+    ("/api/ingredient-inventories/", get_all_ingredient_inventories_service,
+     IngredientInventoryResponse),
+    ("/api/notifications/", get_all_notifications_service, NotificationResponse),
+)
+
+
+def _stdlib(page, _):
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def _response_model(page, adapter):
+    content = adapter.dump_python(adapter.validate_python(page), mode="json", exclude_unset=True)
+    return ORJSONResponse(content).body
+
+
+def _time(encoder, page, adapter, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        encoder(page, adapter)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main(argv=None):
+    """Seeds full pages of each list endpoint and prints the encoding time of both paths."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+    db = create_database()
+    ids = seed(db, members=1, items=args.rows, recipes=args.rows, ingredients=1)
+    today = datetime.date.today()
+    Notification.insert_many([{"messageNotification": f"item {number} expires soon",
+                               "dateNotification": today, "userId": ids["users"][0]}
+                              for number in range(args.rows)]).execute()
+    print(f"{args.rows} rows per page, p50 over {args.rounds} rounds")
+    print(f"{'endpoint':>30}  {'jsonable+json':>14}  {'model+orjson':>13}  {'speedup':>7}  "
+          f"{'HTTP p50':>9}")
+    with TestClient(app) as client:
+        for path, service, item_model in ENDPOINTS:
+            page = asyncio.run(service(args.rows))
+            adapter = TypeAdapter(Page[item_model])
+            assert _stdlib(page, adapter).count(b'"id"') == len(page["items"])
+            before = _time(_stdlib, page, adapter, args.rounds)["p50_ms"]
+            after = _time(_response_model, page, adapter, args.rounds)["p50_ms"]
+            samples = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                client.get(path, params={"limit": args.rows}, headers=HEADERS).raise_for_status()
+                samples.append(time.perf_counter() - start)
+            print(f"{path:>30}  {before:11.3f} ms  {after:10.3f} ms  {before / after:6.1f}x  "
+                  f"{summarize(samples)['p50_ms']:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
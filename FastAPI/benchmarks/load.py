@@ -0,0 +1,306 @@
+"""
+Drives every router with concurrent HTTP load and compares the results with a baseline.
+
+The catalog is seeded at the given scale into a temporary SQLite database, or
+with `--mysql` into the configured MySQL database (for instance the `db`
+service of docker compose), which is only seeded when it has no users yet.
+Each endpoint gets `--rounds` rounds of `--requests` requests sent by
+`--concurrency` clients over the ASGI interface, and the median over the rounds
+of the p50/p95/p99 latency, throughput and SQL statements per request is
+reported, with the peak memory allocated per request.
+
+With `--baseline`, the results are compared with the ones saved in that file
+and the command exits with status 1 when an endpoint regressed: a slower p95
+or a lower throughput beyond `--tolerance`, more statements per request, or
+more memory beyond the tolerance. `--save` rewrites the baseline instead.
+
+Usage:
+    python -m benchmarks.load [--scale 1] [--requests 200] [--concurrency 16] [--rounds 3]
+        [--baseline benchmarks/baseline.json [--save]] [--tolerance 0.5] [--mysql]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from benchmarks.support import HEADERS, create_database, seed, summarize
+# pylint: disable=wrong-import-order
+import httpx
+from fastapi.routing import APIRoute
+from app.config.database import (
+    CategoryIngredient,
+    CategoryRecipe,
+    Family,
+    Ingredient,
+    IngredientInventory,
+    Menu,
+    Notification,
+    Pantry,
+    Recipe,
+    Role,
+    ShoppingList,
+    User,
+    database,
+)
+from app.config.migrations import apply_migrations
+from app.config.pool import begin_query_stats, end_query_stats
+from app.helpers.metrics import router_of
+from app.main import app
+
+# Rows seeded per unit of `--scale`.
+SCALE = {"families": 5, "members": 4, "pantries": 1, "items": 100, "recipes": 200,
+         "ingredients": 5, "notifications": 10, "menus": 2}
+
+# The model whose IDs fill each path parameter.
+PATH_MODELS = {
+    "user_id": User,
+    "shopping_list_id": ShoppingList,
+    "role_id": Role,
+    "recipe_id": Recipe,
+    "pantry_id": Pantry,
+    "notification_id": Notification,
+    "menu_id": Menu,
+    "ingredient_id": Ingredient,
+    "ingredient_inventory_id": IngredientInventory,
+    "family_id": Family,
+    "category_recipe_id": CategoryRecipe,
+    "category_ingredient_id": CategoryIngredient,
+}
+
+# The read endpoints driven, by name: path template and query parameters.
+ENDPOINTS = {
+    "users page": ("/api/users/", {"limit": 50}),
+    "user": ("/api/users/{user_id}", {}),
+    "shopping lists page": ("/api/shopping-lists/", {"limit": 50}),
+    "shopping list": ("/api/shopping-lists/{shopping_list_id}", {}),
+    "roles page": ("/api/roles/", {"limit": 50}),
+    "role": ("/api/roles/{role_id}", {}),
+    "recipes page": ("/api/recipes/", {"limit": 50}),
+    "recipe": ("/api/recipes/{recipe_id}", {}),
+    "recipe search": ("/api/recipes/search", {"q": "recipe 1", "limit": 20}),
+    "pantries page": ("/api/pantries/", {"limit": 50}),
+    "pantry": ("/api/pantries/{pantry_id}", {}),
+    "pantry totals": ("/api/pantries/{pantry_id}/totals", {}),
+    "pantry cookable": ("/api/pantries/{pantry_id}/cookable", {}),
+    "notifications page": ("/api/notifications/", {"limit": 50}),
+    "notification": ("/api/notifications/{notification_id}", {}),
+    "menus page": ("/api/menus/", {"limit": 50}),
+    "menu": ("/api/menus/{menu_id}", {}),
+    "ingredients page": ("/api/ingredients/", {"limit": 50}),
+    "ingredient": ("/api/ingredients/{ingredient_id}", {}),
+    "inventory page": ("/api/ingredient-inventories/", {"limit": 50}),
+    "inventory item": ("/api/ingredient-inventories/{ingredient_inventory_id}", {}),
+    "inventory stream": ("/api/ingredient-inventories/", {"stream": 1, "fields": "name"}),
+    "families page": ("/api/families/", {"limit": 50}),
+    "family": ("/api/families/{family_id}", {}),
+    "family pantry": ("/api/families/{family_id}/pantry", {}),
+    "category recipes page": ("/api/category-recipes/", {"limit": 50}),
+    "category recipe": ("/api/category-recipes/{category_recipe_id}", {}),
+    "category ingredients page": ("/api/category-ingredients/", {"limit": 50}),
+    "category ingredient": ("/api/category-ingredients/{category_ingredient_id}", {}),
+}
+
+# Differences below these are noise: concurrent cache misses, timer and allocator jitter.
+MIN_DELTA_MS = 1.0
+MIN_DELTA_KIB = 64
+MIN_DELTA_QUERIES = 0.1
+
+
+def check_coverage():
+    """Fails when a router of the application has no endpoint in `ENDPOINTS`."""
+    routers = {router_of(route.path) for route in app.routes
+               if isinstance(route, APIRoute) and route.path.startswith("/api/")}
+    covered = {router_of(path) for path, _ in ENDPOINTS.values()}
+    missing = sorted(routers - covered - {"stats"})
+    if missing:
+        raise SystemExit(f"No endpoint is benchmarked for the routers: {', '.join(missing)}")
+
+
+def load_ids(limit=1000):
+    """Reads up to `limit` IDs of each model used in the path parameters."""
+    # pylint: disable=protected-access
+    return {name: [key for key, in model.select(model._meta.primary_key).limit(limit).tuples()]
+            for name, model in PATH_MODELS.items()}
+
+
+def build_url(template, ids, rng):
+    """Fills the path parameters of a template with random seeded IDs."""
+    values = {name: rng.choice(ids[name]) for name in PATH_MODELS if f"{{{name}}}" in template}
+    return template.format(**values)
+
+
+async def drive(client, template, params, ids, requests, concurrency, rng):
+    """
+    Sends `requests` requests to an endpoint from `concurrency` clients.
+
+    Returns:
+        dict: The latency percentiles, throughput, failed requests and
+        statements per request.
+    """
+    pending = iter(range(requests))
+    latencies = []
+    failures = 0
+
+    async def client_loop():
+        nonlocal failures
+        for _ in pending:
+            start = time.perf_counter()
+            response = await client.get(build_url(template, ids, rng), params=params)
+            latencies.append(time.perf_counter() - start)
+            failures += response.status_code >= 400
+
+    token = begin_query_stats()
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    queries = end_query_stats(token)
+    return {
+        **summarize(latencies),
+        "rps": round(requests / elapsed, 1),
+        "failures": failures,
+        "queries_per_request": round(queries["queries"] / requests, 2),
+    }
+
+
+async def peak_memory(client, template, params, ids, requests, rng):
+    """Measures the peak Python memory allocated while serving requests one by one, in KiB."""
+    tracemalloc.start()
+    try:
+        peak = 0
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await client.get(build_url(template, ids, rng), params=params)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+async def run(args):
+    """Drives every endpoint and returns the results by endpoint name."""
+    rng = random.Random(21)
+    ids = load_ids()
+    empty = [name for name, values in ids.items() if not values]
+    if empty:
+        raise SystemExit(f"The database has no rows for: {', '.join(empty)}")
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark",
+                                     headers=HEADERS) as client:
+            for name, (template, params) in ENDPOINTS.items():
+                if args.only and name not in args.only:
+                    continue
+                await drive(client, template, params, ids, args.warmup, args.concurrency, rng)
+                rounds = []
+                for _ in range(args.rounds):
+                    gc.collect()
+                    rounds.append(await drive(client, template, params, ids, args.requests,
+                                              args.concurrency, rng))
+                result = {figure: statistics.median(run[figure] for run in rounds)
+                          for figure in rounds[0]}
+                result["peak_kib"] = await peak_memory(client, template, params, ids,
+                                                       args.memory_requests, rng)
+                results[name] = result
+                print(f"{name:>26}  p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  "
+                      f"p99 {result['p99_ms']:8.2f} ms  {result['rps']:8.1f} req/s  "
+                      f"{result['queries_per_request']:6.2f} q/req  "
+                      f"{result['peak_kib']:9.1f} KiB  {result['failures']} failed")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lists the regressions of the results against a baseline.
+
+    Returns:
+        list: One message per regressed figure.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if (current["p95_ms"] > previous["p95_ms"] * (1 + tolerance) and
+                current["p95_ms"] - previous["p95_ms"] > MIN_DELTA_MS):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['rps']} -> {current['rps']} req/s")
+        if current["queries_per_request"] - previous["queries_per_request"] > MIN_DELTA_QUERIES:
+            regressions.append(f"{name}: statements per request "
+                               f"{previous['queries_per_request']} -> "
+                               f"{current['queries_per_request']}")
+        if (current["peak_kib"] > previous["peak_kib"] * (1 + tolerance) and
+                current["peak_kib"] - previous["peak_kib"] > MIN_DELTA_KIB):
+            regressions.append(f"{name}: peak memory {previous['peak_kib']} -> "
+                               f"{current['peak_kib']} KiB")
+        if current["failures"] > previous["failures"]:
+            regressions.append(f"{name}: {current['failures']} failed requests")
+    return regressions
+
+
+def main(argv=None):
+    """Seeds the catalog, drives every router and checks the results against the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--memory-requests", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="The names of the endpoints to drive.")
+    parser.add_argument("--baseline", help="The JSON file the results are compared with.")
+    parser.add_argument("--save", action="store_true", help="Rewrite the baseline file.")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    parser.add_argument("--mysql", action="store_true")
+    args = parser.parse_args(argv)
+    check_coverage()
+    sizes = {name: value * args.scale if name in ("families", "recipes") else value
+             for name, value in SCALE.items()}
+    if args.mysql:
+        with database.connection_context():
+            apply_migrations(database)
+            if not User.select().exists():
+                seed(database, **sizes)
+    else:
+        seed(create_database(), **sizes)
+    settings = {"scale": args.scale, "requests": args.requests, "rounds": args.rounds,
+                "concurrency": args.concurrency, "database": "mysql" if args.mysql else "sqlite"}
+    print(f"scale {args.scale}: {sizes}, {args.requests} requests per endpoint, "
+          f"concurrency {args.concurrency}")
+    results = asyncio.run(run(args))
+    print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+    report = {"settings": settings, "endpoints": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    if not args.baseline:
+        return
+    if args.save or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return
+    with open(args.baseline, encoding="utf-8") as source:
+        baseline = json.load(source)
+    if baseline["settings"] != settings:
+        raise SystemExit(f"The baseline was recorded with {baseline['settings']}, "
+                         f"not {settings}: run with the same settings or --save")
+    regressions = compare(results, baseline["endpoints"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"no regression against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measures `GET /api/recipes/search` over a large synthetic recipe catalog.
+
+By default the catalog lives in a temporary SQLite database, which exercises
+the `LIKE` fallback. With `--mysql` it is loaded into the configured MySQL
+database (the rows are only added when the table holds fewer recipes than
+requested), which exercises the FULLTEXT index created by the migrations.
+
+Usage:
+    python -m benchmarks.recipe_search [--recipes 1000000] [--rounds 20] [--mysql]
+"""
+import argparse
+import datetime
+import random
+from benchmarks.support import HEADERS, create_database, measure, seed, summarize
+# pylint: disable=wrong-import-order
+from fastapi.testclient import TestClient
+from app.config.database import CategoryRecipe, Recipe, User, database
+from app.config.migrations import apply_migrations
+from app.main import app
+
+BATCH = 1000
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def _words(vocabulary, rng, count):
+    return " ".join(vocabulary[int(len(vocabulary) * rng.random() ** 3)] for _ in range(count))
+
+
+def seed_recipes(db, count, vocabulary, rng):
+    """Inserts recipes whose texts draw words from the vocabulary, common words first."""
+    user = User.select().first()
+    category = CategoryRecipe.select().first()
+    with db.atomic():
+        for start in range(0, count, BATCH):
+            Recipe.insert_many([{
+                "nameRecipe": _words(vocabulary, rng, 3),
+                "descriptionRecipe": _words(vocabulary, rng, 10),
+                "categoryRecipe": "main",
+                "difficultyRecipe": rng.choice(DIFFICULTIES),
+                "timePreparation": datetime.time(0, 30),
+                "instructions": _words(vocabulary, rng, 25),
+                "nutritionalData": "",
+                "userId": user.idUser,
+                "categoriaId": category.idCategoryRecipe,
+            } for _ in range(start, min(start + BATCH, count))]).execute()
+
+
+def main(argv=None):
+    """Loads the catalog, runs random searches and prints the latency."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=1000000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--mysql", action="store_true")
+    args = parser.parse_args(argv)
+    rng = random.Random(14)
+    vocabulary = [f"word{number}" for number in range(5000)]
+    if args.mysql:
+        db = database
+        with db.connection_context():
+            apply_migrations(db)
+            existing = Recipe.select().count()
+            if existing < args.recipes:
+                if not User.select().exists():
+                    seed(db, members=1, items=0)
+                seed_recipes(db, args.recipes - existing, vocabulary, rng)
+    else:
+        db = create_database()
+        seed(db, members=1, items=0)
+        seed_recipes(db, args.recipes, vocabulary, rng)
+    searches = [
+        ("common word", lambda: {"q": vocabulary[rng.randrange(10)]}),
+        ("rare word", lambda: {"q": vocabulary[rng.randrange(1000, 5000)]}),
+        ("two words", lambda: {"q": f"{vocabulary[rng.randrange(100)]} "
+                                    f"{vocabulary[rng.randrange(100, 1000)]}"}),
+        ("filtered", lambda: {"q": vocabulary[rng.randrange(100)],
+                              "difficulty": rng.choice(DIFFICULTIES), "category_id": 1}),
+    ]
+    print(f"{args.recipes} recipes on {'MySQL FULLTEXT' if args.mysql else 'SQLite LIKE'}")
+    with TestClient(app) as client:
+        for name, params in searches:
+            samples = []
+            for _ in range(args.rounds):
+                with measure(db) as result:
+                    response = client.get("/api/recipes/search", params=params(),
+                                          headers=HEADERS)
+                response.raise_for_status()
+                samples.append(result["seconds"])
+            report = summarize(samples)
+            print(f"{name:>12}: p50 {report['p50_ms']:9.3f} ms  p95 {report['p95_ms']:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Measures how the throughput scales with the number of Gunicorn workers.
+
+The catalog is seeded into a SQLite file and the production configuration
+(`app/config/gunicorn_conf.py`) is started with 1, 2, 4... workers. For each
+count, `--clients` client processes keep `--connections` requests in flight
+each for `--duration` seconds, and the throughput, speedup over one worker
+and latency percentiles are reported. The clients share the machine with the
+server, so leave them a core or two when reading the speedup.
+
+Usage:
+    python -m benchmarks.scaling [--workers 1 2 4] [--duration 10] [--clients 2]
+        [--connections 16] [--path /api/recipes/?limit=50]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.support import HEADERS, open_database, seed, summarize
+# pylint: disable=wrong-import-order
+import httpx
+from app.config.migrations import apply_migrations
+
+PORT = 8765
+
+
+def _default_workers():
+    counts, count = [], 1
+    while count <= (os.cpu_count() or 1):
+        counts.append(count)
+        count *= 2
+    return counts
+
+
+async def _client(url, connections, duration):
+    latencies = []
+    failures = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=connections)
+    async with httpx.AsyncClient(headers=HEADERS, limits=limits, timeout=30) as client:
+        async def loop():
+            nonlocal failures
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                failures += response.status_code >= 400
+        await asyncio.gather(*(loop() for _ in range(connections)))
+    return latencies, failures
+
+
+def run_client(url, connections, duration):
+    """Runs one client process and returns its latencies and failed requests."""
+    return asyncio.run(_client(url, connections, duration))
+
+
+def start_server(workers, path):
+    """Starts Gunicorn with the production configuration and waits until it answers."""
+    env = {
+        **os.environ,
+        "BENCHMARK_SQLITE_PATH": path,
+        "SERVER_WORKERS": str(workers),
+        "SERVER_BIND": f"127.0.0.1:{PORT}",
+        "PROMETHEUS_MULTIPROC_DIR": tempfile.mkdtemp(prefix="prometheus-"),
+        "EXPIRY_SCAN_ENABLED": "false",
+    }
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "gunicorn", "-c", "app/config/gunicorn_conf.py",
+         "--log-level", "warning", "benchmarks.sqlite_app:app"], env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{PORT}/api/roles/", headers=HEADERS).is_success:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise SystemExit("Gunicorn did not start")
+
+
+def stop_server(server):
+    """Stops Gunicorn gracefully with SIGTERM, as docker does."""
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=60)
+
+
+def main(argv=None):
+    """Seeds the catalog and prints the throughput for each worker count."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=_default_workers())
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=2)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--path", default="/api/recipes/?limit=50")
+    args = parser.parse_args(argv)
+    path = os.path.join(tempfile.mkdtemp(prefix="benchmark-"), "benchmark.db")
+    db = open_database(path)
+    apply_migrations(db)
+    seed(db, families=5, items=100, recipes=1000, ingredients=5)
+    db.close()
+    url = f"http://127.0.0.1:{PORT}{args.path}"
+    print(f"{os.cpu_count()} CPUs, {args.clients} client processes x "
+          f"{args.connections} connections, GET {args.path}")
+    print(f"{'workers':>7}  {'req/s':>9}  {'speedup':>7}  {'p50':>9}  {'p95':>9}  {'failed':>6}")
+    single = None
+    for workers in args.workers:
+        server = start_server(workers, path)
+        try:
+            with multiprocessing.Pool(args.clients) as pool:
+                results = pool.starmap(run_client, [(url, args.connections, args.duration)]
+                                       * args.clients)
+        finally:
+            stop_server(server)
+        latencies = [latency for client, _ in results for latency in client]
+        failures = sum(failed for _, failed in results)
+        throughput = len(latencies) / args.duration
+        single = single or throughput
+        report = summarize(latencies)
+        print(f"{workers:7d}  {throughput:9.1f}  {throughput / single:6.2f}x  "
+              f"{report['p50_ms']:6.2f} ms  {report['p95_ms']:6.2f} ms  {failures:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measures `POST /api/menus/{id}/shopping-list` for a week-long menu against a
+full pantry, and checks it stays within the latency budget.
+
+Usage:
+    python -m benchmarks.shopping_list [--recipes 30] [--ingredients 10] [--items 500]
+"""
+import argparse
+import datetime
+import sys
+from benchmarks.support import HEADERS, create_database, measure, seed, summarize
+# pylint: disable=wrong-import-order
+from fastapi.testclient import TestClient
+from app.config.database import Menu, Menu_Recipe
+from app.main import app
+
+BUDGET_MS = 50
+
+
+def main(argv=None):
+    """Seeds a menu and a pantry, generates shopping lists and prints the latency."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=30)
+    parser.add_argument("--ingredients", type=int, default=10)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+    db = create_database()
+    ids = seed(db, members=1, items=args.items, recipes=args.recipes,
+               ingredients=args.ingredients)
+    menu = Menu.create(dateMenu=datetime.date.today(), userId=ids["users"][0])
+    Menu_Recipe.insert_many([{"menuIdMR": menu.idMenu, "recipeIdMR": recipe_id}
+                             for recipe_id in ids["recipes"]]).execute()
+    samples = []
+    with TestClient(app) as client:
+        for _ in range(args.rounds):
+            with measure(db) as result:
+                response = client.post(f"/api/menus/{menu.idMenu}/shopping-list",
+                                       headers=HEADERS)
+            response.raise_for_status()
+            samples.append(result["seconds"])
+    report = summarize(samples)
+    print(f"{args.recipes} recipes x {args.ingredients} ingredients, {args.items} pantry items: "
+          f"{len(response.json()['items'])} items to buy, {result['queries']} queries")
+    print(f"p50 {report['p50_ms']:.3f} ms  p95 {report['p95_ms']:.3f} ms  "
+          f"max {report['max_ms']:.3f} ms  (budget {BUDGET_MS} ms)")
+    return 0 if report["p95_ms"] <= BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
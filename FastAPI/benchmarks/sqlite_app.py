@@ -0,0 +1,11 @@
+"""
+ASGI entry point serving the application on the SQLite file named by
+`BENCHMARK_SQLITE_PATH`, so the benchmarks can run it under Gunicorn.
+"""
+import os
+from benchmarks.support import open_database
+
+open_database(os.environ["BENCHMARK_SQLITE_PATH"])
+
+# pylint: disable=wrong-import-position,unused-import
+from app.main import app  # noqa: E402,F401
@@ -0,0 +1,90 @@
+"""
+Measures how long a worker takes from its first import until it can serve.
+
+Each run starts a fresh interpreter, as Gunicorn does for a new worker when
+the application is not preloaded, which imports `app.main` and runs its
+lifespan. MySQL is left unreachable on purpose: the database is connected in
+the background, so it must not add to the startup. The median of the import,
+of the registration of each router, of the lifespan and of the total are
+printed, and the command exits with status 1 when the total is over
+`STARTUP_BUDGET_SECONDS`.
+
+Usage:
+    python -m benchmarks.startup [--runs 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# The settings the application reads at import time; MySQL listens nowhere.
+ENVIRONMENT = {
+    "MYSQL_DATABASE": "benchmark",
+    "MYSQL_USER": "benchmark",
+    "MYSQL_PASSWORD": "benchmark",
+    "MYSQL_HOST": "127.0.0.1",
+    "MYSQL_PORT": "1",
+    "API_KEY": "benchmark",
+    "ASYNC_DB_ENABLED": "false",
+    "EXPIRY_SCAN_ENABLED": "false",
+}
+
+
+async def _start():
+    # pylint: disable=import-outside-toplevel
+    from app.main import app
+    from app.helpers.health import startup_timings
+    async with app.router.lifespan_context(app):
+        return startup_timings.report()
+
+
+def run_child():
+    """Starts the application in this process and prints its startup timings."""
+    print(json.dumps(asyncio.run(_start())))
+
+
+def measure(runs):
+    """
+    Starts the application in fresh interpreters.
+
+    Args:
+        runs (int): The number of interpreters to start.
+
+    Returns:
+        list: The startup timings reported by each of them.
+    """
+    env = {**os.environ, **ENVIRONMENT}
+    reports = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child"],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        reports.append(json.loads(output.strip().splitlines()[-1]))
+    return reports
+
+
+def main(argv=None):
+    """Prints the median startup timings and fails when they are over the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        run_child()
+        return
+    reports = measure(args.runs)
+    for phase in reports[0]["phases_ms"]:
+        median = statistics.median(report["phases_ms"][phase] for report in reports)
+        print(f"{phase:<40} {median:9.1f} ms")
+    ready = statistics.median(report["ready_ms"] for report in reports)
+    budget = reports[0]["budget_ms"]
+    print(f"{'ready':<40} {ready:9.1f} ms  (budget {budget:.0f} ms, median of {args.runs})")
+    if ready > budget:
+        print("Startup is over the budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+This module contains the helpers shared by the benchmarks.
+
+The benchmarks run the real application in-process against a temporary SQLite
+database, so they need neither Docker nor MySQL. Import this module before any
+`app` module: it provides the settings the application reads at import time.
+"""
+import datetime
+import math
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+for _name, _value in {
+    "MYSQL_DATABASE": "benchmark",
+    "MYSQL_USER": "benchmark",
+    "MYSQL_PASSWORD": "benchmark",
+    "MYSQL_HOST": "127.0.0.1",
+    "MYSQL_PORT": "3306",
+    "API_KEY": "benchmark",
+    "ASYNC_DB_ENABLED": "false",
+    "EXPIRY_SCAN_ENABLED": "false",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+# pylint: disable=wrong-import-position
+from peewee import SqliteDatabase
+from app.config.database import (
+    MODELS,
+    CategoryIngredient,
+    CategoryRecipe,
+    Family,
+    Ingredient,
+    IngredientInventory,
+    Menu,
+    Menu_Recipe,
+    Notification,
+    Pantry,
+    Recipe,
+    Role,
+    ShoppingList,
+    User,
+)
+from app.config.migrations import apply_migrations
+from app.config.pool import QueryStatsMixin
+from app.helpers.units import quantity_columns
+
+HEADERS = {"x-api-key": os.environ["API_KEY"]}
+
+
+class CountingSqliteDatabase(QueryStatsMixin, SqliteDatabase):
+    """SQLite database that counts the statements it executes, also for `/metrics`."""
+
+    explain_prefix = "EXPLAIN QUERY PLAN "
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queries = 0
+
+    def execute_sql(self, sql, params=None, commit=None):
+        """Counts the statement and executes it."""
+        self.queries += 1
+        return super().execute_sql(sql, params, commit)
+
+
+def open_database(path):
+    """
+    Binds every model to a SQLite database file.
+
+    Args:
+        path (str): The path of the database file.
+
+    Returns:
+        CountingSqliteDatabase: The database the models are bound to.
+    """
+    db = CountingSqliteDatabase(path, check_same_thread=False,
+                                pragmas={"journal_mode": "wal", "synchronous": "off"})
+    db.bind(MODELS)
+    return db
+
+
+def create_database():
+    """
+    Binds every model to a new temporary SQLite database and migrates it.
+
+    Returns:
+        CountingSqliteDatabase: The database the models are bound to.
+    """
+    db = open_database(os.path.join(tempfile.mkdtemp(prefix="benchmark-"), "benchmark.db"))
+    apply_migrations(db)
+    return db
+
+
+def seed(db, families=1, members=4, pantries=1, items=50, recipes=0, ingredients=0,
+         notifications=0, menus=0, menu_recipes=3):
+    """
+    Fills the database with families, users, pantries, inventory, recipes and menus.
+
+    Args:
+        db (Database): The database to fill.
+        families (int): The number of families.
+        members (int): The number of users per family.
+        pantries (int): The number of pantries per user.
+        items (int): The number of inventory items per pantry.
+        recipes (int): The number of recipes of the first user.
+        ingredients (int): The number of ingredients per recipe.
+        notifications (int): The number of notifications per user.
+        menus (int): The number of menus per user, each with a shopping list.
+        menu_recipes (int): The number of recipes per menu, taken from the seeded ones.
+
+    Returns:
+        dict: The IDs of the created families, users, pantries, recipes and menus.
+    """
+    today = datetime.date.today()
+    ids = {"families": [], "users": [], "pantries": [], "recipes": [], "menus": []}
+    with db.atomic():
+        role = Role.create(nameRole="member", permissions="read")
+        category_recipe = CategoryRecipe.create(nameCategoryRecipe="main",
+                                                descriptionCategoryRecipe="Main dishes")
+        category_ingredient = CategoryIngredient.create(nameCategoryIngredient="basic",
+                                                        descriptionCategoryIngredient="Basics")
+        for family_number in range(families):
+            family = Family.create(nameFamily=f"family {family_number}")
+            ids["families"].append(family.idFamily)
+            for member in range(members):
+                user = User.create(nameUser=f"user {family_number}-{member}",
+                                   passwordUser="secret",
+                                   emailUser=f"user{family_number}-{member}@example.com",
+                                   photoUser="", rolId=role, familyId=family)
+                ids["users"].append(user.idUser)
+                for _ in range(pantries):
+                    pantry = Pantry.create(userId=user)
+                    ids["pantries"].append(pantry.idPantry)
+                    IngredientInventory.insert_many([{
+                        "nameIngredient": f"ingredient {item % 40}",
+                        "amountIngredient": str(item % 5 + 1),
+                        "unitIngredient": "g",
+                        "dateExpirationIngredient": today + datetime.timedelta(days=item % 30),
+                        "pantryId": pantry.idPantry,
+                        **quantity_columns(item % 5 + 1, "g"),
+                    } for item in range(items)]).execute()
+        for number in range(recipes):
+            recipe = Recipe.create(nameRecipe=f"recipe {number}", descriptionRecipe="",
+                                   categoryRecipe="main", difficultyRecipe="easy",
+                                   timePreparation=datetime.time(0, 30), instructions="",
+                                   nutritionalData="", userId=ids["users"][0],
+                                   categoriaId=category_recipe)
+            ids["recipes"].append(recipe.idRecipe)
+            Ingredient.insert_many([{
+                "nameIngredient": f"ingredient {(number * 7 + item) % 60}",
+                "amountIngredient": "1",
+                "unitIngredient": "g",
+                "dateExpirationIngredient": today,
+                "recipeId": recipe.idRecipe,
+                "categoryIdIngredient": category_ingredient.idCategoryIngredient,
+                **quantity_columns("1", "g"),
+            } for item in range(ingredients)]).execute()
+        for position, user_id in enumerate(ids["users"]):
+            Notification.insert_many([{
+                "messageNotification": f"notification {number}",
+                "dateNotification": today - datetime.timedelta(days=number % 30),
+                "userId": user_id,
+            } for number in range(notifications)]).execute()
+            for number in range(menus if ids["recipes"] else 0):
+                menu = Menu.create(dateMenu=today + datetime.timedelta(days=number),
+                                   userId=user_id)
+                ids["menus"].append(menu.idMenu)
+                first = (position * menus + number) * menu_recipes
+                chosen = {ids["recipes"][(first + offset) % len(ids["recipes"])]
+                          for offset in range(menu_recipes)}
+                Menu_Recipe.insert_many([{"menuIdMR": menu.idMenu, "recipeIdMR": recipe_id}
+                                         for recipe_id in chosen]).execute()
+                ShoppingList.create(menuId=menu)
+    return ids
+
+
+@contextmanager
+def measure(db):
+    """
+    Measures the wall time and SQL statements of the enclosed block.
+
+    Args:
+        db (Database): The database whose statements are counted, when it counts them.
+
+    Yields:
+        dict: Filled with `seconds` and `queries` (None if not counted) when the block exits.
+    """
+    result = {}
+    queries = getattr(db, "queries", None)
+    start = time.perf_counter()
+    yield result
+    result["seconds"] = time.perf_counter() - start
+    result["queries"] = None if queries is None else db.queries - queries
+
+
+def _percentile(ordered, fraction):
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)]
+
+
+def summarize(samples):
+    """
+    Summarizes a list of durations in seconds.
+
+    Args:
+        samples (list): The measured durations.
+
+    Returns:
+        dict: The 50th, 95th and 99th percentiles and the maximum, in milliseconds.
+    """
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
@@ -0,0 +1,49 @@
+"""Tests the number of queries of the recipe detail with its related resources embedded."""
+import unittest
+from unittest import mock
+from benchmarks.support import HEADERS, create_database, seed
+# pylint: disable=wrong-import-order,ungrouped-imports
+from fastapi.testclient import TestClient
+from benchmarks.expand import EXPAND, seed_categories
+from app.config.settings import HTTP_CACHE
+from app.main import app
+
+# The recipe, its ingredients and its categories.
+EXPANDED_DETAIL_QUERIES = 3
+
+
+class RecipeExpandTest(unittest.TestCase):
+    """Reads expanded recipes with few and many related rows through a counting database."""
+
+    def setUp(self):
+        self.db = create_database()
+        self.client = self.enterContext(TestClient(app))
+        # Keep the data version read by the conditional GETs out of the counts.
+        patcher = mock.patch.dict(HTTP_CACHE, version_seconds=3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # The API keys and the data version are loaded on the first request.
+        self.client.get("/api/roles/", headers=HEADERS).raise_for_status()
+
+    def read_expanded(self, size):
+        """Seeds a recipe with `size` ingredients and categories and reads it expanded."""
+        recipe_id = seed(self.db, recipes=1, ingredients=size)["recipes"][0]
+        seed_categories([recipe_id], size)
+        before = self.db.queries
+        response = self.client.get(f"/api/recipes/{recipe_id}?expand={EXPAND}", headers=HEADERS)
+        queries = self.db.queries - before
+        self.assertEqual(response.status_code, 200)
+        return response.json(), queries
+
+    def test_queries_do_not_grow_with_related_rows(self):
+        """The expanded detail runs the same fixed number of queries for 1 and 50 rows."""
+        for size in (1, 50):
+            with self.subTest(size=size):
+                recipe, queries = self.read_expanded(size)
+                self.assertEqual(len(recipe["ingredients"]), size)
+                self.assertEqual(len(recipe["categories"]), size)
+                self.assertEqual(queries, EXPANDED_DETAIL_QUERIES)
+
+
+if __name__ == "__main__":
+    unittest.main()